@@ -3,30 +3,42 @@
 
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk, font as tkfont
-from opencc import OpenCC
 import os
-import chardet
 import json
 import threading
 from collections import deque
-import shutil
 import time
-import copy
 import tkinterdnd2 as tkdnd
 import sys
-import re
-
-# 嘗試引入 langdetect，如果失敗則提示使用者安裝
-try:
-    from langdetect import detect, DetectorFactory
-    from langdetect.lang_detect_exception import LangDetectException
-    DetectorFactory.seed = 0 # 確保每次檢測結果一致
-    LANGDETECT_AVAILABLE = True
-except ImportError:
-    LANGDETECT_AVAILABLE = False
+import zlib
+import heapq
+import argparse
+import csv
+import sqlite3
 
 # 引入 language_manager 模組
 from language_manager import lm
+# 引入 converter_core 模組 (轉換核心，langdetect 不存在時 LANGDETECT_AVAILABLE 為 False)
+from converter_core import (LANGDETECT_AVAILABLE, is_convertible_chinese, convert_text, convert_structured_text, read_txt_file_with_encoding_detection,
+                            read_custom_conversions_file, convert_many, get_batch_converter,
+                            describe_content_result, build_content_conversion_params,
+                            converter_registry, get_converter, available_converter_configs, stress_test_converters, MAX_CONVERTER_INSTANCES,
+                            SegmentCache, describe_line_cache)
+import conversion_server
+import folder_watcher
+import shard_runner
+from job_journal import JobJournal, UNFINISHED_STATES, persistable_content_params, restore_content_params, run_content_job, convert_watched_file
+from file_list_store import InMemoryFileList, create_file_list, STATUS_GROUPS, SORT_KEYS, status_in_group
+from script_scanner import convert_han_spans, name_classifier
+from structured_text import structured_format
+from compressed_io import TEXT_INPUT_SUFFIXES, is_text_input, available_output_compressions
+from stage_stats import stage_stats, JobProfiler, PROFILE_MODES, build_stats_report, dump_stats_json
+from task_scheduler import scheduler, PRIORITY_BATCH
+from batch_scheduler import DEFAULT_WORKERS, DEFAULT_MEMORY_BUDGET_MB
+from content_dedup import DEDUP_LINK_MODES
+from glossary_store import GlossaryStore, GLOSSARY_CONFLICT_SAMPLES
+from job_report import JobReport, open_job_report, output_size
+from archive_converter import ARCHIVE_SUFFIXES, is_archive, convert_content_path, convert_filename_path, list_archive_entries, plan_entry_name
 
 # --- 輔助函式：尋找打包後的資源路徑 ---
 def resource_path(relative_path):
@@ -60,8 +72,16 @@ DEFAULT_FONT = (DEFAULT_FONT_FAMILY, DEFAULT_FONT_SIZE_NORMAL)
 TITLE_FONT = (DEFAULT_FONT_FAMILY, DEFAULT_FONT_SIZE_LARGE, "bold")
 PREVIEW_FONT_BASE = (DEFAULT_FONT_FAMILY, DEFAULT_FONT_SIZE_PREVIEW)
 PREVIEW_CHAR_LIMIT = 10000
-INITIAL_READ_SIZE_FOR_CHARSET = 1024 * 100
 MAX_UNDO_HISTORY = 20
+CLIPBOARD_SYNC_CHAR_LIMIT = 20000
+LIVE_CONVERT_DELAY_MS = 300
+CLIPBOARD_INSERT_CHUNK_SIZE = 1024 * 256
+UNDO_DIFF_BLOCK_SIZE = 1024 * 64
+VIRTUAL_WINDOW_ROWS = 240 # 虛擬列表實際放進 Treeview 的列數 (可見列加上下緩衝)
+VIRTUAL_EDGE_ROWS = 40 # 可見範圍離緩衝邊緣少於此列數時重新取窗
+COLUMN_MEASURE_SAMPLE = 50 # 調整欄寬時只量測最長的幾個名稱
+FILTER_TYPING_DELAY_MS = 250
+GLOSSARY_FILETYPES = [("OpenCC / TSV", "*.txt *.tsv"), ("CSV", "*.csv"), ("All files", "*.*")]
 
 # --- 輔助類別與函式 ---
 class CustomCheckbutton(ttk.Frame):
@@ -108,15 +128,52 @@ class CustomCheckbutton(ttk.Frame):
         self._update_visuals()
 
 
-def contains_chinese(text):
-    return bool(re.search(r'[\u4e00-\u9fff]', text))
-
-def is_convertible_chinese(text):
-    if not text or not LANGDETECT_AVAILABLE: return True
-    try:
-        if detect(text) == 'ja': return False
-    except LangDetectException: pass
-    return contains_chinese(text)
+def find_dirty_line_range(old_lines, new_lines):
+    """ 比對前後兩份逐行內容，回傳變動區段 (起始行, 舊結束行, 新結束行) """
+    limit = min(len(old_lines), len(new_lines)); start = 0
+    while start < limit and old_lines[start] == new_lines[start]: start += 1
+    old_end, new_end = len(old_lines), len(new_lines)
+    while old_end > start and new_end > start and old_lines[old_end - 1] == new_lines[new_end - 1]: old_end -= 1; new_end -= 1
+    return start, old_end, new_end
+
+def _common_affix_length(a, b, from_end=False, limit=None):
+    # 以區塊比對找出共同前綴 (或後綴) 長度，避免逐字迴圈
+    limit = min(len(a), len(b)) if limit is None else limit
+    length, block = 0, UNDO_DIFF_BLOCK_SIZE
+    while length < limit:
+        step = min(block, limit - length)
+        if from_end: same = a[len(a) - length - step:len(a) - length] == b[len(b) - length - step:len(b) - length]
+        else: same = a[length:length + step] == b[length:length + step]
+        if same: length += step
+        elif step == 1: break
+        else: block = max(1, step // 2)
+    return length
+
+def make_text_patch(source, target):
+    """ 建立由 source 還原為 target 的壓縮差異 (前綴長度, 後綴長度, 壓縮後的中段) """
+    prefix = _common_affix_length(source, target)
+    suffix = _common_affix_length(source, target, from_end=True, limit=min(len(source), len(target)) - prefix)
+    middle = target[prefix:len(target) - suffix]
+    return prefix, suffix, zlib.compress(middle.encode('utf-8', errors='surrogatepass'), 1)
+
+def apply_text_patch(source, patch):
+    prefix, suffix, packed = patch
+    return source[:prefix] + zlib.decompress(packed).decode('utf-8', errors='surrogatepass') + source[len(source) - suffix:]
+
+class TextUndoHistory:
+    """ 只保留最新一份完整內容，較舊的狀態以壓縮差異逐步往回還原 """
+    def __init__(self, maxlen=MAX_UNDO_HISTORY):
+        self.head = None; self.patches = deque(maxlen=max(0, maxlen - 1))
+    def __len__(self): return 0 if self.head is None else len(self.patches) + 1
+    def append(self, texts):
+        texts = tuple(texts)
+        if self.head is not None: self.patches.append(tuple(make_text_patch(new, old) for new, old in zip(texts, self.head)))
+        self.head = texts
+    def pop(self):
+        if self.head is None: raise IndexError("pop from an empty undo history")
+        texts = self.head
+        self.head = tuple(apply_text_patch(text, patch) for text, patch in zip(texts, self.patches.pop())) if self.patches else None
+        return texts
 
 class Tooltip:
     def __init__(self, widget, text_key):
@@ -130,6 +187,166 @@ class Tooltip:
     def leave(self, event=None):
         if self.tooltip_window: self.tooltip_window.destroy()
 
+class VirtualTreeview(ttk.Treeview):
+    """ 只把可見範圍附近的列放進 Treeview，完整資料保存在 rows [(iid, values, tags)]；捲軸、選取與 selection() 以完整資料為準。
+        iid 仍是原本的鍵 (檔案路徑)，identify_row、勾選與刪除的流程與一般 Treeview 相同 """
+    def __init__(self, master, window_rows=VIRTUAL_WINDOW_ROWS, **kwargs):
+        self._yscrollcommand = kwargs.pop('yscrollcommand', None)
+        super().__init__(master, **kwargs)
+        self.window_rows = window_rows; self.rows = []; self.positions = {}; self.selected = set()
+        self.window_start = self.window_len = 0; self._render_after_id = None
+        super().configure(yscrollcommand=self._on_native_scroll)
+        # 自己的 bindtag 排在最前面，應用程式之後以 bind() 綁定同一事件時不會蓋掉
+        tag = f"VirtualTreeview{id(self)}"; self.bindtags((tag,) + self.bindtags())
+        self.bind_class(tag, "<<TreeviewSelect>>", self._on_native_select)
+        self.bind_class(tag, "<ButtonPress-1>", self._on_plain_selection_change)
+        for key in ("<KeyPress-Up>", "<KeyPress-Down>", "<KeyPress-Prior>", "<KeyPress-Next>", "<KeyPress-Home>", "<KeyPress-End>"): self.bind_class(tag, key, self._on_plain_selection_change)
+
+    def configure(self, cnf=None, **kwargs):
+        if 'yscrollcommand' in kwargs: self._yscrollcommand = kwargs.pop('yscrollcommand'); self._report_view(self._top_row())
+        return super().configure(cnf, **kwargs) if cnf or kwargs else None
+    config = configure
+
+    def set_rows(self, rows):
+        """ 換上新的完整資料；保留目前的捲動位置與仍存在的選取 """
+        top = self._top_row()
+        self.rows = rows; self.positions = {row[0]: i for i, row in enumerate(rows)}; self.selected.intersection_update(self.positions)
+        self._render(top)
+
+    def row(self, iid): return self.rows[self.positions[iid]] if iid in self.positions else None
+
+    def update_row(self, iid, values=None, tags=None):
+        """ 只更新一列，例如點擊勾選框時，不必重建整份資料 """
+        if (index := self.positions.get(iid)) is None: return
+        _, old_values, old_tags = self.rows[index]
+        self.rows[index] = (iid, old_values if values is None else tuple(values), old_tags if tags is None else tuple(tags))
+        if self.exists(iid): self.item(iid, values=self.rows[index][1], tags=self.rows[index][2])
+
+    def selection(self):
+        if len(self.selected) < 2: return tuple(self.selected)
+        return tuple(iid for iid, _, _ in self.rows if iid in self.selected)
+
+    def see(self, iid):
+        if not self.exists(iid) and iid in self.positions: self._render(self.positions[iid])
+        super().see(iid)
+
+    def yview(self, *args):
+        """ 外部捲軸的 moveto 以完整資料計算；scroll 交給 Treeview，接近視窗邊緣時再重新取窗 """
+        total = len(self.rows)
+        if not args:
+            lo, hi = super().yview()
+            return ((self.window_start + lo * self.window_len) / total, (self.window_start + hi * self.window_len) / total) if total else (0.0, 1.0)
+        if args[0] == 'moveto': self._render(int(float(args[1]) * total))
+        else: super().yview(*args)
+
+    def _visible_rows(self):
+        try: row_height = int(ttk.Style(self).lookup(self.cget('style') or 'Treeview', 'rowheight') or 20)
+        except (ValueError, tk.TclError): row_height = 20
+        return max(1, self.winfo_height() // row_height)
+
+    def _top_row(self):
+        return self.window_start + (round(float(super().yview()[0]) * self.window_len) if self.window_len else 0)
+
+    def _render(self, top):
+        self._render_after_id = None
+        total, visible = len(self.rows), self._visible_rows()
+        size = max(self.window_rows, visible + 4 * VIRTUAL_EDGE_ROWS); top = max(0, min(top, total - visible))
+        start = max(0, min(top - (size - visible) // 2, total - size)); end = min(total, start + size)
+        focus = self.focus(); super().delete(*super().get_children())
+        for iid, values, tags in self.rows[start:end]: self.insert("", "end", iid=iid, values=values, tags=tags)
+        self.window_start, self.window_len = start, end - start
+        if shown := [iid for iid, _, _ in self.rows[start:end] if iid in self.selected]: self.selection_set(shown)
+        if focus and self.exists(focus): self.focus(focus)
+        if self.window_len: super().yview_moveto((top - start) / self.window_len)
+        self._report_view(top)
+
+    def _on_native_scroll(self, lo, hi):
+        top, bottom = self.window_start + float(lo) * self.window_len, self.window_start + float(hi) * self.window_len
+        window_end = self.window_start + self.window_len
+        if (self.window_start > 0 and top - self.window_start < VIRTUAL_EDGE_ROWS) or (window_end < len(self.rows) and window_end - bottom < VIRTUAL_EDGE_ROWS):
+            if self._render_after_id: self.after_cancel(self._render_after_id)
+            self._render_after_id = self.after_idle(self._render, round(top))
+        self._report_view(top, bottom)
+
+    def _report_view(self, top, bottom=None):
+        if not self._yscrollcommand: return
+        if not (total := len(self.rows)): self._yscrollcommand(0.0, 1.0); return
+        if bottom is None: bottom = top + self._visible_rows()
+        self._yscrollcommand(top / total, min(1.0, bottom / total))
+
+    def _on_native_select(self, event):
+        window = {iid for iid, _, _ in self.rows[self.window_start:self.window_start + self.window_len]}
+        self.selected = (self.selected - window) | set(super().selection())
+
+    def _on_plain_selection_change(self, event):
+        # 沒有按 Shift / Ctrl 的點擊或方向鍵會取代整個選取，包括不在視窗中的列
+        if not event.state & 0x0005 and (event.type != tk.EventType.ButtonPress or self.identify_region(event.x, event.y) in ('cell', 'tree')): self.selected.clear()
+
+class FileListFilterBar(ttk.Frame):
+    """ 檔案列表的篩選與排序列；條件改變時呼叫 on_change (搜尋字串稍候再套用)，query_args() 直接傳給檔案列表的 query() """
+    def __init__(self, parent, get_file_list, on_change, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.get_file_list, self.on_change = get_file_list, on_change; self._after_id = None
+        self.text = tk.StringVar(); self.descending = tk.BooleanVar(value=False)
+        self.values = {'status': None, 'checked': None, 'ext': None, 'folder': None, 'sort': 'order'}; self.options = {}; self.labels = {}; self.boxes = {}
+        row1, row2 = ttk.Frame(self), ttk.Frame(self); row1.pack(fill='x'); row2.pack(fill='x', pady=(2, 0))
+        self.labels['search'] = ttk.Label(row1); self.labels['search'].pack(side='left')
+        ttk.Entry(row1, textvariable=self.text, width=20).pack(side='left', padx=(2, 8)); self.text.trace_add("write", self._on_text_changed)
+        for row, name, width in ((row1, 'status', 14), (row1, 'checked', 8), (row2, 'ext', 8), (row2, 'folder', 28), (row2, 'sort', 10)):
+            self.labels[name] = ttk.Label(row); self.labels[name].pack(side='left')
+            self.boxes[name] = ttk.Combobox(row, state='readonly', width=width, postcommand=lambda name=name: self._fill(name)); self.boxes[name].pack(side='left', padx=(2, 8))
+            self.boxes[name].bind("<<ComboboxSelected>>", lambda event, name=name: self._on_select(name))
+        self.clear_btn = ttk.Button(row1, command=self.clear); self.clear_btn.pack(side='left')
+        self.descending_cb = ttk.Checkbutton(row2, variable=self.descending, command=self.on_change); self.descending_cb.pack(side='left')
+        self.update_language()
+
+    def _fill(self, name):
+        """ 下拉時才讀取目前列表的狀態數量、副檔名與資料夾 """
+        any_option = [(None, lm.get_string("filter_any"))]
+        if name == 'status':
+            counts = self.get_file_list().status_counts()
+            self.options[name] = any_option + [(group, f"{lm.get_string('status_' + group)} ({sum(n for status, n in counts.items() if status_in_group(status, group))})") for group in STATUS_GROUPS]
+        elif name == 'checked': self.options[name] = any_option + [(True, lm.get_string("checked_only")), (False, lm.get_string("unchecked_only"))]
+        elif name == 'ext': self.options[name] = any_option + [(ext, ext or lm.get_string("filter_no_ext")) for ext in self.get_file_list().extensions()]
+        elif name == 'folder': self.options[name] = any_option + [(folder, folder) for folder in self.get_file_list().folders()]
+        else: self.options[name] = [(key, lm.get_string('sort_' + key)) for key in SORT_KEYS]
+        self.boxes[name]['values'] = [label for _, label in self.options[name]]
+        self.boxes[name].set(next((label for value, label in self.options[name] if value == self.values[name]), self.options[name][0][1]))
+
+    def _on_select(self, name):
+        self.values[name] = self.options[name][self.boxes[name].current()][0]; self.on_change()
+
+    def _on_text_changed(self, *args):
+        if self._after_id: self.after_cancel(self._after_id)
+        self._after_id = self.after(FILTER_TYPING_DELAY_MS, self._apply_text)
+    def _apply_text(self): self._after_id = None; self.on_change()
+
+    def set_sort(self, key):
+        """ 點擊欄位標題：同一欄再點一次時反向 """
+        if self.values['sort'] == key: self.descending.set(not self.descending.get())
+        else: self.values['sort'] = key; self.descending.set(False)
+        self._fill('sort'); self.on_change()
+
+    def clear(self):
+        self.values.update(status=None, checked=None, ext=None, folder=None); self.text.set("")
+        if self._after_id: self.after_cancel(self._after_id); self._after_id = None
+        for name in self.boxes: self._fill(name)
+        self.on_change()
+
+    def active(self): return any(self.values[name] is not None for name in ('status', 'checked', 'ext', 'folder')) or bool(self.text.get().strip())
+    def query_args(self):
+        return {'status': self.values['status'], 'checked': self.values['checked'], 'ext': self.values['ext'], 'folder': self.values['folder'],
+                'text': self.text.get().strip(), 'sort': self.values['sort'], 'descending': self.descending.get()}
+
+    def update_language(self):
+        for name, key in (('search', "filter_search"), ('status', "filter_status"), ('checked', "filter_checked"), ('ext', "filter_ext"), ('folder', "filter_folder"), ('sort', "filter_sort")):
+            self.labels[name].config(text=lm.get_string(key))
+        self.descending_cb.config(text=lm.get_string("filter_descending")); self.clear_btn.config(text=lm.get_string("filter_clear"))
+        for name in ('checked', 'sort'): self._fill(name)
+        self.boxes['status'].set(lm.get_string("filter_any") if self.values['status'] is None else lm.get_string('status_' + self.values['status']))
+        for name in ('ext', 'folder'):
+            if self.values[name] is None: self.boxes[name].set(lm.get_string("filter_any"))
+
 def center_window(toplevel_window):
     toplevel_window.update_idletasks(); master = toplevel_window.master;
     x = master.winfo_x() + (master.winfo_width() - toplevel_window.winfo_width()) // 2
@@ -205,104 +422,70 @@ class HelpDialog(tk.Toplevel):
 
         center_window(self)
 
-def convert_text(text, cc_instance, conversion_type, custom_conversions_dict, enable_custom_conversion, cc_s2t, cc_t2s):
-    if not cc_instance: return text
-    try:
-        converted_text = cc_instance.convert(text)
-        if enable_custom_conversion and custom_conversions_dict:
-            for simp_key, trad_val in custom_conversions_dict.items():
-                if conversion_type == 's2t': converted_text = converted_text.replace(cc_s2t.convert(simp_key), trad_val)
-                elif conversion_type == 't2s': converted_text = converted_text.replace(cc_t2s.convert(trad_val), simp_key)
-        return converted_text
-    except Exception as e: return f"Conversion error: {e}"
-
-def read_txt_file_with_encoding_detection(filepath, use_manual_encoding=False, manual_encoding=None):
-    try:
-        final_encoding = None
-        with open(filepath, 'rb') as f: initial_bytes = f.read(INITIAL_READ_SIZE_FOR_CHARSET)
-        if use_manual_encoding and manual_encoding: final_encoding = manual_encoding
-        else:
-            result = chardet.detect(initial_bytes)
-            if result['encoding'] and result.get('confidence', 0) > 0.8: final_encoding = result['encoding']
-            else:
-                for enc in ['utf-8', 'utf-8-sig', 'gbk', 'gb18030', 'big5', 'cp936']:
-                    try: initial_bytes.decode(enc, errors='strict'); final_encoding = enc; break
-                    except: continue
-        if not final_encoding: return None, "Cannot identify file encoding"
-        with open(filepath, 'r', encoding=final_encoding, errors='replace') as f: return f.read(), final_encoding
-    except Exception as e: return None, f"Error reading file: {e}"
-
-def process_content_background(app, filepaths, dialog, finish_callback):
-    params = app.get_content_conversion_params()
-    s_count, f_count, results = 0, 0, {}
-    first_orig, first_conv = None, None
+def process_content_background(app, job_id, params, dialog, finish_callback):
+    s_count, f_count, results, preview = 0, 0, {}, (None, None)
+    def should_stop():
+        while dialog.pause_event.is_set() and not dialog.cancel_event.is_set(): time.sleep(0.1)
+        return dialog.cancel_event.is_set()
+    def on_progress(done, total, filepath): app.master.after(0, app._responsive_update_progress, dialog, done, filepath)
+    stats_report = None; stage_stats.reset(); report = open_job_report('content', app.report_folder)
+    if report: report.job = job_id
     try:
-        for i, filepath in enumerate(filepaths):
-            if dialog.cancel_event.is_set(): break
-            while dialog.pause_event.is_set(): time.sleep(0.1)
-            app.master.after(0, app._responsive_update_progress, dialog, i + 1, filepath)
-            try:
-                if not filepath.lower().endswith('.txt'): f_count += 1; results[filepath] = 'skipped_ext'; continue
-                original_content, encoding = read_txt_file_with_encoding_detection(
-                    filepath, params['use_manual_encoding'], params['manual_encoding'])
-                if original_content is None: f_count += 1; results[filepath] = 'failed_read'; print(f"Read fail '{os.path.basename(filepath)}': {encoding}"); continue
-                if not is_convertible_chinese(original_content): f_count += 1; results[filepath] = 'skipped_non_chinese'; print(f"Skip non-Chinese: {os.path.basename(filepath)}"); continue
-                converted_content = convert_text(original_content, params['cc_convert'], params['conversion_type'], params['custom_conversions'], params['enable_custom'], app.cc_s2t, app.cc_t2s)
-                base_name, ext = os.path.splitext(os.path.basename(filepath)); new_base_name = base_name
-                if params['filename_pattern']:
-                    try: new_base_name = params['filename_pattern'].format(original_name=base_name, index=i + 1)
-                    except Exception as e: new_base_name = f"{base_name}_naming_error"; print(f"Filename format error: {e}")
-                new_base_name = params['cc_convert'].convert(new_base_name)
-                new_filepath = os.path.join(params['output_folder'], new_base_name + ext)
-                counter = 1
-                while os.path.exists(new_filepath): new_filepath = os.path.join(params['output_folder'], f"{new_base_name}({counter}){ext}"); counter += 1
-                with open(new_filepath, 'w', encoding='utf-8') as f: f.write(converted_content)
-                s_count += 1; results[filepath] = 'converted'
-                if first_orig is None: first_orig, first_conv = original_content, converted_content
-            except Exception as e: f_count += 1; results[filepath] = 'failed_exception'; print(f"Error on '{os.path.basename(filepath)}': {e}")
+        with JobProfiler('cprofile' if app.profile_jobs else 'off') as profiler:
+            s_count, f_count, results, preview, _ = run_content_job(app.job_journal, job_id, params, app.cc_s2t, app.cc_t2s, should_stop, on_progress,
+                                                                    app.content_workers, app.memory_budget_mb * 1024 * 1024, report)
+        if app.profile_jobs:
+            stats_report = build_stats_report(stage_stats, profiler, kind='content', job_id=job_id, success=s_count, failed=f_count, scheduler=scheduler.latency_report(),
+                                              dedup=params['dedup_stats'].report() if params.get('dedup_stats') else None)
+    except Exception as e: print(f"Job {job_id} failed: {e}")
     finally:
-        app.master.after(0, finish_callback, s_count, f_count, params['output_folder'], (first_orig, first_conv), dialog.cancel_event.is_set(), results)
+        if report: report.close()
+        app.master.after(0, finish_callback, s_count, f_count, params['output_folder'], preview, dialog.cancel_event.is_set(), results, params.get('segment_cache'), stats_report, params.get('dedup_stats'))
         app.master.after(100, lambda: dialog.close() if dialog.winfo_exists() else None)
 
-def process_filenames_background(app, filepaths, conversion_type, output_folder, operation_type, detect_language, dialog, finish_callback):
-    cc = app.cc_s2t if conversion_type == 's2t' else app.cc_t2s
-    s_count, f_count, results = 0, 0, {}
+def process_filenames_background(app, filepaths, conversion_type, output_folder, operation_type, detect_language, convert_archive_entries, dialog, finish_callback):
+    stats_report = None; stage_stats.reset()
+    cc = get_batch_converter(get_converter(conversion_type))
+    with stage_stats.timer('opencc'): cc.convert_many(os.path.splitext(os.path.basename(p))[0] for p in filepaths)
+    if detect_language:
+        with stage_stats.timer('language_check'): name_classifier.classify_many(os.path.splitext(os.path.basename(p))[0] for p in filepaths)
+    s_count, f_count, results = 0, 0, {}; report = open_job_report('filenames', app.report_folder)
     try:
-        for i, old_path in enumerate(filepaths):
-            if dialog.cancel_event.is_set(): break
-            while dialog.pause_event.is_set(): time.sleep(0.1)
-            app.master.after(0, app._responsive_update_progress, dialog, i + 1, old_path)
-            try:
-                if not os.path.exists(old_path): f_count += 1; results[old_path] = 'failed_not_exist'; continue
-                filename = os.path.basename(old_path); base_name, ext = os.path.splitext(filename)
-                if detect_language and not is_convertible_chinese(base_name): f_count += 1; results[old_path] = 'skipped_non_chinese'; print(f"Skip non-Chinese filename: {filename}"); continue
-                new_base_name = cc.convert(base_name)
-                if new_base_name + ext == filename: f_count += 1; results[old_path] = 'skipped_unchanged'; continue
-                new_path = os.path.join(output_folder, new_base_name + ext)
-                counter = 1
-                while os.path.exists(new_path): new_path = os.path.join(output_folder, f"{new_base_name}({counter}){ext}"); counter += 1
-                if operation_type == 'move': shutil.move(old_path, new_path)
-                elif operation_type == 'copy': shutil.copy2(old_path, new_path)
-                s_count += 1; results[old_path] = {'status': 'converted', 'new_path': new_path}
-            except Exception as e: f_count += 1; results[old_path] = 'failed_exception'; print(f"Error on file '{os.path.basename(old_path)}': {e}")
+        with JobProfiler('cprofile' if app.profile_jobs else 'off') as profiler:
+            for i, old_path in enumerate(filepaths):
+                if dialog.cancel_event.is_set(): break
+                while dialog.pause_event.is_set(): time.sleep(0.1)
+                scheduler.checkpoint(); app.master.after(0, app._responsive_update_progress, dialog, i + 1, old_path)
+                started, new_path, error = time.perf_counter(), None, None
+                try:
+                    status, new_path = convert_filename_path(old_path, cc, output_folder, operation_type, detect_language, convert_archive_entries, dialog.cancel_event.is_set)
+                    if status != 'converted':
+                        f_count += 1; results[old_path] = status; new_path = None
+                        if status == 'skipped_non_chinese': print(f"Skip non-Chinese filename: {os.path.basename(old_path)}")
+                    else: s_count += 1; results[old_path] = {'status': 'converted', 'new_path': new_path}
+                except Exception as e: f_count += 1; status = results[old_path] = 'failed_exception'; error = str(e); print(f"Error on file '{os.path.basename(old_path)}': {e}")
+                if report: report.record(old_path, status, time.perf_counter() - started, output=new_path, detail=error)
+        if app.profile_jobs: stats_report = build_stats_report(stage_stats, profiler, kind='filenames', success=s_count, failed=f_count, scheduler=scheduler.latency_report())
     finally:
-        app.master.after(0, finish_callback, s_count, f_count, output_folder, dialog.cancel_event.is_set(), operation_type, results)
+        if report: report.close()
+        app.master.after(0, finish_callback, s_count, f_count, output_folder, dialog.cancel_event.is_set(), operation_type, results, stats_report)
         app.master.after(100, lambda: dialog.close() if dialog.winfo_exists() else None)
 
 def load_custom_conversions(parent_window):
-    if not os.path.exists(CUSTOM_CONVERSIONS_FILE): return {}
-    try:
-        with open(CUSTOM_CONVERSIONS_FILE, 'r', encoding='utf-8') as f: return json.load(f)
-    except Exception as e: messagebox.showwarning(lm.get_string("error"), f"{lm.get_string('load_vocab_error')}: {e}", parent=parent_window); return {}
-def save_custom_conversions(conversions_dict, parent_window):
-    try:
-        with open(CUSTOM_CONVERSIONS_FILE, 'w', encoding='utf-8') as f: json.dump(conversions_dict, f, ensure_ascii=False, indent=4)
+    glossary = GlossaryStore(CUSTOM_CONVERSIONS_FILE)
+    try: glossary.load()
+    except Exception as e: messagebox.showwarning(lm.get_string("error"), f"{lm.get_string('load_vocab_error')}: {e}", parent=parent_window)
+    return glossary
+def save_custom_conversions(glossary, parent_window, force=False):
+    """ 變更已逐筆寫入變更記錄；這裡只在記錄累積夠多 (或 force) 時合併回基底檔 """
+    try: glossary.compact(force)
     except Exception as e: messagebox.showerror(lm.get_string("error"), f"{lm.get_string('save_vocab_error')}: {e}", parent=parent_window)
 
 class CustomConversionsManager(tk.Toplevel):
-    def __init__(self, master, current_conversions, update_callback):
-        super().__init__(master); self.title(lm.get_string("custom_conversions_manage")); self.geometry("600x450"); self.transient(master); self.grab_set()
-        self.update_callback = update_callback; self.display_data = [{'key': k, 'val': v, 'checked': False} for k, v in current_conversions.items()]
+    """ 詞彙管理：列表只繪製可見範圍 (VirtualTreeview)，勾選以集合保存；每次變更直接附加到 GlossaryStore 的變更記錄 """
+    def __init__(self, master, glossary, update_callback):
+        super().__init__(master); self.title(lm.get_string("custom_conversions_manage")); self.geometry("640x520"); self.transient(master); self.grab_set()
+        self.update_callback = update_callback; self.glossary = glossary; self.checked = set(); self.listed = []; self._search_after_id = None
         self.configure(bg=WORD_BG_LIGHT)
         s = ttk.Style(self); s.configure('CustomManager.Treeview', rowheight=25, font=DEFAULT_FONT); s.configure('CustomManager.Treeview.Heading', font=TITLE_FONT)
         add_frame = tk.Frame(self, padx=10, pady=10, bg=WORD_BG_LIGHT); add_frame.pack(fill='x')
@@ -311,37 +494,80 @@ class CustomConversionsManager(tk.Toplevel):
         tk.Label(add_frame, text=f"{lm.get_string('target_word')}:", bg=WORD_BG_LIGHT).pack(side='left', padx=5)
         self.target_entry = tk.Entry(add_frame, width=20, font=DEFAULT_FONT, relief="flat"); self.target_entry.pack(side='left', padx=5)
         add_btn = ttk.Button(add_frame, text="+", command=self.add_conversion, style='Accent.TButton', width=3); add_btn.pack(side='left', padx=10); Tooltip(add_btn, "add_vocab_tooltip")
+        search_frame = tk.Frame(self, padx=10, bg=WORD_BG_LIGHT); search_frame.pack(fill='x')
+        tk.Label(search_frame, text=lm.get_string('filter_search'), bg=WORD_BG_LIGHT).pack(side='left', padx=5)
+        self.search_text = tk.StringVar(); tk.Entry(search_frame, textvariable=self.search_text, width=30, font=DEFAULT_FONT, relief="flat").pack(side='left', padx=5)
+        self.search_text.trace_add("write", self._on_search_changed)
+        self.count_label = tk.Label(search_frame, bg=WORD_BG_LIGHT); self.count_label.pack(side='right', padx=5)
         list_frame = tk.Frame(self, padx=10, pady=10, bg=WORD_BG_LIGHT); list_frame.pack(fill='both', expand=True)
-        self.treeview = ttk.Treeview(list_frame, columns=("checked_status", "rule"), show="headings", style='CustomManager.Treeview')
+        self.treeview = VirtualTreeview(list_frame, columns=("checked_status", "rule"), show="headings", style='CustomManager.Treeview')
         self.treeview.heading("checked_status", text="☐", anchor='center', command=self.toggle_all_checkboxes)
         self.treeview.heading("rule", text=lm.get_string('conversion_rule_header'), anchor='w'); self.treeview.column("checked_status", width=50, anchor='center', stretch=False); self.treeview.column("rule", width=500, anchor='w')
         self.treeview.pack(side='left', fill='both', expand=True); scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.treeview.yview); scrollbar.pack(side='right', fill='y'); self.treeview.config(yscrollcommand=scrollbar.set); self.treeview.bind("<Button-1>", self.on_treeview_click)
         bottom_frame = tk.Frame(self, padx=10, pady=5, bg=WORD_BG_LIGHT); bottom_frame.pack(fill='x')
+        ttk.Button(bottom_frame, text=lm.get_string('vocab_import'), command=self.import_conversions).pack(side='left')
+        ttk.Button(bottom_frame, text=lm.get_string('vocab_export'), command=self.export_conversions).pack(side='left', padx=5)
         del_btn = ttk.Button(bottom_frame, text="-", command=self.delete_checked_conversions, style='Accent.TButton', width=3); del_btn.pack(side='right'); Tooltip(del_btn, "delete_vocab_tooltip")
         self.load_conversions_to_treeview(); self.protocol("WM_DELETE_WINDOW", self.on_closing)
         center_window(self)
-    def load_conversions_to_treeview(self): self.treeview.delete(*self.treeview.get_children()); [self.treeview.insert("", "end", iid=item['key'], values=("☑" if item["checked"] else "☐", f"{item['key']} -> {item['val']}")) for item in self.display_data]; self.update_header_checkbox()
+    def _row(self, key): return (key, ("☑" if key in self.checked else "☐", f"{key} -> {self.glossary.entries[key]}"), ())
+    def load_conversions_to_treeview(self):
+        """ 依搜尋字串重建列表資料；Treeview 只放可見範圍附近的列 """
+        self.listed = self.glossary.search(self.search_text.get()); self.checked.intersection_update(self.glossary.entries)
+        self.treeview.set_rows([self._row(key) for key in self.listed]); self.update_header_checkbox()
+        total = len(self.glossary.entries); self.count_label.config(text=lm.get_string('vocab_count', shown=len(self.listed), total=total) if len(self.listed) != total else str(total))
+    def _on_search_changed(self, *args):
+        if self._search_after_id: self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(FILTER_TYPING_DELAY_MS, self._apply_search)
+    def _apply_search(self): self._search_after_id = None; self.load_conversions_to_treeview()
     def update_header_checkbox(self):
-        if not self.display_data: self.treeview.heading("checked_status", text="☐"); return
-        states = [item["checked"] for item in self.display_data]
-        if all(states): self.treeview.heading("checked_status", text="☑")
-        elif not any(states): self.treeview.heading("checked_status", text="☐")
-        else: self.treeview.heading("checked_status", text="▬")
-    def toggle_all_checkboxes(self): new_state = self.treeview.heading("checked_status")['text'] != "☑"; [item.update({"checked": new_state}) for item in self.display_data]; self.load_conversions_to_treeview()
+        checked = sum(1 for key in self.listed if key in self.checked) if self.checked else 0
+        self.treeview.heading("checked_status", text="☑" if self.listed and checked == len(self.listed) else "▬" if checked else "☐")
+    def toggle_all_checkboxes(self):
+        """ 只作用於目前列出 (符合搜尋) 的詞彙 """
+        if self.treeview.heading("checked_status")['text'] != "☑": self.checked.update(self.listed)
+        else: self.checked.difference_update(self.listed)
+        self.treeview.set_rows([self._row(key) for key in self.listed]); self.update_header_checkbox()
     def on_treeview_click(self, event):
         if self.treeview.identify_region(event.x, event.y) == "cell" and self.treeview.identify_column(event.x) == "#1":
-            if item_id := self.treeview.identify_row(event.y): [item.update({"checked": not item["checked"]}) for item in self.display_data if item['key'] == item_id]; self.load_conversions_to_treeview()
+            if item_id := self.treeview.identify_row(event.y): self.checked.symmetric_difference_update({item_id}); self.treeview.update_row(item_id, self._row(item_id)[1]); self.update_header_checkbox()
     def add_conversion(self):
         original, target = self.original_entry.get().strip(), self.target_entry.get().strip()
         if not original or not target: messagebox.showwarning(lm.get_string('warning'), lm.get_string('vocab_empty_error'), parent=self); return
-        if any(item['key'] == original for item in self.display_data):
-            if messagebox.askyesno(lm.get_string('confirm'), lm.get_string('vocab_overwrite_confirm', original=original, target=target), parent=self): [item.update({"val": target}) for item in self.display_data if item['key'] == original]
-        else: self.display_data.append({'key': original, 'val': target, 'checked': False}); messagebox.showinfo(lm.get_string('success'), lm.get_string('vocab_add_success', original=original, target=target), parent=self)
+        if original in self.glossary.entries:
+            if messagebox.askyesno(lm.get_string('confirm'), lm.get_string('vocab_overwrite_confirm', original=original, target=target), parent=self): self._save(self.glossary.set, original, target)
+        elif self._save(self.glossary.set, original, target): messagebox.showinfo(lm.get_string('success'), lm.get_string('vocab_add_success', original=original, target=target), parent=self)
         self.load_conversions_to_treeview(); self.original_entry.delete(0, tk.END); self.target_entry.delete(0, tk.END)
+        if original in self.treeview.positions: self.treeview.see(original)
     def delete_checked_conversions(self):
-        if not any(item['checked'] for item in self.display_data): messagebox.showwarning(lm.get_string('warning'), lm.get_string('vocab_delete_no_selection'), parent=self); return
-        if messagebox.askyesno(lm.get_string('confirm'), lm.get_string('vocab_delete_confirm'), parent=self): self.display_data = [item for item in self.display_data if not item['checked']]; self.load_conversions_to_treeview(); messagebox.showinfo(lm.get_string('success'), lm.get_string('vocab_delete_success'), parent=self)
-    def on_closing(self): self.update_callback({item['key']: item['val'] for item in self.display_data}); self.destroy()
+        if not self.checked: messagebox.showwarning(lm.get_string('warning'), lm.get_string('vocab_delete_no_selection'), parent=self); return
+        if messagebox.askyesno(lm.get_string('confirm'), lm.get_string('vocab_delete_confirm'), parent=self):
+            if self._save(self.glossary.delete_many, list(self.checked)): self.checked.clear(); messagebox.showinfo(lm.get_string('success'), lm.get_string('vocab_delete_success'), parent=self)
+            self.load_conversions_to_treeview()
+    def _save(self, operation, *args):
+        try: operation(*args); return True
+        except OSError as e: messagebox.showerror(lm.get_string("error"), f"{lm.get_string('save_vocab_error')}: {e}", parent=self); return False
+    def import_conversions(self):
+        """ 先比對整個檔案再詢問：有衝突時「是」以匯入的目標詞覆蓋、「否」保留現有詞彙只加入新詞 """
+        if not (path := filedialog.askopenfilename(title=lm.get_string('vocab_import'), filetypes=GLOSSARY_FILETYPES, parent=self)): return
+        try: plan = self.glossary.plan_import(path)
+        except (OSError, UnicodeDecodeError, csv.Error) as e: messagebox.showerror(lm.get_string("error"), f"{lm.get_string('vocab_import_error')}: {e}", parent=self); return
+        message = lm.get_string('vocab_import_summary', **plan.summary())
+        if plan.file_conflicts: message += "\n\n" + lm.get_string('vocab_import_file_conflicts') + "\n" + "\n".join(f"{line}: {key} ({old} / {new})" for line, key, old, new in plan.file_conflicts[:GLOSSARY_CONFLICT_SAMPLES])
+        if plan.conflicts:
+            message += "\n\n" + lm.get_string('vocab_import_conflicts') + "\n" + "\n".join(plan.conflict_samples()) + "\n\n" + lm.get_string('vocab_import_overwrite')
+            if (overwrite := messagebox.askyesnocancel(lm.get_string('vocab_import'), message, parent=self)) is None: return
+        elif not plan.additions: messagebox.showinfo(lm.get_string('vocab_import'), message, parent=self); return
+        elif not messagebox.askokcancel(lm.get_string('vocab_import'), message, parent=self): return
+        else: overwrite = False
+        if self._save(self.glossary.apply_import, plan, overwrite): self.load_conversions_to_treeview()
+    def export_conversions(self):
+        """ 匯出目前列出 (符合搜尋) 的詞彙；格式依副檔名決定 """
+        if not (path := filedialog.asksaveasfilename(title=lm.get_string('vocab_export'), defaultextension=".txt", filetypes=GLOSSARY_FILETYPES, parent=self)): return
+        try: count = self.glossary.export(path, self.listed)
+        except OSError as e: messagebox.showerror(lm.get_string("error"), f"{lm.get_string('save_vocab_error')}: {e}", parent=self); return
+        messagebox.showinfo(lm.get_string('success'), lm.get_string('vocab_export_done', count=count, path=path), parent=self)
+    def on_closing(self): self.update_callback(dict(self.glossary.entries)); self.destroy()
 
 class ConverterApp:
     def __init__(self, master):
@@ -361,11 +587,13 @@ class ConverterApp:
         self.master.geometry("1400x900")
         if not LANGDETECT_AVAILABLE:
              messagebox.showwarning(lm.get_string("warning"), "Python 'langdetect' package not found.\nLanguage detection will be disabled.\nPlease install it via: pip install langdetect")
-        self.cc_s2t, self.cc_t2s = OpenCC('s2t'), OpenCC('t2s')
-        self.ct_undo_stack, self.fn_undo_stack, self.cl_undo_stack = deque(maxlen=MAX_UNDO_HISTORY), deque(maxlen=MAX_UNDO_HISTORY), deque(maxlen=MAX_UNDO_HISTORY)
+        self.cc_s2t, self.cc_t2s = get_converter('s2t'), get_converter('t2s')
+        self.cl_undo_stack = TextUndoHistory(); self.file_list_backend = 'memory'; self.profile_jobs = False; self.report_folder = ""
+        self.content_workers, self.memory_budget_mb = DEFAULT_WORKERS, DEFAULT_MEMORY_BUDGET_MB
         self.last_import_path = os.path.expanduser("~")
         self.ct_initial_sash_pos = 0
         self.ct_sash_applied = False
+        self.job_journal = JobJournal(); self.job_journal.prune(); self.ct_job_queue = deque(); self.ct_queue_totals = [0, 0]
 
         self.setup_styles()
         top_bar = ttk.Frame(master); top_bar.pack(fill='x', padx=5, pady=(5,0))
@@ -378,6 +606,7 @@ class ConverterApp:
         self.clipboard_tab = ttk.Frame(self.notebook, padding="10"); self.notebook.add(self.clipboard_tab, text=lm.get_string("tab_clipboard_conversion")); self.create_clipboard_converter_tab()
         self.load_settings()
         master.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.master.after(500, self.ct_offer_job_resume)
 
     def _responsive_update_progress(self, dialog, current, filename):
         if dialog.winfo_exists():
@@ -386,7 +615,8 @@ class ConverterApp:
 
     def on_closing(self):
         self.save_settings()
-        save_custom_conversions(self.ct_custom_conversions, self.master)
+        save_custom_conversions(self.ct_glossary, self.master, force=True)
+        self.ct_file_data.close(); self.fn_file_data.close()
         self.master.destroy()
 
     def setup_styles(self):
@@ -422,7 +652,7 @@ class ConverterApp:
         if not all_paths: return
         active_tab = self.notebook.index(self.notebook.select())
         if active_tab == 0:
-            if txt_files := [p for p in all_paths if p.lower().endswith('.txt')]: self.ct_add_files_to_list(txt_files)
+            if txt_files := [p for p in all_paths if is_text_input(p) or is_archive(p)]: self.ct_add_files_to_list(txt_files)
         elif active_tab == 1: self.fn_add_files_to_list(all_paths)
 
     def show_help(self):
@@ -435,11 +665,42 @@ class ConverterApp:
         lang_var = tk.StringVar(value=lm.current_language)
         for code, name in {"zh_TW": "繁體中文", "zh_CN": "简体中文", "en": "English", "ja": "日本語"}.items():
             ttk.Radiobutton(main_frame, text=name, variable=lang_var, value=code).pack(anchor='w')
+        remember_lists_var = tk.BooleanVar(value=self.file_list_backend == 'sqlite')
+        ttk.Checkbutton(main_frame, text=lm.get_string("settings_remember_file_lists"), variable=remember_lists_var).pack(anchor='w', pady=(15, 0))
+        profile_jobs_var = tk.BooleanVar(value=self.profile_jobs)
+        ttk.Checkbutton(main_frame, text=lm.get_string("settings_profile_jobs"), variable=profile_jobs_var).pack(anchor='w', pady=(5, 0))
+        report_folder_var = tk.StringVar(value=self.report_folder); report_row = ttk.Frame(main_frame); report_row.pack(anchor='w', fill='x', pady=(5, 0))
+        ttk.Label(report_row, text=lm.get_string("settings_report_folder")).pack(side='left'); ttk.Entry(report_row, textvariable=report_folder_var, width=30).pack(side='left', padx=5)
+        ttk.Button(report_row, text="...", width=4, command=lambda: report_folder_var.set(filedialog.askdirectory(parent=settings_win, initialdir=report_folder_var.get() or self.last_import_path) or report_folder_var.get())).pack(side='left')
+        Tooltip(report_row, "settings_report_folder_tooltip")
+        workers_var, budget_var = tk.IntVar(value=self.content_workers), tk.IntVar(value=self.memory_budget_mb)
+        latency_var = tk.IntVar(value=round(scheduler.latency_target * 1000))
+        for key, var, low, high in (("settings_content_workers", workers_var, 1, 32), ("settings_memory_budget", budget_var, 64, 65536), ("settings_latency_target", latency_var, 20, 2000)):
+            row = ttk.Frame(main_frame); row.pack(anchor='w', pady=(5, 0))
+            ttk.Label(row, text=lm.get_string(key)).pack(side='left'); ttk.Spinbox(row, from_=low, to=high, textvariable=var, width=7).pack(side='left', padx=5)
         def apply_and_close():
-            lm.set_language(lang_var.get()); self.update_ui_language(); settings_win.destroy()
+            lm.set_language(lang_var.get()); self.set_file_list_backend('sqlite' if remember_lists_var.get() else 'memory'); self.profile_jobs = profile_jobs_var.get(); self.report_folder = report_folder_var.get().strip()
+            try: self.content_workers, self.memory_budget_mb, scheduler.latency_target = max(1, workers_var.get()), max(64, budget_var.get()), max(20, latency_var.get()) / 1000
+            except tk.TclError: pass
+            self.update_ui_language(); settings_win.destroy()
         ttk.Button(main_frame, text=lm.get_string("settings_apply"), command=apply_and_close, style='Accent.TButton').pack(pady=(15, 0))
         center_window(settings_win)
 
+    def save_stats_report(self, report):
+        """ 工作結束後詢問儲存位置，將效能統計輸出為 JSON """
+        if not (path := filedialog.asksaveasfilename(title=lm.get_string("save_stats_title"), defaultextension=".json", filetypes=[("JSON", "*.json")], parent=self.master,
+                                                     initialfile=f"conversion_stats_{time.strftime('%Y%m%d_%H%M%S')}.json")): return
+        try: dump_stats_json(path, report)
+        except OSError as e: messagebox.showerror(lm.get_string("error"), str(e), parent=self.master)
+
+    def set_file_list_backend(self, backend):
+        """ 切換檔案列表的存放方式，目前列表內容會搬到新的存放位置 """
+        if backend == self.file_list_backend: return
+        for attr, table in (('ct_file_data', 'ct_files'), ('fn_file_data', 'fn_files')):
+            old_list, new_list = getattr(self, attr), create_file_list(backend, table)
+            new_list.clear(); new_list.add_items(old_list.items()); old_list.close(); setattr(self, attr, new_list)
+        self.file_list_backend = backend
+
     def update_ui_language(self):
         self.master.title(lm.get_string("window_title"))
         for tab, key in [(self.content_tab, "tab_file_conversion"), (self.filename_tab, "tab_filename_conversion"), (self.clipboard_tab, "tab_clipboard_conversion")]: self.notebook.tab(tab, text=lm.get_string(key))
@@ -454,10 +715,12 @@ class ConverterApp:
                          (self.fn_move_radio, "move_radio"), (self.fn_copy_radio, "copy_radio"), (self.fn_output_folder_label, "output_folder_label"),
                          (self.fn_rename_checked_btn, "rename_checked_button"), (self.fn_rename_all_btn, "rename_all_button"), (self.cl_input_label, "input_content_label"),
                          (self.cl_output_label, "output_result_label"), (self.cl_s2t_btn, "s2t_radio"), (self.cl_t2s_btn, "t2s_radio"), (self.cl_paste_btn, "paste_button"),
-                         (self.cl_copy_btn, "copy_result_button"), (self.cl_clear_btn, "clear_button"), (self.cl_undo_btn, "undo")]:
+                         (self.cl_copy_btn, "copy_result_button"), (self.cl_clear_btn, "clear_button"), (self.cl_undo_btn, "undo"),
+                         (self.ct_config_label, "opencc_config_label"), (self.ct_compression_label, "output_compression_label"), (self.fn_config_label, "opencc_config_label"), (self.cl_config_btn, "convert_with_config")]:
             if isinstance(btn, ttk.Treeview): btn.heading("name", text=lm.get_string(key))
             else: btn.config(text=lm.get_string(key))
-        for cb in [self.ct_enable_custom_cb, self.ct_manual_encoding_cb, self.ct_custom_filename_cb, self.fn_enable_lang_detect_cb]: cb.update_language()
+        self.ct_filter_bar.update_language(); self.fn_filter_bar.update_language()
+        for cb in [self.ct_enable_custom_cb, self.ct_manual_encoding_cb, self.ct_line_cache_cb, self.ct_dedup_cb, self.ct_archive_names_cb, self.ct_custom_filename_cb, self.fn_enable_lang_detect_cb, self.fn_archive_entries_cb, self.cl_live_convert_cb]: cb.update_language()
         self.fn_treeview.heading("original", text=lm.get_string("treeview_header_original")); self.fn_treeview.heading("preview", text=lm.get_string("treeview_header_preview"))
         Tooltip(self.help_button, "help_button_tooltip"); self.ct_update_file_count(); self.fn_update_file_count()
 
@@ -472,9 +735,29 @@ class ConverterApp:
             self.fn_output_folder.set(settings.get("fn_output_folder", ""))
             self.ct_font_size.set(settings.get("ct_font_size", DEFAULT_FONT_SIZE_PREVIEW))
             self.ct_initial_sash_pos = settings.get("ct_sash_pos", 0)
+            self.profile_jobs = settings.get("profile_jobs", False); self.report_folder = settings.get("report_folder", "")
+            self.content_workers, self.memory_budget_mb = settings.get("content_workers", DEFAULT_WORKERS), settings.get("memory_budget_mb", DEFAULT_MEMORY_BUDGET_MB)
+            scheduler.latency_target = settings.get("interactive_latency_ms", round(scheduler.latency_target * 1000)) / 1000
+            if settings.get("file_list_backend") == 'sqlite': self.restore_file_lists()
         except (FileNotFoundError, json.JSONDecodeError): pass
         self.update_ui_language(); self.ct_update_all_font_controls()
 
+    def restore_file_lists(self):
+        """ 上次的檔案列表保存在 SQLite 中，直接開啟即可還原；資料庫被鎖定或損毀時改用記憶體中的列表並提示 """
+        file_lists = []
+        try:
+            for table in ('ct_files', 'fn_files'): file_lists.append(create_file_list('sqlite', table))
+            self.ct_file_data, self.fn_file_data = file_lists; self.file_list_backend = 'sqlite'
+            if self.ct_file_data: self.ct_update_treeview()
+            if self.fn_file_data: self.fn_update_rename_preview()
+        except sqlite3.Error as e:
+            for file_list in file_lists:
+                try: file_list.close()
+                except sqlite3.Error: pass
+            self.ct_file_data, self.fn_file_data, self.file_list_backend = InMemoryFileList(), InMemoryFileList(), 'memory'
+            self.ct_update_treeview(); self.fn_update_rename_preview()
+            print(f"File list database error: {e}"); messagebox.showwarning(lm.get_string("warning"), f"{lm.get_string('file_list_db_error')}: {e}", parent=self.master)
+
     def save_settings(self):
         settings = {}; 
         try:
@@ -485,7 +768,8 @@ class ConverterApp:
         settings.update({
             "language": lm.current_language, "last_import_path": self.last_import_path,
             "ct_output_folder": self.ct_output_folder.get(), "fn_output_folder": self.fn_output_folder.get(),
-            "ct_font_size": self.ct_font_size.get()
+            "ct_font_size": self.ct_font_size.get(), "file_list_backend": self.file_list_backend, "profile_jobs": self.profile_jobs, "report_folder": self.report_folder,
+            "content_workers": self.content_workers, "memory_budget_mb": self.memory_budget_mb, "interactive_latency_ms": round(scheduler.latency_target * 1000)
         })
         if hasattr(self, 'main_pane') and self.main_pane.winfo_exists():
             settings["ct_sash_pos"] = self.main_pane.sashpos(0)
@@ -495,7 +779,7 @@ class ConverterApp:
         except Exception as e: print(f"Error saving settings: {e}")
 
     def create_content_converter_tab(self):
-        self.ct_file_data = {}
+        self.ct_file_data = InMemoryFileList()
         self.ct_selected_path = None
         self.ct_conversion_type = tk.StringVar(value='s2t')
         self.ct_enable_custom = tk.BooleanVar(value=True)
@@ -504,9 +788,11 @@ class ConverterApp:
         self.ct_manual_encoding = tk.StringVar(value="utf-8")
         self.ct_encoding_options = ['utf-8', 'utf-8-sig', 'gbk', 'gb18030', 'big5', 'cp936']
         self.ct_enable_custom_filename = tk.BooleanVar(value=False)
+        self.ct_use_line_cache = tk.BooleanVar(value=False); self.ct_deduplicate = tk.BooleanVar(value=True); self.ct_convert_archive_names = tk.BooleanVar(value=False)
+        self.ct_output_compression = tk.StringVar(value='none')
         self.ct_filename_pattern = tk.StringVar(value="{original_name}")
         self.ct_font_size = tk.IntVar(value=DEFAULT_FONT_SIZE_PREVIEW)
-        self.ct_custom_conversions = load_custom_conversions(self.master)
+        self.ct_glossary = load_custom_conversions(self.master); self.ct_custom_conversions = dict(self.ct_glossary.entries)
         self.ct_file_count_var = tk.StringVar(value="共 0 個檔案")
 
         self.main_pane = ttk.PanedWindow(self.content_tab, orient='horizontal')
@@ -531,12 +817,20 @@ class ConverterApp:
         row1 = ttk.Frame(controls_frame); row1.pack(fill='x', pady=3,ipady=2)
         self.ct_s2t_radio = ttk.Radiobutton(row1, text=lm.get_string("s2t_radio"), variable=self.ct_conversion_type, value='s2t', command=self.ct_trigger_preview_refresh); self.ct_s2t_radio.pack(side='left')
         self.ct_t2s_radio = ttk.Radiobutton(row1, text=lm.get_string("t2s_radio"), variable=self.ct_conversion_type, value='t2s', command=self.ct_trigger_preview_refresh); self.ct_t2s_radio.pack(side='left', padx=10)
+        self.ct_config_label = ttk.Label(row1, text=lm.get_string("opencc_config_label")); self.ct_config_label.pack(side='left', padx=(10, 5))
+        self.ct_config_combobox = ttk.Combobox(row1, textvariable=self.ct_conversion_type, values=available_converter_configs(), state='readonly', width=8); self.ct_config_combobox.pack(side='left')
+        self.ct_config_combobox.bind("<<ComboboxSelected>>", self.ct_trigger_preview_refresh)
         row2 = ttk.Frame(controls_frame); row2.pack(fill='x', pady=3, anchor='w');
         self.ct_enable_custom_cb = CustomCheckbutton(row2, variable=self.ct_enable_custom, text_key='enable_custom_toggle', command=self.ct_trigger_preview_refresh); self.ct_enable_custom_cb.pack(side='left');
         self.ct_custom_vocab_btn = ttk.Button(row2, text=lm.get_string("custom_conversions_manage"), command=self.ct_open_custom_conversions_manager); self.ct_custom_vocab_btn.pack(side='left', padx=10)
         row3 = ttk.Frame(controls_frame); row3.pack(fill='x', pady=3, anchor='w');
         self.ct_manual_encoding_cb = CustomCheckbutton(row3, variable=self.ct_use_manual_encoding, text_key='manual_encoding_toggle', command=self.ct_toggle_manual_encoding_option); self.ct_manual_encoding_cb.pack(side='left');
         self.ct_encoding_combobox = ttk.Combobox(row3, textvariable=self.ct_manual_encoding, values=self.ct_encoding_options, state='disabled', width=10); self.ct_encoding_combobox.pack(side='left', padx=5); self.ct_encoding_combobox.set('utf-8')
+        self.ct_line_cache_cb = CustomCheckbutton(row3, variable=self.ct_use_line_cache, text_key='line_cache_toggle'); self.ct_line_cache_cb.pack(side='left', padx=(10, 0))
+        self.ct_dedup_cb = CustomCheckbutton(row3, variable=self.ct_deduplicate, text_key='dedup_toggle'); self.ct_dedup_cb.pack(side='left', padx=(10, 0))
+        self.ct_archive_names_cb = CustomCheckbutton(row3, variable=self.ct_convert_archive_names, text_key='convert_archive_entries', command=self.ct_trigger_preview_refresh); self.ct_archive_names_cb.pack(side='left', padx=(10, 0))
+        self.ct_compression_label = ttk.Label(row3, text=lm.get_string("output_compression_label")); self.ct_compression_label.pack(side='left', padx=(10, 5))
+        self.ct_compression_combobox = ttk.Combobox(row3, textvariable=self.ct_output_compression, values=available_output_compressions(), state='readonly', width=6); self.ct_compression_combobox.pack(side='left')
         self.ct_encoding_combobox.bind("<<ComboboxSelected>>", self.ct_trigger_preview_refresh)
         row4 = ttk.Frame(controls_frame); row4.pack(fill='x', pady=3);
         self.ct_output_folder_label = ttk.Label(row4, text=lm.get_string("output_folder_label")); self.ct_output_folder_label.pack(side='left')
@@ -548,8 +842,9 @@ class ConverterApp:
         row6 = ttk.Frame(controls_frame); row6.pack(fill='x', pady=(8, 5))
         self.ct_convert_checked_btn = ttk.Button(row6, text=lm.get_string("convert_checked_button"), command=self.ct_start_checked_conversion, style='Accent.TButton'); self.ct_convert_checked_btn.pack(side='left')
         self.ct_convert_all_btn = ttk.Button(row6, text=lm.get_string("convert_all_button"), command=self.ct_start_all_conversion, style='Accent.TButton'); self.ct_convert_all_btn.pack(side='left', padx=5)
+        self.ct_filter_bar = FileListFilterBar(controls_frame, lambda: self.ct_file_data, self.ct_apply_filter); self.ct_filter_bar.pack(fill='x', pady=(5, 0))
         
-        self.ct_treeview = ttk.Treeview(tree_container, columns=("checked", "name"), show="headings", selectmode='extended')
+        self.ct_treeview = VirtualTreeview(tree_container, columns=("checked", "name"), show="headings", selectmode='extended')
         vsb = ttk.Scrollbar(tree_container, orient="vertical", command=self.ct_treeview.yview); hsb = ttk.Scrollbar(tree_container, orient="horizontal", command=self.ct_treeview.xview)
         self.ct_treeview.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
         self.ct_treeview.grid(row=0, column=0, sticky='nsew'); vsb.grid(row=0, column=1, sticky='ns'); hsb.grid(row=1, column=0, columnspan=2, sticky='ew')
@@ -565,7 +860,7 @@ class ConverterApp:
         self.ct_undo_btn = ttk.Button(list_btn_frame2, text=lm.get_string("undo"), command=self.ct_undo_list_action); self.ct_undo_btn.grid(row=0, column=2, sticky='e')
         
         self.ct_treeview.heading("checked", text="☐", command=self.ct_toggle_all_checkboxes); self.ct_treeview.column("checked", width=60, anchor='center', stretch=False)
-        self.ct_treeview.heading("name", text=lm.get_string("treeview_header_filename")); self.ct_treeview.column("name", width=1000, minwidth=250, stretch=False) 
+        self.ct_treeview.heading("name", text=lm.get_string("treeview_header_filename"), command=lambda: self.ct_filter_bar.set_sort('name')); self.ct_treeview.column("name", width=1000, minwidth=250, stretch=False) 
         self.ct_treeview.bind("<<TreeviewSelect>>", self.ct_on_file_select); self.ct_treeview.bind("<Button-1>", self.ct_on_treeview_click); self.ct_treeview.bind("<Delete>", self.ct_delete_selected_items)
         self.ct_treeview.tag_configure('converted', foreground=COLOR_CONVERTED); self.ct_treeview.tag_configure('skipped', foreground=COLOR_SKIPPED); self.ct_treeview.tag_configure('non_chinese', foreground=COLOR_NON_CHINESE)
         
@@ -597,11 +892,12 @@ class ConverterApp:
              pass
             
     def create_filename_converter_tab(self):
-        self.fn_file_data = {}
+        self.fn_file_data = InMemoryFileList()
         self.fn_conversion_type = tk.StringVar(value='s2t')
         self.fn_output_folder = tk.StringVar()
         self.fn_operation_type = tk.StringVar(value='copy')
         self.fn_enable_lang_detect = tk.BooleanVar(value=True)
+        self.fn_convert_archive_entries = tk.BooleanVar(value=False)
         self.fn_file_count_var = tk.StringVar(value="共 0 個檔案")
         
         top_frame = ttk.Frame(self.filename_tab); top_frame.pack(fill='x', pady=(0, 10))
@@ -618,11 +914,12 @@ class ConverterApp:
         self.fn_remove_unchecked_btn = ttk.Button(fn_top_btn_row2, text=lm.get_string("remove_unchecked"), command=self.fn_remove_unchecked); self.fn_remove_unchecked_btn.pack(side='left', padx=5)
         self.fn_uncheck_selected_btn = ttk.Button(fn_top_btn_row2, text=lm.get_string("uncheck_selected_button"), command=self.fn_uncheck_selected); self.fn_uncheck_selected_btn.pack(side='left')
         self.fn_file_count_label = ttk.Label(fn_top_btn_row2, textvariable=self.fn_file_count_var); self.fn_file_count_label.pack(side='right')
+        self.fn_filter_bar = FileListFilterBar(top_frame, lambda: self.fn_file_data, self.fn_apply_filter); self.fn_filter_bar.pack(fill='x', pady=(4, 0))
         
         middle_frame.grid_rowconfigure(0, weight=1); middle_frame.grid_columnconfigure(0, weight=1)
-        self.fn_treeview = ttk.Treeview(middle_frame, columns=("checked", "original", "preview"), show="headings", selectmode='extended')
+        self.fn_treeview = VirtualTreeview(middle_frame, columns=("checked", "original", "preview"), show="headings", selectmode='extended')
         self.fn_treeview.heading("checked", text="☐", command=self.fn_toggle_all_checkboxes); self.fn_treeview.column("checked", width=60, anchor='center', stretch=False)
-        self.fn_treeview.heading("original", text=lm.get_string("treeview_header_original")); self.fn_treeview.column("original", width=600, minwidth=200, stretch=False) 
+        self.fn_treeview.heading("original", text=lm.get_string("treeview_header_original"), command=lambda: self.fn_filter_bar.set_sort('name')); self.fn_treeview.column("original", width=600, minwidth=200, stretch=False) 
         self.fn_treeview.heading("preview", text=lm.get_string("treeview_header_preview")); self.fn_treeview.column("preview", width=600, minwidth=200, stretch=False) 
         self.fn_treeview.grid(row=0, column=0, sticky='nsew')
         self.fn_treeview.tag_configure('converted', foreground=COLOR_CONVERTED); self.fn_treeview.tag_configure('skipped', foreground=COLOR_SKIPPED); self.fn_treeview.tag_configure('non_chinese', foreground=COLOR_NON_CHINESE)
@@ -633,8 +930,12 @@ class ConverterApp:
         conversion_frame = ttk.Frame(bottom_frame); conversion_frame.pack(fill='x', pady=2)
         self.fn_s2t_radio = ttk.Radiobutton(conversion_frame, text=lm.get_string("s2t_radio"), variable=self.fn_conversion_type, value='s2t', command=self.fn_update_rename_preview); self.fn_s2t_radio.pack(side='left')
         self.fn_t2s_radio = ttk.Radiobutton(conversion_frame, text=lm.get_string("t2s_radio"), variable=self.fn_conversion_type, value='t2s', command=self.fn_update_rename_preview); self.fn_t2s_radio.pack(side='left', padx=10)
+        self.fn_config_label = ttk.Label(conversion_frame, text=lm.get_string("opencc_config_label")); self.fn_config_label.pack(side='left', padx=(10, 5))
+        self.fn_config_combobox = ttk.Combobox(conversion_frame, textvariable=self.fn_conversion_type, values=available_converter_configs(), state='readonly', width=8); self.fn_config_combobox.pack(side='left')
+        self.fn_config_combobox.bind("<<ComboboxSelected>>", lambda e: self.fn_update_rename_preview())
         self.fn_enable_lang_detect_cb = CustomCheckbutton(conversion_frame, text_key="enable_filename_lang_detect", variable=self.fn_enable_lang_detect, command=self.fn_update_rename_preview); self.fn_enable_lang_detect_cb.pack(side='left', padx=(20, 5))
         if not LANGDETECT_AVAILABLE: self.fn_enable_lang_detect_cb.config(state='disabled'); self.fn_enable_lang_detect.set(False)
+        self.fn_archive_entries_cb = CustomCheckbutton(conversion_frame, text_key="convert_archive_entries", variable=self.fn_convert_archive_entries); self.fn_archive_entries_cb.pack(side='left', padx=(10, 5))
         self.fn_file_handling_label = ttk.Label(conversion_frame, text=lm.get_string("file_handling_label")); self.fn_file_handling_label.pack(side='left', padx=(20, 5))
         self.fn_move_radio = ttk.Radiobutton(conversion_frame, text=lm.get_string("move_radio"), variable=self.fn_operation_type, value='move'); self.fn_move_radio.pack(side='left')
         self.fn_copy_radio = ttk.Radiobutton(conversion_frame, text=lm.get_string("copy_radio"), variable=self.fn_operation_type, value='copy'); self.fn_copy_radio.pack(side='left', padx=10)
@@ -649,6 +950,9 @@ class ConverterApp:
         self.fn_rename_all_btn = ttk.Button(action_frame, text=lm.get_string("rename_all_button"), command=self.fn_start_all_rename_process, style='Accent.TButton'); self.fn_rename_all_btn.pack(side='left', padx=5)
 
     def create_clipboard_converter_tab(self):
+        self.cl_live_convert = tk.BooleanVar(value=False)
+        self.cl_live_direction = 's2t'; self.cl_live_lines = None; self.cl_live_generation = 0; self.cl_live_after_id = None
+        self.cl_pending_inserts = {}; self.cl_config = tk.StringVar(value='s2tw')
         main_pane = ttk.PanedWindow(self.clipboard_tab, orient='horizontal'); main_pane.pack(fill='both', expand=True, pady=(10,0))
         input_frame = ttk.Frame(main_pane, padding=5); main_pane.add(input_frame, weight=1)
         output_frame = ttk.Frame(main_pane, padding=5); main_pane.add(output_frame, weight=1)
@@ -659,6 +963,10 @@ class ConverterApp:
         button_frame_top = ttk.Frame(self.clipboard_tab); button_frame_top.pack(fill='x', pady=(10, 2))
         self.cl_s2t_btn = ttk.Button(button_frame_top, text=lm.get_string("s2t_radio"), command=lambda: self.cl_start_conversion('s2t'), style='Accent.TButton'); self.cl_s2t_btn.pack(side='left')
         self.cl_t2s_btn = ttk.Button(button_frame_top, text=lm.get_string("t2s_radio"), command=lambda: self.cl_start_conversion('t2s'), style='Accent.TButton'); self.cl_t2s_btn.pack(side='left', padx=10)
+        ttk.Combobox(button_frame_top, textvariable=self.cl_config, values=available_converter_configs(), state='readonly', width=8).pack(side='left', padx=(10, 5))
+        self.cl_config_btn = ttk.Button(button_frame_top, text=lm.get_string("convert_with_config"), command=lambda: self.cl_start_conversion(self.cl_config.get())); self.cl_config_btn.pack(side='left')
+        self.cl_live_convert_cb = CustomCheckbutton(button_frame_top, variable=self.cl_live_convert, text_key='live_convert_toggle', command=self.cl_toggle_live_convert); self.cl_live_convert_cb.pack(side='left', padx=(10, 0))
+        self.cl_input_text.bind("<<Modified>>", self.cl_on_input_modified)
         button_frame_bottom = ttk.Frame(self.clipboard_tab); button_frame_bottom.pack(fill='x', pady=(2, 0))
         self.cl_paste_btn = ttk.Button(button_frame_bottom, text=lm.get_string("paste_button"), command=self.cl_paste_from_clipboard); self.cl_paste_btn.pack(side='left')
         self.cl_copy_btn = ttk.Button(button_frame_bottom, text=lm.get_string("copy_result_button"), command=self.cl_copy_to_clipboard); self.cl_copy_btn.pack(side='left', padx=10)
@@ -666,41 +974,48 @@ class ConverterApp:
         self.cl_undo_btn = ttk.Button(button_frame_bottom, text=lm.get_string("undo"), command=self.cl_undo); self.cl_undo_btn.pack(side='right')
 
     def get_content_conversion_params(self):
-        return {'conversion_type': self.ct_conversion_type.get(), 'cc_convert': self.cc_s2t if self.ct_conversion_type.get() == 's2t' else self.cc_t2s,
+        return {'conversion_type': self.ct_conversion_type.get(), 'cc_convert': get_converter(self.ct_conversion_type.get()),
                 'custom_conversions': self.ct_custom_conversions, 'enable_custom': self.ct_enable_custom.get(), 'output_folder': self.ct_output_folder.get(),
                 'use_manual_encoding': self.ct_use_manual_encoding.get(), 'manual_encoding': self.ct_manual_encoding.get(),
-                'filename_pattern': self.ct_filename_pattern.get() if self.ct_enable_custom_filename.get() else ""}
-
-    def ct_update_file_count(self): self.ct_file_count_var.set(f"共 {len(self.ct_file_data)} 個檔案")
+                'filename_pattern': self.ct_filename_pattern.get() if self.ct_enable_custom_filename.get() else "",
+                'use_line_cache': self.ct_use_line_cache.get(), 'segment_cache': SegmentCache() if self.ct_use_line_cache.get() else None,
+                'output_compression': self.ct_output_compression.get(), 'deduplicate': self.ct_deduplicate.get(), 'dedup_link': 'auto',
+                'convert_archive_names': self.ct_convert_archive_names.get()}
+
+    def ct_update_file_count(self):
+        self.ct_file_count_var.set(f"共 {len(self.ct_file_data)} 個檔案" + (f"，{lm.get_string('filter_shown', shown=len(self.ct_treeview.rows))}" if self.ct_filter_bar.active() else ""))
+    def ct_apply_filter(self): self.ct_update_treeview()
+    def listed_paths(self, treeview, checked=None):
+        """ 篩選後列表中的路徑 (依顯示順序)；checked 為 True / False 時只取已勾選 / 未勾選的，批次動作在有篩選時只作用於這些檔案 """
+        return [iid for iid, values, _ in treeview.rows if checked is None or (values[0] == "☑") == checked]
     def ct_select_files(self):
-        if files := filedialog.askopenfilenames(title=lm.get_string("import_files"), filetypes=[("Text files", "*.txt")], parent=self.master, initialdir=self.last_import_path):
+        if files := filedialog.askopenfilenames(title=lm.get_string("import_files"), filetypes=[("Text files", " ".join('*' + s for s in TEXT_INPUT_SUFFIXES)), ("Archives", " ".join('*' + s for s in ARCHIVE_SUFFIXES))], parent=self.master, initialdir=self.last_import_path):
             self.last_import_path = os.path.dirname(files[0]); self.ct_add_files_to_list(list(files))
     def ct_select_folder(self):
         if folder := filedialog.askdirectory(title=lm.get_string("import_folder"), parent=self.master, initialdir=self.last_import_path):
-            self.last_import_path = folder; self.ct_add_files_to_list([os.path.join(r, f) for r, _, fs in os.walk(folder) for f in fs if f.lower().endswith(".txt")])
+            self.last_import_path = folder; self.ct_add_files_to_list([os.path.join(r, f) for r, _, fs in os.walk(folder) for f in fs if is_text_input(f) or is_archive(f)])
     def ct_add_files_to_list(self, filepaths):
         if not filepaths: return
-        self.ct_save_undo_state(); added = False
-        for fpath in filepaths:
-            if fpath not in self.ct_file_data: self.ct_file_data[fpath] = {"checked": True, "status": "none"}; added = True
-        if added: self.ct_update_treeview(); self._ct_adjust_filename_column_width()
+        self.ct_save_undo_state()
+        if self.ct_file_data.add(filepaths): self.ct_update_treeview(); self._ct_adjust_filename_column_width()
         elif filepaths: messagebox.showinfo(lm.get_string("info"), lm.get_string("all_files_in_list"), parent=self.master)
         self.ct_update_file_count()
 
     def _ct_adjust_filename_column_width(self):
         if not self.ct_file_data: self.ct_treeview.column("name", width=250, minwidth=250, stretch=False); return
-        max_width = max(tkfont.Font(font=DEFAULT_FONT).measure(os.path.basename(fp)) for fp in self.ct_file_data.keys())
+        font = tkfont.Font(font=DEFAULT_FONT)
+        max_width = max(font.measure(name) for name in heapq.nlargest(COLUMN_MEASURE_SAMPLE, (os.path.basename(fp) for fp in self.ct_file_data), key=len))
         self.ct_treeview.column("name", width=min(max(max_width + 30, 250), 1200), minwidth=250, stretch=False)
 
     def ct_update_treeview(self):
-        self.ct_treeview.delete(*self.ct_treeview.get_children())
-        for filepath, data in self.ct_file_data.items():
+        rows = []
+        for filepath, data in self.ct_file_data.query(**self.ct_filter_bar.query_args()):
             tags, status = (), data.get("status", "none")
             if status == 'converted': tags = ('converted',)
             elif status == 'skipped_non_chinese': tags = ('non_chinese',)
             elif status.startswith('skipped'): tags = ('skipped',)
-            self.ct_treeview.insert("", "end", iid=filepath, values=("☑" if data.get("checked", False) else "☐", os.path.basename(filepath)), tags=tags)
-        self.ct_update_all_checkbox_status(); self._ct_adjust_filename_column_width()
+            rows.append((filepath, ("☑" if data.get("checked", False) else "☐", os.path.basename(filepath)), tags))
+        self.ct_treeview.set_rows(rows); self.ct_update_all_checkbox_status(); self.ct_update_file_count(); self._ct_adjust_filename_column_width()
 
     def ct_clear_list(self):
         if not self.ct_file_data: return
@@ -708,44 +1023,47 @@ class ConverterApp:
             self.ct_save_undo_state(); self.ct_file_data.clear(); self.ct_update_treeview(); self.ct_clear_preview(); self.ct_update_file_count(); self._ct_adjust_filename_column_width()
 
     def ct_remove_unchecked(self):
-        if not (unchecked_items := [fp for fp, d in self.ct_file_data.items() if not d["checked"]]):
+        unchecked = self.listed_paths(self.ct_treeview, checked=False) if self.ct_filter_bar.active() else None
+        if not (unchecked_count := self.ct_file_data.unchecked_count() if unchecked is None else len(unchecked)):
             messagebox.showinfo(lm.get_string("info"), lm.get_string("no_files_for_action", scope=lm.get_string("scope_unchecked_files"), action=lm.get_string("action_remove")), parent=self.master); return
-        if messagebox.askyesno(lm.get_string("confirm"), lm.get_string("confirm_remove_unchecked_files", count=len(unchecked_items)), parent=self.master):
-            self.ct_save_undo_state(); self.ct_file_data = {fp: d for fp, d in self.ct_file_data.items() if d["checked"]}
+        if messagebox.askyesno(lm.get_string("confirm"), lm.get_string("confirm_remove_unchecked_files", count=unchecked_count), parent=self.master):
+            self.ct_save_undo_state()
+            if unchecked is None: self.ct_file_data.remove_unchecked()
+            else: self.ct_file_data.remove(unchecked)
             self.ct_update_treeview(); self.ct_clear_preview(); self.ct_update_file_count(); self._ct_adjust_filename_column_width()
 
     def ct_delete_selected_items(self, event=None):
         if not (selected_items := self.ct_treeview.selection()): return
         if messagebox.askyesno(lm.get_string("confirm"), lm.get_string("confirm_remove_selected_files", count=len(selected_items)), parent=self.master):
             self.ct_save_undo_state()
-            for item_id in selected_items:
-                if item_id in self.ct_file_data: del self.ct_file_data[item_id]
+            self.ct_file_data.remove(selected_items)
             self.ct_update_treeview(); self.ct_clear_preview(); self.ct_update_file_count()
 
     def ct_uncheck_selected(self):
         if not (selected_items := self.ct_treeview.selection()): messagebox.showinfo(lm.get_string("info"), lm.get_string("no_selection_to_uncheck"), parent=self.master); return
         self.ct_save_undo_state()
-        for item_id in selected_items:
-            if item_id in self.ct_file_data: self.ct_file_data[item_id]["checked"] = False
+        self.ct_file_data.set_checked(selected_items, False)
         self.ct_update_treeview()
 
     def ct_toggle_all_checkboxes(self):
         if not self.ct_file_data: return
         self.ct_save_undo_state()
         new_state = self.ct_treeview.heading("checked")['text'] != "☑"
-        for item_id in self.ct_treeview.get_children():
-            if item_id in self.ct_file_data: self.ct_file_data[item_id]["checked"] = new_state
+        if self.ct_filter_bar.active(): self.ct_file_data.set_checked(self.listed_paths(self.ct_treeview), new_state)
+        else: self.ct_file_data.set_all_checked(new_state)
         self.ct_update_treeview()
     def ct_update_all_checkbox_status(self):
-        if not self.ct_file_data: self.ct_treeview.heading("checked", text="☐"); return
-        vals = [d["checked"] for d in self.ct_file_data.values()]
-        if all(vals): self.ct_treeview.heading("checked", text="☑")
-        elif not any(vals): self.ct_treeview.heading("checked", text="☐")
+        if self.ct_filter_bar.active(): total, checked_count = len(self.ct_treeview.rows), len(self.listed_paths(self.ct_treeview, checked=True))
+        else: total, checked_count = len(self.ct_file_data), self.ct_file_data.checked_count()
+        if not total: self.ct_treeview.heading("checked", text="☐"); return
+        if checked_count == total: self.ct_treeview.heading("checked", text="☑")
+        elif not checked_count: self.ct_treeview.heading("checked", text="☐")
         else: self.ct_treeview.heading("checked", text="▬")
     def ct_on_treeview_click(self, event):
         if self.ct_treeview.identify_region(event.x, event.y) == "cell" and self.ct_treeview.identify_column(event.x) == "#1":
             if item_id := self.ct_treeview.identify_row(event.y):
-                self.ct_save_undo_state(); self.ct_file_data[item_id]["checked"] = not self.ct_file_data[item_id]["checked"]; self.ct_update_treeview()
+                self.ct_save_undo_state(); self.ct_file_data.toggle_checked(item_id)
+                self.ct_treeview.update_row(item_id, values=("☑" if self.ct_file_data.get(item_id)["checked"] else "☐", os.path.basename(item_id))); self.ct_update_all_checkbox_status()
     def ct_on_file_select(self, event):
         if (sel := self.ct_treeview.selection()) and (full_path := sel[0]) and self.ct_selected_path != full_path:
             self.ct_selected_path = full_path; self.ct_start_preview_thread(full_path)
@@ -753,18 +1071,28 @@ class ConverterApp:
         self.ct_clear_preview()
         self.ct_original_encoding_label.config(text=f"{lm.get_string('preview_original_label')} ({lm.get_string('processing_label_short')})...")
         self.ct_update_preview_text(self.ct_original_text, lm.get_string("processing_label_short"))
-        threading.Thread(target=self.ct_run_preview_in_background, args=(full_path,), daemon=True).start()
+        scheduler.submit(self.ct_run_preview_in_background, full_path)
     def ct_run_preview_in_background(self, full_path):
+        if is_archive(full_path): return self.ct_run_archive_preview(full_path)
         original_content, detected_encoding = read_txt_file_with_encoding_detection(full_path, self.ct_use_manual_encoding.get(), self.ct_manual_encoding.get())
         preview_orig, preview_conv, final_err = "", "", detected_encoding
         if original_content is not None:
-            if is_convertible_chinese(original_content):
+            if fmt := structured_format(full_path):
+                params = self.get_content_conversion_params(); converted_content = convert_structured_text(original_content, fmt, params, self.cc_s2t, self.cc_t2s)
+            elif is_convertible_chinese(original_content):
                 params = self.get_content_conversion_params()
                 converted_content = convert_text(original_content, params['cc_convert'], params['conversion_type'], params['custom_conversions'], params['enable_custom'], self.cc_s2t, self.cc_t2s)
             else: converted_content = original_content
             def truncate(text): return text[:PREVIEW_CHAR_LIMIT] + f"\n\n--- ({lm.get_string('preview_truncated_msg', limit=PREVIEW_CHAR_LIMIT)}) ---" if len(text) > PREVIEW_CHAR_LIMIT else text
             preview_orig, preview_conv, final_err = truncate(original_content), truncate(converted_content), None
         self.master.after(0, self.ct_update_preview_ui, full_path, preview_orig, preview_conv, detected_encoding, final_err)
+    def ct_run_archive_preview(self, full_path):
+        """ 壓縮檔只預覽項目名稱；未勾選轉換項目名稱時名稱保持不變 """
+        try:
+            names, params = list_archive_entries(full_path), self.get_content_conversion_params()
+            converted = [plan_entry_name(name, params['cc_convert']) for name in names] if params['convert_archive_names'] else names
+            self.master.after(0, self.ct_update_preview_ui, full_path, "\n".join(names), "\n".join(converted), "archive", None)
+        except Exception as e: self.master.after(0, self.ct_update_preview_ui, full_path, "", "", None, str(e))
     def ct_update_preview_ui(self, full_path, preview_original, preview_converted, detected_encoding, error_msg):
         if self.ct_selected_path != full_path: return
         if error_msg:
@@ -777,30 +1105,57 @@ class ConverterApp:
         text_widget.config(state='normal'); text_widget.delete('1.0', tk.END); text_widget.insert('1.0', content or ""); text_widget.config(state='disabled')
     def ct_clear_preview(self):
         self.ct_update_preview_text(self.ct_original_text, ""); self.ct_update_preview_text(self.ct_converted_text, ""); self.ct_original_encoding_label.config(text=lm.get_string("preview_original_label"))
-    def ct_start_checked_conversion(self): self.ct_start_conversion_thread([fp for fp, d in self.ct_file_data.items() if d["checked"]], "scope_checked_files")
-    def ct_start_all_conversion(self): self.ct_start_conversion_thread(list(self.ct_file_data.keys()), "scope_all_files")
+    def ct_start_checked_conversion(self): self.ct_start_conversion_thread(self.listed_paths(self.ct_treeview, checked=True) if self.ct_filter_bar.active() else self.ct_file_data.checked_paths(), "scope_checked_files")
+    def ct_start_all_conversion(self): self.ct_start_conversion_thread(self.listed_paths(self.ct_treeview) if self.ct_filter_bar.active() else list(self.ct_file_data), "scope_all_files")
     def ct_start_conversion_thread(self, filepaths, scope_key):
         if not filepaths: messagebox.showwarning(lm.get_string("warning"), lm.get_string("no_files_for_action", scope=lm.get_string(scope_key), action=lm.get_string("action_convert")), parent=self.master); return
         if not (self.ct_output_folder.get() and os.path.isdir(self.ct_output_folder.get())): messagebox.showwarning(lm.get_string("warning"), lm.get_string("invalid_output_folder"), parent=self.master); return
-        for path in filepaths:
-            if path in self.ct_file_data: self.ct_file_data[path]['status'] = 'none'
+        self.ct_file_data.set_status(dict.fromkeys(filepaths, 'none'))
         self.ct_update_treeview()
-        progress_dialog = ProgressDialog(self.master, "tab_file_conversion", len(filepaths))
-        threading.Thread(target=process_content_background, args=(self, filepaths, progress_dialog, self.ct_finish_conversion), daemon=True).start()
-    def ct_finish_conversion(self, success, fail, out_folder, preview_data, was_cancelled, results):
+        params = self.get_content_conversion_params()
+        job_id = self.job_journal.create_job('content', persistable_content_params(params), filepaths, state='running')
+        self.ct_queue_totals = [0, 0]; self.ct_run_job(job_id, params)
+    def ct_run_job(self, job_id, params):
+        progress_dialog = ProgressDialog(self.master, "tab_file_conversion", self.job_journal.file_count(job_id))
+        scheduler.submit(process_content_background, self, job_id, params, progress_dialog, self.ct_finish_conversion, priority=PRIORITY_BATCH)
+    def ct_offer_job_resume(self):
+        if not (jobs := self.job_journal.unfinished_jobs('content')): return
+        if messagebox.askyesno(lm.get_string("confirm"), lm.get_string("resume_jobs_confirm", count=len(jobs), remaining=sum(job['total'] - job['done'] for job in jobs)), parent=self.master):
+            self.ct_job_queue.extend(job['id'] for job in jobs); self.ct_queue_totals = [0, 0]; self.ct_run_next_queued_job()
+        else:
+            for job in jobs: self.job_journal.set_state(job['id'], 'cancelled')
+    def ct_run_next_queued_job(self):
+        # 佇列中的工作依序執行，中間不顯示訊息框，全部完成後才彙報
+        while self.ct_job_queue:
+            if not (job := self.job_journal.get_job(self.ct_job_queue.popleft())) or job['state'] not in UNFINISHED_STATES: continue
+            params = restore_content_params(job['params'], self.cc_s2t, self.cc_t2s)
+            if not os.path.isdir(params['output_folder']): print(f"Job {job['id']}: output folder missing: {params['output_folder']}"); self.job_journal.set_state(job['id'], 'cancelled'); continue
+            self.ct_file_data.add(self.job_journal.job_paths(job['id']))
+            self.ct_update_treeview(); self.ct_update_file_count(); self.ct_run_job(job['id'], params); return
+    def ct_finish_conversion(self, success, fail, out_folder, preview_data, was_cancelled, results, line_cache=None, stats_report=None, dedup_stats=None):
+        if self.ct_job_queue and not was_cancelled:
+            self.ct_queue_totals[0] += success; self.ct_queue_totals[1] += fail; self.ct_file_data.set_status(results)
+            self.ct_update_treeview(); self.master.after(200, self.ct_run_next_queued_job); return
+        # 佇列中先前完成的工作一併計入
+        success, fail = success + self.ct_queue_totals[0], fail + self.ct_queue_totals[1]; self.ct_queue_totals = [0, 0]
+        self.ct_job_queue.clear()
         msg = lm.get_string("task_cancelled_msg", success=success, fail=fail) if was_cancelled else lm.get_string("task_complete_msg", success=success, fail=fail, folder=out_folder)
+        if line_cache is not None and line_cache.hits + line_cache.misses:
+            msg += "\n\n" + lm.get_string("line_cache_stats", hits=line_cache.hits, total=line_cache.hits + line_cache.misses, rate=f"{line_cache.hit_rate():.1%}")
+        if dedup_stats is not None and dedup_stats.duplicates:
+            msg += "\n\n" + lm.get_string("dedup_stats", duplicates=dedup_stats.duplicates, groups=dedup_stats.groups, size=f"{dedup_stats.bytes_skipped / 1024 / 1024:.1f} MB")
         title = lm.get_string("task_cancelled") if was_cancelled else lm.get_string("task_complete")
         messagebox.showinfo(title, msg, parent=self.master)
-        for path, status in results.items():
-            if path in self.ct_file_data: self.ct_file_data[path]['status'] = status
+        if stats_report: self.save_stats_report(stats_report)
+        self.ct_file_data.set_status(results)
         self.ct_update_treeview()
         if preview_data and preview_data[0] is not None:
             self.ct_original_encoding_label.config(text=lm.get_string("preview_original_label_last_conversion"))
             self.ct_update_preview_text(self.ct_original_text, preview_data[0]); self.ct_update_preview_text(self.ct_converted_text, preview_data[1])
-    def ct_save_undo_state(self): self.ct_undo_stack.append(copy.deepcopy(self.ct_file_data))
+    def ct_save_undo_state(self): self.ct_file_data.save_undo_state()
     def ct_undo_list_action(self):
-        if not self.ct_undo_stack: messagebox.showinfo(lm.get_string("undo"), lm.get_string("nothing_to_undo"), parent=self.master); return
-        self.ct_file_data = self.ct_undo_stack.pop(); self.ct_update_treeview(); self.ct_update_file_count()
+        if not self.ct_file_data.undo(): messagebox.showinfo(lm.get_string("undo"), lm.get_string("nothing_to_undo"), parent=self.master); return
+        self.ct_update_treeview(); self.ct_update_file_count()
     def ct_update_font_from_entry(self, event=None):
         try: new_size = int(self.ct_font_size_entry.get())
         except (ValueError, tk.TclError): new_size = DEFAULT_FONT_SIZE_PREVIEW
@@ -812,8 +1167,8 @@ class ConverterApp:
         self.ct_original_text.config(font=new_font); self.ct_converted_text.config(font=new_font)
         if hasattr(self, 'ct_font_size_slider') and round(self.ct_font_size_slider.get()) != size: self.ct_font_size_slider.set(size)
         if hasattr(self, 'ct_font_size_entry') and self.ct_font_size_entry.get() != str(size): self.ct_font_size_entry.delete(0, tk.END); self.ct_font_size_entry.insert(0, str(size))
-    def ct_open_custom_conversions_manager(self): CustomConversionsManager(self.master, self.ct_custom_conversions, self.ct_update_custom_conversions)
-    def ct_update_custom_conversions(self, new_dict): self.ct_custom_conversions = new_dict; save_custom_conversions(new_dict, self.master); self.ct_trigger_preview_refresh()
+    def ct_open_custom_conversions_manager(self): CustomConversionsManager(self.master, self.ct_glossary, self.ct_update_custom_conversions)
+    def ct_update_custom_conversions(self, new_dict): self.ct_custom_conversions = new_dict; save_custom_conversions(self.ct_glossary, self.master); self.ct_trigger_preview_refresh()
     def ct_trigger_preview_refresh(self, *args):
         if self.ct_selected_path: self.ct_start_preview_thread(self.ct_selected_path)
     def ct_toggle_manual_encoding_option(self, *args): self.ct_encoding_combobox.config(state='readonly' if self.ct_use_manual_encoding.get() else 'disabled'); self.ct_trigger_preview_refresh()
@@ -822,7 +1177,9 @@ class ConverterApp:
         self.ct_filename_entry.config(state=state)
         if state == 'normal' and not self.ct_filename_pattern.get(): self.ct_filename_pattern.set("{original_name}")
             
-    def fn_update_file_count(self): self.fn_file_count_var.set(f"共 {len(self.fn_file_data)} 個檔案")
+    def fn_update_file_count(self):
+        self.fn_file_count_var.set(f"共 {len(self.fn_file_data)} 個檔案" + (f"，{lm.get_string('filter_shown', shown=len(self.fn_treeview.rows))}" if self.fn_filter_bar.active() else ""))
+    def fn_apply_filter(self): self.fn_update_rename_preview()
     def fn_select_files(self): 
         if files := filedialog.askopenfilenames(title=lm.get_string("import_files"), parent=self.master, initialdir=self.last_import_path):
             self.last_import_path = os.path.dirname(files[0]); self.fn_add_files_to_list(list(files))
@@ -833,51 +1190,28 @@ class ConverterApp:
             self.fn_add_files_to_list(files_to_add)
     def fn_add_files_to_list(self, filepaths):
         if not filepaths: return
-        self.fn_save_undo_state(); added = False
-        for fpath in filepaths:
-            if fpath not in self.fn_file_data: self.fn_file_data[fpath] = {"checked": True, "status": "none"}; added = True
-        if added: self.fn_update_rename_preview(); self._fn_adjust_filename_columns_width()
+        self.fn_save_undo_state()
+        if self.fn_file_data.add(filepaths): self.fn_update_rename_preview(); self._fn_adjust_filename_columns_width()
         elif filepaths: messagebox.showinfo(lm.get_string("info"), lm.get_string("all_files_in_list"), parent=self.master)
         self.fn_update_file_count()
 
     def _fn_adjust_filename_columns_width(self):
-        if not self.fn_file_data:
+        if not self.fn_file_data or not self.fn_treeview.rows:
             self.fn_treeview.column("original", width=200, minwidth=200)
             self.fn_treeview.column("preview", width=200, minwidth=200)
             return
-
+        # 顯示名稱與預覽名稱已在 fn_update_rename_preview 中算好，只量測最長的幾個
         font = tkfont.Font(font=DEFAULT_FONT)
-        cc = self.cc_s2t if self.fn_conversion_type.get() == 's2t' else self.cc_t2s
-        
-        max_orig_width = 0
-        max_prev_width = 0
-
-        for path in self.fn_file_data.keys():
-            basename = os.path.basename(path)
-            
-            if os.path.isdir(path):
-                display_name = f"[資料夾] {basename}"
-            else:
-                name, ext = os.path.splitext(basename)
-                file_ext = ext.replace('.', '').lower()
-                display_name = f"[{file_ext}] {basename}" if file_ext else f"[檔案] {basename}"
-            max_orig_width = max(max_orig_width, font.measure(display_name))
-            
-            name_to_convert, ext = os.path.splitext(basename)
-            if os.path.isdir(path):
-                 name_to_convert, ext = basename, ""
-            
-            preview_name = cc.convert(name_to_convert) + ext
-            max_prev_width = max(max_prev_width, font.measure(preview_name))
-
+        max_orig_width = max(font.measure(name) for name in heapq.nlargest(COLUMN_MEASURE_SAMPLE, (values[1] for _, values, _ in self.fn_treeview.rows), key=len))
+        max_prev_width = max(font.measure(name) for name in heapq.nlargest(COLUMN_MEASURE_SAMPLE, (values[2] for _, values, _ in self.fn_treeview.rows), key=len))
         self.fn_treeview.column("original", width=min(max(max_orig_width + 30, 200), 1200), minwidth=200)
         self.fn_treeview.column("preview", width=min(max(max_prev_width + 30, 200), 1200), minwidth=200)
 
     def fn_update_rename_preview(self):
-        self.fn_treeview.delete(*self.fn_treeview.get_children())
-        cc = self.cc_s2t if self.fn_conversion_type.get() == 's2t' else self.cc_t2s
+        cc = get_converter(self.fn_conversion_type.get())
         detect_language = self.fn_enable_lang_detect.get()
-        for path, data in self.fn_file_data.items():
+        rows, pending = [], []
+        for path, data in self.fn_file_data.query(**self.fn_filter_bar.query_args()):
             basename = os.path.basename(path)
             
             display_name = ""
@@ -894,11 +1228,17 @@ class ConverterApp:
             if status == 'converted': tags = ('converted',)
             elif status == 'skipped_non_chinese': tags, is_convertible = ('non_chinese',), False
             elif status.startswith('skipped'): tags = ('skipped',)
-            elif status == 'none' and detect_language and not is_convertible_chinese(name): tags, is_convertible = ('non_chinese',), False
+            elif status == 'none' and detect_language: pending.append(len(rows))
+            rows.append((path, checkbox, display_name, basename, name, ext, tags, is_convertible))
             
-            new_name = (cc.convert(name) + ext) if is_convertible else basename
-            self.fn_treeview.insert("", "end", iid=path, values=(checkbox, display_name, new_name), tags=tags)
-        self.fn_update_all_checkbox_status(); self._fn_adjust_filename_columns_width()
+        # 尚未處理的檔名一次分類，不逐一呼叫 langdetect
+        if pending:
+            for i, is_chinese in zip(pending, name_classifier.chinese_names(rows[i][4] for i in pending)):
+                if not is_chinese: rows[i] = rows[i][:6] + (('non_chinese',), False)
+        names = [row[4] for row in rows if row[7]]; converted_names = dict(zip(names, convert_many(names, cc)))
+        self.fn_treeview.set_rows([(path, (checkbox, display_name, (converted_names[name] + ext) if is_convertible else basename), tags)
+                                   for path, checkbox, display_name, basename, name, ext, tags, is_convertible in rows])
+        self.fn_update_all_checkbox_status(); self.fn_update_file_count(); self._fn_adjust_filename_columns_width()
 
     def fn_clear_list(self):
         if not self.fn_file_data: return
@@ -906,112 +1246,390 @@ class ConverterApp:
             self.fn_save_undo_state(); self.fn_file_data.clear(); self.fn_update_rename_preview(); self.fn_update_file_count(); self._fn_adjust_filename_columns_width()
     
     def fn_remove_unchecked(self):
-        if not (unchecked_items := [fp for fp, d in self.fn_file_data.items() if not d["checked"]]):
+        unchecked = self.listed_paths(self.fn_treeview, checked=False) if self.fn_filter_bar.active() else None
+        if not (unchecked_count := self.fn_file_data.unchecked_count() if unchecked is None else len(unchecked)):
             messagebox.showinfo(lm.get_string("info"), lm.get_string("no_files_for_action", scope=lm.get_string("scope_unchecked_files"), action=lm.get_string("action_remove")), parent=self.master); return
-        if messagebox.askyesno(lm.get_string("confirm"), lm.get_string("confirm_remove_unchecked_files", count=len(unchecked_items)), parent=self.master):
-            self.fn_save_undo_state(); self.fn_file_data = {fp: d for fp, d in self.fn_file_data.items() if d["checked"]}
+        if messagebox.askyesno(lm.get_string("confirm"), lm.get_string("confirm_remove_unchecked_files", count=unchecked_count), parent=self.master):
+            self.fn_save_undo_state()
+            if unchecked is None: self.fn_file_data.remove_unchecked()
+            else: self.fn_file_data.remove(unchecked)
             self.fn_update_rename_preview(); self.fn_update_file_count(); self._fn_adjust_filename_columns_width()
             
     def fn_delete_selected_items(self, event=None):
         if not (selected_items := self.fn_treeview.selection()): return
         if messagebox.askyesno(lm.get_string("confirm"), lm.get_string("confirm_remove_selected_files", count=len(selected_items)), parent=self.master):
             self.fn_save_undo_state()
-            for item_id in selected_items:
-                if item_id in self.fn_file_data: del self.fn_file_data[item_id]
+            self.fn_file_data.remove(selected_items)
             self.fn_update_rename_preview(); self.fn_update_file_count()
 
     def fn_uncheck_selected(self):
         if not (selected_items := self.fn_treeview.selection()): messagebox.showinfo(lm.get_string("info"), lm.get_string("no_selection_to_uncheck"), parent=self.master); return
         self.fn_save_undo_state()
-        for item_id in selected_items:
-            if item_id in self.fn_file_data: self.fn_file_data[item_id]["checked"] = False
+        self.fn_file_data.set_checked(selected_items, False)
         self.fn_update_rename_preview()
 
     def fn_toggle_all_checkboxes(self):
         if not self.fn_file_data: return
         self.fn_save_undo_state()
         new_state = self.fn_treeview.heading("checked")['text'] != "☑"
-        for item_id in self.fn_treeview.get_children():
-            if item_id in self.fn_file_data: self.fn_file_data[item_id]["checked"] = new_state
+        if self.fn_filter_bar.active(): self.fn_file_data.set_checked(self.listed_paths(self.fn_treeview), new_state)
+        else: self.fn_file_data.set_all_checked(new_state)
         self.fn_update_rename_preview()
     def fn_update_all_checkbox_status(self):
-        if not self.fn_file_data: self.fn_treeview.heading("checked", text="☐"); return
-        vals = [d["checked"] for d in self.fn_file_data.values()]
-        if all(vals): self.fn_treeview.heading("checked", text="☑")
-        elif not any(vals): self.fn_treeview.heading("checked", text="☐")
+        if self.fn_filter_bar.active(): total, checked_count = len(self.fn_treeview.rows), len(self.listed_paths(self.fn_treeview, checked=True))
+        else: total, checked_count = len(self.fn_file_data), self.fn_file_data.checked_count()
+        if not total: self.fn_treeview.heading("checked", text="☐"); return
+        if checked_count == total: self.fn_treeview.heading("checked", text="☑")
+        elif not checked_count: self.fn_treeview.heading("checked", text="☐")
         else: self.fn_treeview.heading("checked", text="▬")
     def fn_on_treeview_click(self, event):
         if self.fn_treeview.identify_region(event.x, event.y) == "cell" and self.fn_treeview.identify_column(event.x) == "#1":
             if item_id := self.fn_treeview.identify_row(event.y):
-                self.fn_save_undo_state(); self.fn_file_data[item_id]["checked"] = not self.fn_file_data[item_id]["checked"]; self.fn_update_rename_preview()
+                self.fn_save_undo_state(); self.fn_file_data.toggle_checked(item_id)
+                self.fn_treeview.update_row(item_id, values=("☑" if self.fn_file_data.get(item_id)["checked"] else "☐", *self.fn_treeview.row(item_id)[1][1:])); self.fn_update_all_checkbox_status()
     def fn_start_rename_process(self, filepaths):
         if not filepaths: messagebox.showwarning(lm.get_string("warning"), lm.get_string("no_files_for_action", scope=lm.get_string('scope_checked_files'), action=lm.get_string('action_rename')), parent=self.master); return
         output_folder = self.fn_output_folder.get()
         if not output_folder or not os.path.isdir(output_folder): messagebox.showwarning(lm.get_string("warning"), lm.get_string("invalid_output_folder"), parent=self.master); return
-        for path in filepaths:
-            if path in self.fn_file_data: self.fn_file_data[path]['status'] = 'none'
+        self.fn_file_data.set_status(dict.fromkeys(filepaths, 'none'))
         self.fn_update_rename_preview()
         operation_type, detect_language = self.fn_operation_type.get(), self.fn_enable_lang_detect.get()
         progress_dialog = ProgressDialog(self.master, "tab_filename_conversion", len(filepaths))
-        threading.Thread(target=process_filenames_background, args=(self, filepaths, self.fn_conversion_type.get(), output_folder, operation_type, detect_language, progress_dialog, self.fn_finish_process), daemon=True).start()
-    def fn_start_checked_rename_process(self): self.fn_start_rename_process([fp for fp, d in self.fn_file_data.items() if d["checked"]])
-    def fn_start_all_rename_process(self): self.fn_start_rename_process(list(self.fn_file_data.keys()))
-    def fn_finish_process(self, success, fail, out_folder, was_cancelled, operation_type, results):
+        scheduler.submit(process_filenames_background, self, filepaths, self.fn_conversion_type.get(), output_folder, operation_type, detect_language, self.fn_convert_archive_entries.get(),
+                         progress_dialog, self.fn_finish_process, priority=PRIORITY_BATCH)
+    def fn_start_checked_rename_process(self): self.fn_start_rename_process(self.listed_paths(self.fn_treeview, checked=True) if self.fn_filter_bar.active() else self.fn_file_data.checked_paths())
+    def fn_start_all_rename_process(self): self.fn_start_rename_process(self.listed_paths(self.fn_treeview) if self.fn_filter_bar.active() else list(self.fn_file_data))
+    def fn_finish_process(self, success, fail, out_folder, was_cancelled, operation_type, results, stats_report=None):
         action_msg_key = 'action_moved' if operation_type == 'move' else 'action_copied'
         title = lm.get_string("task_cancelled") if was_cancelled else lm.get_string("task_complete")
         msg = lm.get_string("task_cancelled_msg", success=success, fail=fail) if was_cancelled else lm.get_string("task_complete_msg_rename", action=lm.get_string(action_msg_key), success=success, fail=fail, folder=out_folder)
         messagebox.showinfo(title, msg, parent=self.master)
-        self.fn_save_undo_state(); temp_data = {}
+        if stats_report: self.save_stats_report(stats_report)
+        self.fn_save_undo_state(); statuses, moved = {}, {}
         for old_path, result in results.items():
             if isinstance(result, dict) and result.get('status') == 'converted':
-                if operation_type == 'move':
-                    new_path = result['new_path']
-                    if old_path in self.fn_file_data: temp_data[new_path] = {**self.fn_file_data[old_path], 'status': 'converted'}
-                elif old_path in self.fn_file_data: self.fn_file_data[old_path]['status'] = 'converted'
-            elif old_path in self.fn_file_data: self.fn_file_data[old_path]['status'] = result if isinstance(result, str) else 'failed'
-        if operation_type == 'move':
-            moved_paths = [p for p, r in results.items() if isinstance(r, dict) and r.get('status') == 'converted']
-            for p in moved_paths:
-                if p in self.fn_file_data: del self.fn_file_data[p]
-            self.fn_file_data.update(temp_data)
+                if operation_type == 'move': moved[old_path] = result['new_path']
+                else: statuses[old_path] = 'converted'
+            else: statuses[old_path] = result if isinstance(result, str) else 'failed'
+        self.fn_file_data.set_status(statuses)
+        if moved: self.fn_file_data.rename(moved, 'converted')
         self.fn_update_rename_preview()
-    def fn_save_undo_state(self): self.fn_undo_stack.append(copy.deepcopy(self.fn_file_data))
+    def fn_save_undo_state(self): self.fn_file_data.save_undo_state()
     def fn_undo_list_action(self):
-        if not self.fn_undo_stack: messagebox.showinfo(lm.get_string("undo"), lm.get_string("nothing_to_undo"), parent=self.master); return
-        self.fn_file_data = self.fn_undo_stack.pop(); self.fn_update_rename_preview(); self.fn_update_file_count()
+        if not self.fn_file_data.undo(): messagebox.showinfo(lm.get_string("undo"), lm.get_string("nothing_to_undo"), parent=self.master); return
+        self.fn_update_rename_preview(); self.fn_update_file_count()
         
-    def cl_save_undo_state(self): self.cl_undo_stack.append((self.cl_input_text.get("1.0", tk.END), self.cl_output_text.get("1.0", tk.END)))
+    def cl_save_undo_state(self): self.cl_finish_pending_inserts(); self.cl_undo_stack.append((self.cl_input_text.get("1.0", 'end-1c'), self.cl_output_text.get("1.0", 'end-1c')))
     def cl_start_conversion(self, direction):
-        self.cl_save_undo_state()
+        self.cl_save_undo_state(); self.cl_live_direction = direction; self.cl_live_lines = None
+        if self.cl_live_convert.get(): self.cl_live_refresh(); return
         if not (input_text := self.cl_input_text.get("1.0", tk.END).strip()): return
-        cc_instance = self.cc_s2t if direction == 's2t' else self.cc_t2s
+        cc_instance = get_converter(direction)
+        if len(input_text) <= CLIPBOARD_SYNC_CHAR_LIMIT: self.cl_finish_conversion(self.cl_convert_text(input_text, cc_instance)); return
         progress_dialog = ProgressDialog(self.master, "processing_label", mode='indeterminate', min_duration=0.4)
-        threading.Thread(target=self.cl_run_conversion_in_background, args=(input_text, cc_instance, progress_dialog), daemon=True).start()
+        scheduler.submit(self.cl_run_conversion_in_background, input_text, cc_instance, progress_dialog)
+    def cl_convert_text(self, text, cc_instance):
+        try:
+            with scheduler.interactive(): return convert_han_spans(text, cc_instance)
+        except Exception as e: return f"{lm.get_string('conversion_error')}: {e}"
     def cl_run_conversion_in_background(self, text, cc_instance, dialog):
-        try: converted_text = cc_instance.convert(text)
-        except Exception as e: converted_text = f"{lm.get_string('conversion_error')}: {e}"
+        converted_text = self.cl_convert_text(text, cc_instance)
         if not dialog.cancel_event.is_set(): self.master.after(0, self.cl_finish_conversion, converted_text, dialog)
-    def cl_finish_conversion(self, converted_text, dialog):
-        self.cl_output_text.config(state='normal'); self.cl_output_text.delete('1.0', tk.END); self.cl_output_text.insert('1.0', converted_text); self.cl_output_text.config(state='disabled')
-        dialog.close()
+    def cl_finish_conversion(self, converted_text, dialog=None):
+        self.cl_live_lines = None; self.cl_set_text_chunked(self.cl_output_text, converted_text)
+        if dialog: dialog.close()
+    def cl_set_text_chunked(self, widget, text, on_done=None):
+        # 大量文字分段於閒置時插入，避免一次 insert 凍結介面；同一元件的新插入會取代尚未完成的舊插入
+        # cl_pending_inserts 保存尚未完成的插入，讀取文字前可呼叫 cl_finish_pending_inserts 立即插入剩餘部分
+        key, offset = str(widget), 0
+        label, label_key = (self.cl_input_label, "input_content_label") if widget is self.cl_input_text else (self.cl_output_label, "output_result_label")
+        widget_state = widget.cget('state')
+        widget.config(state='normal'); widget.delete('1.0', tk.END); widget.config(state=widget_state)
+        def insert_chunk(size):
+            nonlocal offset
+            chunk = text[offset:offset + size]; offset += len(chunk)
+            widget.config(state='normal'); widget.insert('end-1c', chunk); widget.config(state=widget_state)
+            if offset < len(text): label.config(text=f"{lm.get_string(label_key)} ({offset * 100 // len(text)}%)"); return False
+            label.config(text=lm.get_string(label_key)); del self.cl_pending_inserts[key]
+            if on_done: on_done()
+            return True
+        def insert_step():
+            if self.cl_pending_inserts.get(key) is not finish: return
+            if not insert_chunk(CLIPBOARD_INSERT_CHUNK_SIZE): self.master.after_idle(insert_step)
+        def finish(): insert_chunk(len(text) - offset)
+        self.cl_pending_inserts[key] = finish; insert_step()
+    def cl_finish_pending_inserts(self):
+        """ 轉換、複製或保存復原狀態前先把尚未插入完的文字插入完畢，避免讀到只插入一部分的內容 """
+        for finish in list(self.cl_pending_inserts.values()): finish()
+    def cl_toggle_live_convert(self):
+        if self.cl_live_after_id: self.master.after_cancel(self.cl_live_after_id); self.cl_live_after_id = None
+        self.cl_live_generation += 1; self.cl_live_lines = None
+        if self.cl_live_convert.get(): self.cl_live_refresh()
+        else: self.cl_output_label.config(text=lm.get_string("output_result_label"))
+    def cl_on_input_modified(self, event=None):
+        if not self.cl_input_text.edit_modified(): return
+        self.cl_input_text.edit_modified(False)
+        if not self.cl_live_convert.get(): return
+        if self.cl_live_after_id: self.master.after_cancel(self.cl_live_after_id)
+        self.cl_live_after_id = self.master.after(LIVE_CONVERT_DELAY_MS, self.cl_live_refresh)
+    def cl_live_refresh(self):
+        # 只重新轉換變動過的段落；小範圍同步處理，大範圍交給背景執行緒，過期的結果以 generation 丟棄
+        self.cl_live_after_id = None; self.cl_finish_pending_inserts()
+        new_lines = self.cl_input_text.get('1.0', 'end-1c').split('\n')
+        if self.cl_live_lines is None: start, old_end, new_end = 0, None, len(new_lines)
+        else:
+            start, old_end, new_end = find_dirty_line_range(self.cl_live_lines, new_lines)
+            if start == old_end == new_end: return
+        self.cl_live_generation += 1; generation = self.cl_live_generation
+        cc_instance = get_converter(self.cl_live_direction)
+        dirty_text = '\n'.join(new_lines[start:new_end])
+        if len(dirty_text) <= CLIPBOARD_SYNC_CHAR_LIMIT:
+            self.cl_apply_live_conversion(generation, new_lines, start, old_end, new_end, self.cl_convert_text(dirty_text, cc_instance)); return
+        self.cl_output_label.config(text=f"{lm.get_string('output_result_label')} ({lm.get_string('processing_label_short')})")
+        def run(): converted_text = self.cl_convert_text(dirty_text, cc_instance); self.master.after(0, self.cl_apply_live_conversion, generation, new_lines, start, old_end, new_end, converted_text)
+        scheduler.submit(run)
+    def cl_apply_live_conversion(self, generation, new_lines, start, old_end, new_end, converted_text):
+        if generation != self.cl_live_generation: return
+        converted_lines = converted_text.split('\n') if new_end > start else []
+        if old_end is not None and len(converted_lines) != new_end - start: self.cl_live_lines = None; self.cl_live_refresh(); return
+        if old_end is None:
+            self.cl_set_text_chunked(self.cl_output_text, converted_text, on_done=lambda: setattr(self, 'cl_live_lines', new_lines) if generation == self.cl_live_generation else None); return
+        widget = self.cl_output_text; widget.config(state='normal')
+        if old_end < len(self.cl_live_lines): widget.delete(f"{start + 1}.0", f"{old_end + 1}.0"); widget.insert(f"{start + 1}.0", ''.join(line + '\n' for line in converted_lines))
+        elif start > 0: widget.delete(f"{start}.end", 'end-1c'); widget.insert(f"{start}.end", ''.join('\n' + line for line in converted_lines))
+        else: widget.delete('1.0', 'end-1c'); widget.insert('1.0', '\n'.join(converted_lines))
+        widget.config(state='disabled'); self.cl_live_lines = new_lines
+        self.cl_output_label.config(text=lm.get_string("output_result_label"))
     def cl_clear_text(self):
-        self.cl_save_undo_state(); self.cl_input_text.delete('1.0', tk.END)
-        self.cl_output_text.config(state='normal'); self.cl_output_text.delete('1.0', tk.END); self.cl_output_text.config(state='disabled')
+        self.cl_save_undo_state(); self.cl_live_lines = None; self.cl_set_text_chunked(self.cl_input_text, ""); self.cl_set_text_chunked(self.cl_output_text, "")
     def cl_undo(self):
         if not self.cl_undo_stack: messagebox.showinfo(lm.get_string("undo"), lm.get_string("nothing_to_undo"), parent=self.master); return
-        last_input, last_output = self.cl_undo_stack.pop()
-        self.cl_input_text.delete('1.0', tk.END); self.cl_input_text.insert('1.0', last_input)
-        self.cl_output_text.config(state='normal'); self.cl_output_text.delete('1.0', tk.END); self.cl_output_text.insert('1.0', last_output); self.cl_output_text.config(state='disabled')
+        last_input, last_output = self.cl_undo_stack.pop(); self.cl_live_lines = None
+        self.cl_set_text_chunked(self.cl_input_text, last_input); self.cl_set_text_chunked(self.cl_output_text, last_output)
     def cl_paste_from_clipboard(self):
         try:
-            self.cl_save_undo_state(); self.cl_input_text.delete('1.0', tk.END); self.cl_input_text.insert('1.0', self.master.clipboard_get())
+            self.cl_save_undo_state(); self.cl_set_text_chunked(self.cl_input_text, self.master.clipboard_get())
         except tk.TclError: messagebox.showwarning(lm.get_string("paste_failed"), lm.get_string("paste_no_text"), parent=self.master)
     def cl_copy_to_clipboard(self):
+        self.cl_finish_pending_inserts()
         if not (text_to_copy := self.cl_output_text.get("1.0", tk.END).strip()): messagebox.showwarning(lm.get_string("copy_failed"), lm.get_string("copy_no_text"), parent=self.master); return
         self.master.clipboard_clear(); self.master.clipboard_append(text_to_copy); messagebox.showinfo(lm.get_string("copy_success"), lm.get_string("copy_success_msg"), parent=self.master)
 
+# --- 命令列模式 ---
+def add_content_conversion_arguments(parser):
+    parser.add_argument("--direction", choices=available_converter_configs(), default='s2t')
+    parser.add_argument("--no-custom", action="store_true", help="do not apply custom_conversions.json")
+    parser.add_argument("--encoding", help="force an input encoding instead of detecting it")
+    parser.add_argument("--filename-pattern", default="", help="e.g. {original_name}_{index}")
+    parser.add_argument("--line-cache", action="store_true", help="convert each distinct line once and reuse it across files (for repetitive logs or subtitles)")
+    parser.add_argument("--compress", choices=available_output_compressions(), default='none', help="compress converted files; 'same' keeps each input's compression")
+    parser.add_argument("--no-dedup", action="store_true", help="convert byte-identical input files separately instead of once")
+    parser.add_argument("--dedup-link", choices=DEDUP_LINK_MODES, default='auto', help="how duplicate outputs are written; auto tries reflink, then copy. hardlink makes duplicates share one file, so editing one output changes the others")
+    parser.add_argument("--archive-names", action="store_true", help="also convert entry names inside zip/tar archives (contents are converted either way)")
+
+def add_stats_arguments(parser):
+    parser.add_argument("--stats-json", metavar="PATH", help="write per-stage timings (and the profile, if any) as JSON when finished")
+    parser.add_argument("--profile", choices=PROFILE_MODES, default='off', help="cprofile: deterministic, current thread only; sampling: low-overhead stack sampling")
+    parser.add_argument("--report-jsonl", metavar="PATH", help="append one JSON line per file (path, status, encoding, bytes in/out, seconds) and a final summary line")
+    parser.add_argument("--metrics-file", metavar="PATH", help="write a Prometheus textfile snapshot (files/s, bytes/s, counts by status, errors) while running and when finished")
+
+def job_report_from_arguments(args, kind):
+    return JobReport(kind, args.report_jsonl, args.metrics_file) if args.report_jsonl or args.metrics_file else None
+
+def close_job_report(report):
+    if not report: return
+    summary = report.close()
+    print(f"Report: {summary['files']} files, {summary['errors']} errors, {summary['files_per_second']:.1f} files/s, {summary['bytes_per_second'] / 1024 / 1024:.2f} MB/s")
+
+def write_stats_report(args, profiler, **extra):
+    if not args.stats_json: return
+    for line in stage_stats.summary_lines(): print(line)
+    dump_stats_json(args.stats_json, build_stats_report(stage_stats, profiler, **extra)); print(f"Stats written to {args.stats_json}")
+
+def content_params_from_arguments(args, cc_s2t, cc_t2s):
+    return build_content_conversion_params(args.direction, args.output, cc_s2t, cc_t2s, read_custom_conversions_file(CUSTOM_CONVERSIONS_FILE), not args.no_custom,
+                                           bool(args.encoding), args.encoding, args.filename_pattern, args.line_cache, args.compress,
+                                           not args.no_dedup, args.dedup_link, args.archive_names)
+
+def run_command_line(argv):
+    parser = argparse.ArgumentParser(description="Chinese Converter Tool (command line mode)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="run the local HTTP conversion service")
+    serve_parser.add_argument("--host", default=conversion_server.DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=conversion_server.DEFAULT_PORT)
+    serve_parser.add_argument("--pool-size", type=int, default=conversion_server.DEFAULT_POOL_SIZE)
+    serve_parser.add_argument("--output-root", help="folder that /convert/file may write output_path into (new files only); output_path is refused without it")
+    serve_parser.add_argument("--input-root", help="folder that /convert/file may read from; required for /convert/file when --host is not a loopback address")
+    serve_parser.add_argument("--allow-host", action="append", default=[], metavar="NAME", help="accept this Host header in addition to localhost/127.0.0.1/::1 (repeatable)")
+    serve_parser.add_argument("--verbose", action="store_true")
+    watch_parser = commands.add_parser("watch", help="convert text files (.txt, subtitles, CSV, JSON, HTML) and zip/tar archives as they arrive in a folder")
+    watch_parser.add_argument("folder")
+    watch_parser.add_argument("--output", required=True, help="output folder for converted files")
+    add_content_conversion_arguments(watch_parser)
+    watch_parser.add_argument("--settle", type=float, default=folder_watcher.DEFAULT_SETTLE_SECONDS, help="seconds a file must stay unchanged before conversion")
+    watch_parser.add_argument("--poll", action="store_true", help="use polling instead of inotify")
+    watch_parser.add_argument("--poll-interval", type=float, default=folder_watcher.DEFAULT_POLL_INTERVAL)
+    watch_parser.add_argument("--recursive", action="store_true")
+    watch_parser.add_argument("--include-existing", action="store_true", help="also convert files already in the folder at startup")
+    add_stats_arguments(watch_parser)
+    jobs_parser = commands.add_parser("jobs", help="manage the persistent conversion job queue")
+    jobs_commands = jobs_parser.add_subparsers(dest="jobs_command", required=True)
+    jobs_commands.add_parser("list", help="list jobs and their progress")
+    jobs_add_parser = jobs_commands.add_parser("add", help="queue a content conversion job")
+    jobs_add_parser.add_argument("paths", nargs="+", help="text files (.txt, .srt, .ass, .csv, .json, .html), zip/tar archives or folders")
+    jobs_add_parser.add_argument("--output", required=True, help="output folder for converted files")
+    add_content_conversion_arguments(jobs_add_parser)
+    jobs_run_parser = jobs_commands.add_parser("run", help="run all unfinished jobs one after another, resuming interrupted ones")
+    jobs_run_parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="files converted in parallel (1 keeps list order)")
+    jobs_run_parser.add_argument("--memory-budget", type=int, default=DEFAULT_MEMORY_BUDGET_MB, metavar="MB", help="estimated memory allowed for files in flight (0 for no limit)")
+    add_stats_arguments(jobs_run_parser)
+    jobs_cancel_parser = jobs_commands.add_parser("cancel", help="cancel a queued or interrupted job")
+    jobs_cancel_parser.add_argument("job_id", type=int)
+    shard_parser = commands.add_parser("shard", help="split one job into shards for several machines, run a shard, or merge shard results")
+    shard_commands = shard_parser.add_subparsers(dest="shard_command", required=True)
+    shard_plan_parser = shard_commands.add_parser("plan", help="write one manifest per shard (files are assigned by a hash of their relative path)")
+    shard_plan_parser.add_argument("paths", nargs="+", help="files or folders")
+    shard_plan_parser.add_argument("--shards", type=int, required=True)
+    shard_plan_parser.add_argument("--manifest-dir", required=True)
+    shard_plan_parser.add_argument("--output", required=True, help="output folder (each node may override it with 'shard run --output')")
+    shard_plan_parser.add_argument("--kind", choices=shard_runner.SHARD_KINDS, default='content')
+    shard_plan_parser.add_argument("--operation", choices=['copy', 'move'], default='copy', help="filename shards only")
+    shard_plan_parser.add_argument("--detect-language", action="store_true", help="filename shards only")
+    shard_plan_parser.add_argument("--archive-entries", action="store_true", help="filename shards only: also rename entries inside zip/tar archives")
+    add_content_conversion_arguments(shard_plan_parser)
+    shard_run_parser = shard_commands.add_parser("run", help="run one shard, appending a per-file result log (rerun to resume)")
+    shard_run_parser.add_argument("manifest")
+    shard_run_parser.add_argument("--root", help="where the input root is mounted on this node")
+    shard_run_parser.add_argument("--output", help="output folder on this node")
+    shard_run_parser.add_argument("--log", help="result log path (default: next to the manifest)")
+    add_stats_arguments(shard_run_parser)
+    shard_merge_parser = shard_commands.add_parser("merge", help="combine shard result logs into one report; exits 1 on missing files or output name conflicts")
+    shard_merge_parser.add_argument("manifests", nargs="+")
+    shard_merge_parser.add_argument("--logs", nargs="+", help="result logs in the same order as the manifests")
+    shard_merge_parser.add_argument("--report", help="write the merged report as JSON")
+    converters_parser = commands.add_parser("converters", help="list OpenCC configs and the memory used by each loaded one")
+    converters_parser.add_argument("--load", nargs="*", metavar="CONFIG", help="load these configs first (all available ones if none are given)")
+    stress_parser = commands.add_parser("stress-test", help="convert concurrently from many threads and compare with single-threaded results")
+    stress_parser.add_argument("--configs", nargs="+", default=['s2t', 't2s'], choices=available_converter_configs())
+    stress_parser.add_argument("--threads", type=int, default=16)
+    stress_parser.add_argument("--iterations", type=int, default=200, help="conversions per thread")
+    stress_parser.add_argument("--mode", choices=['pool', 'thread', 'shared'], default='pool', help="pool: checkout pool (default), thread: one converter per thread, shared: one unguarded converter")
+    stress_parser.add_argument("--max-instances", type=int, default=MAX_CONVERTER_INSTANCES, help="pool size limit per config")
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        conversion_server.serve(args.host, args.port, args.pool_size, read_custom_conversions_file(CUSTOM_CONVERSIONS_FILE), args.verbose, args.output_root, args.input_root, args.allow_host)
+    elif args.command == "watch":
+        if not os.path.isdir(args.output): print(f"Output folder does not exist: {args.output}"); return 1
+        # 輸出資料夾不可在監看範圍內：輸出檔會被排除監看，輸出資料夾即監看資料夾時所有檔案都不會被處理
+        watch_root, output_root = os.path.realpath(args.folder), os.path.realpath(args.output)
+        if os.path.commonpath([watch_root, output_root]) == watch_root: print(f"Output folder must be outside the watched folder: {args.output}"); return 1
+        cc_s2t, cc_t2s = get_converter('s2t'), get_converter('t2s')
+        params = content_params_from_arguments(args, cc_s2t, cc_t2s); journal = JobJournal(); report = job_report_from_arguments(args, 'watch')
+        def convert_arrival(path):
+            started = time.perf_counter()
+            # 同一來源再次修改時更新原本的輸出檔；輸出路徑與 {index} 序號記在工作日誌中，重新啟動後延續
+            try: status, detail = convert_watched_file(journal, path, params, cc_s2t, cc_t2s)
+            except Exception as e:
+                if report: report.record(path, 'failed_exception', time.perf_counter() - started, bytes_in=output_size(path), detail=str(e))
+                raise
+            print(describe_content_result(path, status, detail) or (f"{status}: {path} -> {detail['output_path']}" if status == 'converted' else f"{status}: {path}"))
+            if report:
+                output = detail['output_path'] if status == 'converted' else None
+                report.record(path, status, time.perf_counter() - started, detail['encoding'] if output else None, output_size(path), output_size(output), output,
+                              detail if isinstance(detail, str) else None)
+        watcher = folder_watcher.FolderWatcher(args.folder, convert_arrival, settle_seconds=args.settle, poll_interval=args.poll_interval, recursive=args.recursive,
+                                               include_existing=args.include_existing, exclude_folders=[args.output], use_inotify=not args.poll,
+                                               suffixes=TEXT_INPUT_SUFFIXES + ARCHIVE_SUFFIXES)
+        print(f"Watching {os.path.abspath(args.folder)} -> {os.path.abspath(args.output)}")
+        with JobProfiler(args.profile) as profiler:
+            try: watcher.run()
+            except KeyboardInterrupt: pass
+        if message := describe_line_cache(params): print(message)
+        close_job_report(report)
+        write_stats_report(args, profiler, kind='watch', folder=os.path.abspath(args.folder))
+    elif args.command == "jobs": return run_jobs_command(args)
+    elif args.command == "shard": return run_shard_command(args)
+    elif args.command == "converters":
+        try:
+            if args.load is not None: converter_registry.preload(args.load or available_converter_configs())
+        except ValueError as e: print(e); return 1
+        memory = converter_registry.memory_report()
+        print(f"memory: {'RSS growth while loading (includes native OpenCC memory)' if converter_registry.memory_source == 'rss' else 'Python heap only (native OpenCC memory not included)'}")
+        for config in available_converter_configs(): print(f"{config:<6} {f'{memory[config][0]} x, {memory[config][1] / 1024 / 1024:.1f} MB' if config in memory else 'not loaded'}")
+    elif args.command == "stress-test":
+        result = stress_test_converters(tuple(args.configs), args.threads, args.iterations, args.mode, args.max_instances)
+        print(f"{result['mode']}: {result['conversions']} conversions on {result['threads']} threads in {result['seconds']:.2f} s (including on-demand converter loading)")
+        if result['instances']: print("converters created: " + ", ".join(f"{config} x{count}" for config, count in result['instances'].items()))
+        for error in result['errors'][:10]: print(f"error: {error}")
+        print(f"mismatches: {result['mismatches']}, errors: {len(result['errors'])}")
+        return 1 if result['mismatches'] or result['errors'] else 0
+    return 0
+
+def run_jobs_command(args):
+    journal = JobJournal()
+    if args.jobs_command == "list":
+        for job in journal.list_jobs(): print(f"#{job['id']} {job['kind']} {job['state']} {job['done']}/{job['total']} {time.strftime('%Y-%m-%d %H:%M', time.localtime(job['created']))}")
+    elif args.jobs_command == "add":
+        if not os.path.isdir(args.output): print(f"Output folder does not exist: {args.output}"); return 1
+        # 工作可能從其他目錄執行，輸入與輸出路徑一律保存為絕對路徑
+        args.output = os.path.abspath(args.output); filepaths = []
+        for path in args.paths:
+            if os.path.isdir(path): filepaths.extend(os.path.abspath(os.path.join(r, f)) for r, _, fs in os.walk(path) for f in sorted(fs) if is_text_input(f) or is_archive(f))
+            else: filepaths.append(os.path.abspath(path))
+        params = persistable_content_params(content_params_from_arguments(args, None, None))
+        print(f"Queued job #{journal.create_job('content', params, filepaths)} with {len(filepaths)} files")
+    elif args.jobs_command == "cancel": journal.set_state(args.job_id, 'cancelled')
+    elif args.jobs_command == "run":
+        cc_s2t, cc_t2s = get_converter('s2t'), get_converter('t2s'); finished = []; report = job_report_from_arguments(args, 'content')
+        with JobProfiler(args.profile) as profiler:
+            for job in journal.unfinished_jobs('content'):
+                params = restore_content_params(journal.get_job(job['id'])['params'], cc_s2t, cc_t2s)
+                if not os.path.isdir(params['output_folder']): print(f"Job #{job['id']}: output folder missing: {params['output_folder']}"); continue
+                print(f"Running job #{job['id']} ({job['done']}/{job['total']} already done)")
+                if report: report.job = job['id']
+                try: success, fail, _, _, _ = run_content_job(journal, job['id'], params, cc_s2t, cc_t2s, workers=args.workers, memory_budget=args.memory_budget * 1024 * 1024, report=report)
+                except KeyboardInterrupt: print("Interrupted; run again to resume."); close_job_report(report); return 1
+                except Exception as e: print(f"Job #{job['id']} stopped: {e}; run again to resume."); close_job_report(report); return 1
+                print(f"Job #{job['id']} finished: success {success}, failed/skipped {fail}"); finished.append({'id': job['id'], 'success': success, 'failed': fail})
+        close_job_report(report)
+        write_stats_report(args, profiler, kind='jobs', jobs=finished)
+    return 0
+
+def run_shard_command(args):
+    if args.shard_command == "plan":
+        if args.shards < 1: print("--shards must be at least 1"); return 1
+        args.output = os.path.abspath(args.output)
+        if args.kind == 'content': params = content_params_from_arguments(args, None, None)
+        else: params = {'conversion_type': args.direction, 'output_folder': args.output, 'operation_type': args.operation, 'detect_language': args.detect_language, 'convert_archive_entries': args.archive_entries}
+        for path in shard_runner.plan_shards(args.paths, args.shards, args.kind, params, args.manifest_dir): print(f"{path}: {len(shard_runner.load_manifest(path)['files'])} files")
+    elif args.shard_command == "run":
+        report = job_report_from_arguments(args, 'shard')
+        with JobProfiler(args.profile) as profiler:
+            try: counts = shard_runner.run_shard(args.manifest, args.log, args.root, args.output, report=report)
+            except ValueError as e: print(e); return 1
+            except KeyboardInterrupt: print("Interrupted; run again to resume."); return 1
+            finally: close_job_report(report)
+        print(", ".join(f"{status} {count}" for status, count in sorted(counts.items())) or "no files")
+        write_stats_report(args, profiler, kind='shard', manifest=os.path.abspath(args.manifest), results=dict(counts))
+    elif args.shard_command == "merge":
+        if args.logs and len(args.logs) != len(args.manifests): print("--logs must list one log per manifest"); return 1
+        try: report = shard_runner.merge_shard_logs(args.manifests, args.logs)
+        except ValueError as e: print(e); return 1
+        print(f"{len(report['results'])} files from shards {report['shards_merged']} of {report['shard_count']}: " + ", ".join(f"{status} {count}" for status, count in sorted(report['summary'].items())))
+        for shard in report['shards_absent']: print(f"shard {shard} was not merged")
+        for shard in report['duplicate_shards']: print(f"shard {shard} was given more than once")
+        for path in report['missing'][:20]: print(f"missing: {path}")
+        for conflict in report['conflicts'][:20]: print(f"conflict: {conflict['output']} <- " + ", ".join(conflict['inputs']))
+        if report['renamed']: print(f"{len(report['renamed'])} outputs were renamed because the name was already taken in the output folder")
+        if args.report:
+            with open(args.report, 'w', encoding='utf-8') as f: json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"Report written to {args.report}")
+        return 1 if report['missing'] or report['conflicts'] or report['shards_absent'] or report['duplicate_shards'] else 0
+    return 0
+
 # --- 程式執行入口 ---
 if __name__ == "__main__":
+    if len(sys.argv) > 1: sys.exit(run_command_line(sys.argv[1:]))
     root = tkdnd.Tk()
     try:
         s = ttk.Style(root)
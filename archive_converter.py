@@ -0,0 +1,220 @@
+#
+# 檔案名稱: archive_converter.py
+#
+# 壓縮檔 (zip / tar) 直接轉換：逐一讀取項目，轉換後寫入新的壓縮檔，不需先解壓到資料夾
+# 每個項目先放進有大小上限的暫存緩衝區 (超過時才落地)，以便偵測編碼與原樣複製略過的項目
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+
+from converter_core import (INITIAL_READ_SIZE_FOR_CHARSET, detect_bytes_encoding, is_convertible_chinese, read_text_chunk, convert_content_text,
+                            convert_content_file, plan_filename_conversion, reserve_output_path, content_output_base_name, content_output_name, find_available_path,
+                            convert_structured_block)
+from structured_text import STRUCTURED_FORMATS, iter_structured_blocks, block_text, block_source
+from task_scheduler import scheduler
+from stage_stats import stage_stats
+
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+TAR_COMPRESSIONS = {'.tar': '', '.tar.gz': 'gz', '.tgz': 'gz', '.tar.bz2': 'bz2', '.tbz2': 'bz2', '.tar.xz': 'xz', '.txz': 'xz'}
+ENTRY_SPOOL_SIZE = 1024 * 1024 * 32
+COPY_BUFFER_SIZE = 1024 * 1024
+ZIP_UTF8_FLAG = 0x800
+ZIP_LEGACY_ENCODINGS = ('utf-8', 'gbk') # 未標記 UTF-8 的項目名稱：中文 Windows 建立的 zip 多為 GBK，也有直接寫入 UTF-8 位元組而未設旗標的
+
+
+def archive_suffix(path):
+    """ 回傳完整的壓縮檔副檔名 (例如 .tar.gz)，不是壓縮檔時回傳 None """
+    lower = path.lower()
+    return next((suffix for suffix in sorted(ARCHIVE_SUFFIXES, key=len, reverse=True) if lower.endswith(suffix)), None)
+
+def is_archive(path): return archive_suffix(path) is not None
+
+def split_archive_name(filename):
+    suffix = archive_suffix(filename) or os.path.splitext(filename)[1]
+    return filename[:len(filename) - len(suffix)], suffix
+
+
+def zip_entry_name(info):
+    """ zipfile 對未設 UTF-8 旗標的名稱一律以 cp437 解碼，這裡還原原始位元組後依序改用 UTF-8、GBK 解碼；都失敗時維持 cp437 的結果 """
+    if info.flag_bits & ZIP_UTF8_FLAG: return info.filename
+    try: raw = info.filename.encode('cp437')
+    except UnicodeEncodeError: return info.filename
+    for encoding in ZIP_LEGACY_ENCODINGS:
+        try: return raw.decode(encoding)
+        except UnicodeDecodeError: pass
+    return info.filename
+
+def iter_archive_entries(path):
+    """ 依序產生 (項目名稱, 種類, 原始資訊, 內容)；種類為 dir / file / other，內容為已放入緩衝區的二進位檔案物件 """
+    if archive_suffix(path) == '.zip':
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if info.is_dir(): yield zip_entry_name(info), 'dir', info, None; continue
+                with archive.open(info) as source, tempfile.SpooledTemporaryFile(ENTRY_SPOOL_SIZE) as spool:
+                    shutil.copyfileobj(source, spool, COPY_BUFFER_SIZE); spool.seek(0)
+                    yield zip_entry_name(info), 'file', info, spool
+        return
+    # 以串流模式讀取 tar，壓縮的 tar 也不需要回頭搜尋
+    with tarfile.open(path, 'r|*') as archive:
+        for member in archive:
+            if member.isdir(): yield member.name, 'dir', member, None; continue
+            if not member.isfile(): yield member.name, 'other', member, None; continue
+            with tempfile.SpooledTemporaryFile(ENTRY_SPOOL_SIZE) as spool:
+                shutil.copyfileobj(archive.extractfile(member), spool, COPY_BUFFER_SIZE); spool.seek(0)
+                yield member.name, 'file', member, spool
+
+
+class ArchiveWriter:
+    """ 寫入與來源相同格式的壓縮檔；tar 需要事先知道大小，內容先寫入緩衝區再加入。
+        zip 項目一律使用新的 ZipInfo，非 ASCII 名稱由 zipfile 以 UTF-8 寫入並設定 UTF-8 旗標，不沿用來源的 flag_bits """
+    def __init__(self, path, suffix):
+        self.is_zip = suffix == '.zip'
+        self.archive = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) if self.is_zip else tarfile.open(path, f"w|{TAR_COMPRESSIONS[suffix]}")
+
+    def add_directory(self, name, source_info):
+        if self.is_zip:
+            info = zipfile.ZipInfo(name, source_info.date_time); info.external_attr = source_info.external_attr; self.archive.writestr(info, b"")
+        else: info = tarfile.TarInfo(name); info.type, info.mode, info.mtime = tarfile.DIRTYPE, source_info.mode, source_info.mtime; self.archive.addfile(info)
+
+    def add_other(self, name, source_info, linkname):
+        info = tarfile.TarInfo(name); info.linkname = linkname
+        for attr in ('type', 'mode', 'mtime', 'uid', 'gid', 'uname', 'gname'): setattr(info, attr, getattr(source_info, attr))
+        self.archive.addfile(info)
+
+    def add_file(self, name, source_info, write_content):
+        """ write_content(二進位檔案物件) 負責寫入項目內容 """
+        if self.is_zip:
+            info = zipfile.ZipInfo(name, source_info.date_time); info.compress_type = zipfile.ZIP_DEFLATED; info.external_attr = source_info.external_attr
+            with self.archive.open(info, 'w', force_zip64=True) as target: write_content(target)
+            return
+        with tempfile.SpooledTemporaryFile(ENTRY_SPOOL_SIZE) as spool:
+            write_content(spool); info = tarfile.TarInfo(name)
+            info.size, info.mode, info.mtime = spool.tell(), source_info.mode, source_info.mtime; spool.seek(0)
+            self.archive.addfile(info, spool)
+
+    def close(self): self.archive.close()
+
+
+def plan_entry_name(name, cc_instance, detect_language=False):
+    """ 逐層轉換項目路徑中的每個名稱，沿用檔名轉換的規則 """
+    parts = name.rstrip('/').split('/'); is_dir = name.endswith('/')
+    converted = [plan_filename_conversion(part, cc_instance, detect_language, is_dir=is_dir or i < len(parts) - 1)[1] if part else part for i, part in enumerate(parts)]
+    return '/'.join(converted) + ('/' if is_dir else '')
+
+def unique_entry_name(name, used_names):
+    if name not in used_names: used_names.add(name); return name
+    base, ext = os.path.splitext(name); counter = 1
+    while f"{base}({counter}){ext}" in used_names: counter += 1
+    used_names.add(f"{base}({counter}){ext}"); return f"{base}({counter}){ext}"
+
+
+def convert_entry_content(spool, target, params, cc_s2t, cc_t2s, fmt=None):
+    """ 轉換單一 txt 項目 (fmt 為字幕、CSV 等結構化格式時只轉換文字節點) 並以 UTF-8 寫入 target，回傳 (狀態, 第一段原文, 第一段轉換結果)；無法轉換時原樣複製 """
+    initial_bytes = spool.read(INITIAL_READ_SIZE_FOR_CHARSET); spool.seek(0)
+    if not (encoding := detect_bytes_encoding(initial_bytes, params['use_manual_encoding'], params['manual_encoding'])):
+        shutil.copyfileobj(spool, target, COPY_BUFFER_SIZE); return 'failed_read', None, None
+    text_file = io.TextIOWrapper(spool, encoding=encoding, errors='replace')
+    try:
+        if fmt: blocks = iter_structured_blocks(text_file, fmt); first_block = next(blocks, []); first_chunk, sample = block_source(first_block), block_text(first_block)
+        else: first_chunk = sample = read_text_chunk(text_file)
+        # 語言判斷只看第一段，避免為了判斷而把整個項目讀進記憶體
+        if not is_convertible_chinese(sample):
+            spool.seek(0); shutil.copyfileobj(spool, target, COPY_BUFFER_SIZE); return 'skipped_non_chinese', None, None
+        if fmt:
+            first_converted = convert_structured_block(first_block, params, cc_s2t, cc_t2s); target.write(first_converted.encode('utf-8'))
+            for block in blocks: target.write(convert_structured_block(block, params, cc_s2t, cc_t2s).encode('utf-8'))
+            return 'converted', first_chunk, first_converted
+        first_converted = convert_content_text(first_chunk, params, cc_s2t, cc_t2s); target.write(first_converted.encode('utf-8'))
+        while chunk := read_text_chunk(text_file): target.write(convert_content_text(chunk, params, cc_s2t, cc_t2s).encode('utf-8'))
+        return 'converted', first_chunk, first_converted
+    finally: text_file.detach()
+
+
+def convert_archive(archive_path, output_folder, output_base_name, cc_names=None, content_params=None, cc_s2t=None, cc_t2s=None, detect_language=False, should_stop=None):
+    """ 建立轉換後的壓縮檔；cc_names 為 None 時不轉換項目名稱，content_params 為 None 時不轉換內容
+        回傳 (輸出路徑, {項目名稱: 狀態}, (第一段原文, 第一段轉換結果))；中途停止或發生錯誤時刪除未完成的輸出檔，停止時輸出路徑為 None """
+    suffix = archive_suffix(archive_path)
+    output_path = reserve_output_path(output_folder, output_base_name, suffix)
+    writer, used_names, results, preview, complete = ArchiveWriter(output_path, suffix), set(), {}, (None, None), False
+    try:
+        for name, kind, info, spool in iter_archive_entries(archive_path):
+            if should_stop and should_stop(): break
+            scheduler.checkpoint()
+            new_name = unique_entry_name(plan_entry_name(name, cc_names, detect_language) if cc_names else name, used_names)
+            if kind == 'dir': writer.add_directory(new_name, info); continue
+            if kind == 'other':
+                # 連結目標也要跟著改名，否則會指向已不存在的項目
+                writer.add_other(new_name, info, plan_entry_name(info.linkname, cc_names, detect_language) if cc_names and info.linkname else info.linkname)
+                results[name] = 'skipped_ext'; continue
+            # 項目不會先解壓縮，只看項目本身的副檔名
+            entry_ext = os.path.splitext(name)[1].lower(); entry_format = STRUCTURED_FORMATS.get(entry_ext)
+            if content_params is None or not (entry_ext == '.txt' or entry_format):
+                writer.add_file(new_name, info, lambda target: shutil.copyfileobj(spool, target, COPY_BUFFER_SIZE))
+                results[name] = 'converted' if new_name != name else ('skipped_ext' if content_params is not None else 'skipped_unchanged'); continue
+            outcome = []
+            writer.add_file(new_name, info, lambda target: outcome.append(convert_entry_content(spool, target, content_params, cc_s2t, cc_t2s, entry_format)))
+            # 內容不需轉換但名稱已轉換的項目同樣算作已轉換
+            status, first_original, first_converted = outcome[0]; results[name] = 'converted' if new_name != name and status == 'skipped_non_chinese' else status
+            if status == 'converted' and preview[0] is None: preview = (first_original, first_converted)
+        else: complete = True
+    finally:
+        writer.close()
+        if not complete: os.remove(output_path)
+    return output_path if complete else None, results, preview
+
+
+def convert_content_archive(filepath, params, index, cc_s2t, cc_t2s):
+    """ 與 convert_content_file 相同的回傳格式；壓縮檔內的 txt 項目轉換內容，params['convert_archive_names'] 為真時項目名稱一併轉換
+        沒有任何項目的內容或名稱被轉換時刪除輸出檔，回傳 skipped_non_chinese """
+    base_name, _ = split_archive_name(os.path.basename(filepath))
+    output_path, entries, (original, converted) = convert_archive(filepath, params['output_folder'], content_output_base_name(base_name, params, index),
+                                                                 params['cc_convert'] if params.get('convert_archive_names') else None, params, cc_s2t, cc_t2s)
+    if output_path is None: return 'failed_exception', "archive conversion did not complete"
+    converted_count = sum(1 for status in entries.values() if status == 'converted')
+    print(f"Archive '{os.path.basename(filepath)}': {converted_count} of {len(entries)} entries converted")
+    if not converted_count: os.remove(output_path); return 'skipped_non_chinese', None
+    return 'converted', {'output_path': output_path, 'encoding': 'archive', 'original': original or "", 'converted': converted or "", 'entries': entries}
+
+
+def content_path_output_name(filepath, params, index):
+    """ convert_content_path 的輸出檔名，回傳 (檔名 (不含副檔名), 副檔名)；輸出資料夾已有同名檔案時實際路徑會另加編號 """
+    if is_archive(filepath): base_name, suffix = split_archive_name(os.path.basename(filepath)); return content_output_base_name(base_name, params, index), suffix
+    return content_output_name(filepath, params, index)[:2]
+
+def convert_content_path(filepath, params, index, cc_s2t, cc_t2s):
+    """ 一般 txt 檔或壓縮檔都可傳入的內容轉換入口 """
+    if is_archive(filepath): return convert_content_archive(filepath, params, index, cc_s2t, cc_t2s)
+    return convert_content_file(filepath, params, index, cc_s2t, cc_t2s)
+
+
+def convert_filename_path(old_path, cc_instance, output_folder, operation_type, detect_language=False, convert_archive_entries=False, should_stop=None):
+    """ 檔名轉換的單一檔案流程，回傳 (狀態, 新路徑)；未產生新檔時新路徑為 None """
+    if not os.path.exists(old_path): return 'failed_not_exist', None
+    status, new_filename = plan_filename_conversion(os.path.basename(old_path), cc_instance, detect_language)
+    if convert_archive_entries and is_archive(old_path):
+        # 壓縮檔本身的名稱不需轉換時，仍可能有項目名稱需要轉換，一律產生新的壓縮檔
+        new_path, _, _ = convert_archive(old_path, output_folder, split_archive_name(new_filename)[0], cc_names=cc_instance, detect_language=detect_language, should_stop=should_stop)
+        if new_path is None: return 'skipped_cancelled', None
+        if operation_type == 'move': os.remove(old_path)
+        return 'converted', new_path
+    if status != 'converted': return status, None
+    new_path = find_available_path(output_folder, *os.path.splitext(new_filename))
+    with stage_stats.timer(operation_type):
+        if operation_type == 'move': shutil.move(old_path, new_path)
+        elif operation_type == 'copy': shutil.copy2(old_path, new_path)
+    return 'converted', new_path
+
+
+def list_archive_entries(path, limit=1000):
+    """ 預覽用：回傳前 limit 個項目名稱 """
+    if archive_suffix(path) == '.zip':
+        with zipfile.ZipFile(path) as archive: return [zip_entry_name(info) for info in archive.infolist()[:limit]]
+    names = []
+    with tarfile.open(path, 'r|*') as archive:
+        for member in archive:
+            names.append(member.name + ('/' if member.isdir() else ''))
+            if len(names) >= limit: break
+    return names
@@ -0,0 +1,81 @@
+#
+# 檔案名稱: async_converter.py
+#
+# asyncio 介面：轉換與檔案讀取都交給有上限的執行緒池，事件迴圈本身不做阻塞工作
+import asyncio
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from converter_core import (ConversionService, open_txt_file_with_encoding_detection, read_text_chunk,
+                            STREAM_CHUNK_CHARS)
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_PENDING = 256
+
+
+class AsyncConverter:
+    """ max_workers 限制執行緒數量；max_pending 限制同時送進執行緒池的工作，超過時呼叫端會在 await 處等待。
+        asyncio.Semaphore 只能在建立它的事件迴圈中使用，因此每個事件迴圈各有一個 (多次 asyncio.run 也可共用同一個 AsyncConverter) """
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, max_pending=DEFAULT_MAX_PENDING, custom_conversions=None, service=None):
+        self.service = service or ConversionService(custom_conversions)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="async-convert")
+        self.max_pending = max_pending
+        self._pending = weakref.WeakKeyDictionary()
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        if (pending := self._pending.get(loop)) is None: pending = self._pending[loop] = asyncio.Semaphore(self.max_pending)
+        async with pending:
+            return await loop.run_in_executor(self.executor, func, *args)
+
+    async def convert_text(self, text, direction='s2t', enable_custom=True):
+        return (await self._run(self.service.convert, [text], direction, enable_custom))[0]
+
+    async def convert_many(self, texts, direction='s2t', enable_custom=True):
+        return await self._run(self.service.convert, list(texts), direction, enable_custom)
+
+    async def iter_converted_file(self, filepath, direction='s2t', enable_custom=True, chunk_chars=STREAM_CHUNK_CHARS, use_manual_encoding=False, manual_encoding=None):
+        """ 逐段讀取並轉換檔案；下一段要等呼叫端取走目前這段後才會讀取 """
+        text_file, encoding = await self._run(open_txt_file_with_encoding_detection, filepath, use_manual_encoding, manual_encoding)
+        if text_file is None: raise OSError(encoding)
+        def next_chunk():
+            chunk = read_text_chunk(text_file, chunk_chars)
+            return self.service.convert([chunk], direction, enable_custom)[0] if chunk else ""
+        try:
+            while chunk := await self._run(next_chunk): yield chunk
+        finally: await self._run(text_file.close)
+
+    async def plan_filenames(self, filepaths, direction='s2t', detect_language=False, output_folder=None):
+        """ 回傳 [(原路徑, 狀態, 新路徑)]，狀態代碼與批次檔名轉換相同 """
+        filepaths = list(filepaths)
+        plans = await self._run(self.service.plan_filenames, [os.path.basename(p) for p in filepaths], direction, detect_language)
+        return [(path, status, os.path.join(output_folder or os.path.dirname(path), new_name)) for path, (status, new_name) in zip(filepaths, plans)]
+
+    def close(self):
+        """ 關閉執行緒池；關閉的是共用的預設實例時，之後的 get_default_converter 會重新建立 """
+        global _default_converter
+        if self is _default_converter: _default_converter = None
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self): return self
+    async def __aexit__(self, *exc_info):
+        # 共用的預設實例由程序持有，async with 結束時不關閉，以免影響其他呼叫端
+        if self is not _default_converter: self.close()
+
+
+_default_converter = None
+
+def get_default_converter():
+    global _default_converter
+    if _default_converter is None: _default_converter = AsyncConverter()
+    return _default_converter
+
+async def convert_text_async(text, direction='s2t', enable_custom=True):
+    return await get_default_converter().convert_text(text, direction, enable_custom)
+
+def iter_converted_file_async(filepath, direction='s2t', **kwargs):
+    return get_default_converter().iter_converted_file(filepath, direction, **kwargs)
+
+async def plan_filenames_async(filepaths, direction='s2t', detect_language=False, output_folder=None):
+    return await get_default_converter().plan_filenames(filepaths, direction, detect_language, output_folder)
@@ -0,0 +1,73 @@
+#
+# 檔案名稱: batch_scheduler.py
+#
+# 依檔案大小排程批次轉換：大檔先開始以縮短總時間，小檔合併成一批減少排程開銷，並以「處理中位元組」上限控制尖峰記憶體
+import os
+import queue
+import threading
+
+SMALL_FILE_BYTES = 1024 * 256
+SMALL_BATCH_BYTES = 1024 * 1024 * 16
+SMALL_BATCH_FILES = 256
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_MEMORY_BUDGET_MB = 1024
+# 讀入的位元組解碼成 str (每字最多 4 bytes)，再加上轉換結果與輸出緩衝，約為原始大小的數倍
+MEMORY_PER_LOADED_BYTE = 6
+
+
+def stat_entries(entries):
+    """ [(seq, path)] -> [(seq, path, size)]；無法取得大小的檔案以 0 計，交由轉換流程回報錯誤 """
+    sized = []
+    for seq, path in entries:
+        try: size = os.path.getsize(path)
+        except OSError: size = 0
+        sized.append((seq, path, size))
+    return sized
+
+def plan_units(sized_entries, small_file_bytes=SMALL_FILE_BYTES, batch_bytes=SMALL_BATCH_BYTES, batch_files=SMALL_BATCH_FILES):
+    """ 回傳工作單位清單：大檔依大小遞減各自一個單位，小檔依原順序合併 """
+    large = sorted((e for e in sized_entries if e[2] > small_file_bytes), key=lambda e: -e[2])
+    units, batch, batch_size = [[entry] for entry in large], [], 0
+    for entry in (e for e in sized_entries if e[2] <= small_file_bytes):
+        if batch and (batch_size + entry[2] > batch_bytes or len(batch) >= batch_files): units.append(batch); batch, batch_size = [], 0
+        batch.append(entry); batch_size += entry[2]
+    if batch: units.append(batch)
+    return units
+
+
+class ByteBudget:
+    """ 處理中位元組的上限；超過時取得者等待，單一工作大於上限時等其他工作結束後單獨執行 """
+    def __init__(self, limit):
+        self.limit = limit; self.in_flight = 0; self.peak = 0; self._cond = threading.Condition()
+
+    def acquire(self, amount, should_stop=None):
+        with self._cond:
+            while self.in_flight and self.in_flight + amount > self.limit:
+                if should_stop and should_stop(): return False
+                self._cond.wait(0.1)
+            self.in_flight += amount; self.peak = max(self.peak, self.in_flight)
+        return True
+
+    def release(self, amount):
+        with self._cond: self.in_flight -= amount; self._cond.notify_all()
+
+
+def run_units(units, handle, workers=DEFAULT_WORKERS, budget=None, estimate=lambda entry: entry[2], should_stop=None):
+    """ 以 workers 個執行緒處理工作單位，handle(entry) 須自行處理例外；should_stop 回傳 True 時不再開始新檔案 """
+    should_stop = should_stop or (lambda: False); pending = queue.Queue()
+    for unit in units: pending.put(unit)
+    def worker():
+        while not should_stop():
+            try: unit = pending.get_nowait()
+            except queue.Empty: return
+            cost = sum(estimate(entry) for entry in unit)
+            if budget and not budget.acquire(cost, should_stop): return
+            try:
+                for entry in unit:
+                    if should_stop(): return
+                    handle(entry)
+            finally:
+                if budget: budget.release(cost)
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, workers))]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
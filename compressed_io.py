@@ -0,0 +1,68 @@
+#
+# 檔案名稱: compressed_io.py
+#
+# 壓縮文字檔的讀寫：依檔頭 (magic bytes) 判斷 gzip / bz2 / xz / zstd，讀取時邊解壓邊處理，輸出也可直接寫成壓縮檔
+import bz2
+import gzip
+import io
+import lzma
+
+# zstd 需要 zstandard 套件，未安裝時只支援標準函式庫內建的格式
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+COMPRESSION_MAGIC = (('gzip', b'\x1f\x8b'), ('bz2', b'BZh'), ('xz', b'\xfd7zXZ\x00'), ('zstd', b'\x28\xb5\x2f\xfd'))
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'bz2': '.bz2', 'xz': '.xz', 'zstd': '.zst'}
+# 'same' 表示沿用輸入檔的壓縮格式
+OUTPUT_COMPRESSIONS = ('none', 'same', 'gzip', 'bz2', 'xz', 'zstd')
+# 字幕、CSV、JSON 與 HTML 只轉換文字節點，見 structured_text.py
+TEXT_BASE_SUFFIXES = ('.txt', '.srt', '.ass', '.ssa', '.csv', '.json', '.html', '.htm')
+TEXT_INPUT_SUFFIXES = TEXT_BASE_SUFFIXES + tuple(base + suffix for base in TEXT_BASE_SUFFIXES for suffix in COMPRESSION_SUFFIXES.values())
+
+
+def available_output_compressions(): return tuple(c for c in OUTPUT_COMPRESSIONS if c != 'zstd' or ZSTD_AVAILABLE)
+
+def detect_compression(filepath):
+    """ 依檔頭判斷壓縮格式，一般檔案回傳 None """
+    with open(filepath, 'rb') as f: head = f.read(6)
+    return next((name for name, magic in COMPRESSION_MAGIC if head.startswith(magic)), None)
+
+def is_text_input(path): return path.lower().endswith(TEXT_INPUT_SUFFIXES)
+
+def split_compressed_name(filename):
+    """ 去掉壓縮副檔名：'log.txt.gz' -> ('log.txt', '.gz') """
+    lower = filename.lower()
+    suffix = next((s for s in COMPRESSION_SUFFIXES.values() if lower.endswith(s)), "")
+    return filename[:len(filename) - len(suffix)], suffix
+
+def _require_zstd():
+    if not ZSTD_AVAILABLE: raise RuntimeError("zstd support requires the zstandard package")
+
+def open_decompressed(filepath, compression):
+    """ 以二進位模式開啟並即時解壓縮 """
+    if compression is None: return open(filepath, 'rb')
+    if compression == 'gzip': return gzip.open(filepath, 'rb')
+    if compression == 'bz2': return bz2.open(filepath, 'rb')
+    if compression == 'xz': return lzma.open(filepath, 'rb')
+    _require_zstd()
+    return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(filepath, 'rb'), read_across_frames=True, closefd=True))
+
+def open_decompressed_text(filepath, compression, encoding):
+    if compression is None: return open(filepath, 'r', encoding=encoding, errors='replace')
+    return io.TextIOWrapper(open_decompressed(filepath, compression), encoding=encoding, errors='replace')
+
+def resolve_output_compression(output_compression, input_compression):
+    """ 回傳實際使用的輸出壓縮格式，不壓縮時回傳 None """
+    if output_compression == 'same': return input_compression
+    return None if output_compression in (None, '', 'none') else output_compression
+
+def open_text_output(filepath, compression, encoding='utf-8'):
+    if compression is None: return open(filepath, 'w', encoding=encoding)
+    if compression == 'gzip': return gzip.open(filepath, 'wt', encoding=encoding)
+    if compression == 'bz2': return bz2.open(filepath, 'wt', encoding=encoding)
+    if compression == 'xz': return lzma.open(filepath, 'wt', encoding=encoding)
+    _require_zstd()
+    return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(open(filepath, 'wb'), closefd=True), encoding=encoding)
@@ -0,0 +1,114 @@
+#
+# 檔案名稱: content_dedup.py
+#
+# 內容去重：批次中位元組完全相同的輸入檔只轉換一次，其餘以 reflink (不支援時複製) 產生各自的輸出檔；硬連結需明確指定
+import hashlib
+import os
+import shutil
+import threading
+from collections import Counter
+
+from converter_core import reserve_output_path
+from archive_converter import archive_suffix, content_path_output_name
+from structured_text import structured_format
+from stage_stats import stage_stats
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+DEDUP_LINK_MODES = ('auto', 'reflink', 'hardlink', 'copy')
+DEDUP_PREFIX_BYTES = 1024 * 64
+HASH_BUFFER_SIZE = 1024 * 1024
+FICLONE = 0x40049409 # Linux ioctl，btrfs / xfs 等支援寫入時複製的檔案系統
+
+
+def file_digest(path, limit=None):
+    """ 檔案 (或前 limit 位元組) 的 blake2b 雜湊 """
+    digest, remaining = hashlib.blake2b(digest_size=16), limit
+    with open(path, 'rb') as f:
+        while remaining is None or remaining > 0:
+            if not (block := f.read(HASH_BUFFER_SIZE if remaining is None else min(HASH_BUFFER_SIZE, remaining))): break
+            digest.update(block)
+            if remaining is not None: remaining -= len(block)
+    return digest.digest()
+
+def _split_groups(groups, key):
+    """ 以 key 細分每一組，只保留仍有兩個以上的組；無法讀取的檔案不參與去重 """
+    refined = []
+    for group in groups:
+        buckets = {}
+        for entry in group:
+            try: buckets.setdefault(key(entry), []).append(entry)
+            except OSError: pass
+        refined.extend(bucket for bucket in buckets.values() if len(bucket) > 1)
+    return refined
+
+def conversion_key(path):
+    """ 檔名中會影響轉換結果的部分：壓縮檔格式 (tar 的輸出壓縮方式依副檔名) 與結構化格式 (JSON、字幕等只轉換文字節點)。
+        輸入與輸出的壓縮格式依檔頭判斷，內容相同時必然一致，不需列入 """
+    return archive_suffix(path), structured_format(path)
+
+def find_duplicates(sized_entries, prefix_bytes=DEDUP_PREFIX_BYTES):
+    """ [(seq, path, size)] -> {重複檔 seq: 代表檔 seq}；先依大小、再依開頭的雜湊，最後才讀完整檔案，大小唯一的檔案完全不需讀取。
+        轉換方式不同的檔案 (見 conversion_key) 即使內容相同也分開比對 """
+    by_size = {}
+    for entry in sized_entries:
+        if entry[2] > 0: by_size.setdefault((entry[2],) + conversion_key(entry[1]), []).append(entry)
+    with stage_stats.timer('dedup_hash'):
+        groups = _split_groups([group for group in by_size.values() if len(group) > 1], lambda entry: file_digest(entry[1], prefix_bytes))
+        groups = [group for group in groups if group[0][2] <= prefix_bytes] + _split_groups([group for group in groups if group[0][2] > prefix_bytes], lambda entry: file_digest(entry[1]))
+    duplicates = {}
+    for group in groups:
+        first, *rest = sorted(group)
+        duplicates.update((entry[0], first[0]) for entry in rest)
+    return duplicates
+
+
+def link_output(source_path, target_path, mode='auto'):
+    """ 以 target_path (已預留的空檔) 提供與 source_path 相同的內容，回傳實際使用的方式
+        auto 只嘗試 reflink 再複製；硬連結的輸出共用同一個 inode，修改其中一個會改到其他，只在 mode 為 hardlink 時使用 """
+    if mode in ('auto', 'reflink') and FCNTL_AVAILABLE:
+        try:
+            with open(source_path, 'rb') as src, open(target_path, 'wb') as dst: fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return 'reflink'
+        except OSError: pass
+    if mode == 'hardlink':
+        temp_path = target_path + ".dedup"
+        try: os.link(source_path, temp_path); os.replace(temp_path, target_path); return 'hardlink'
+        except OSError:
+            if os.path.exists(temp_path): os.remove(temp_path)
+    shutil.copyfile(source_path, target_path)
+    return 'copy'
+
+
+class DedupStats:
+    """ 去重結果統計；執行緒安全 """
+    def __init__(self, link_mode='auto'):
+        self.link_mode = link_mode if link_mode in DEDUP_LINK_MODES else 'auto'
+        self._lock = threading.Lock(); self.groups = self.duplicates = self.bytes_skipped = 0; self.methods = Counter()
+
+    def add_plan(self, duplicates, sizes):
+        with self._lock:
+            self.groups += len(set(duplicates.values())); self.duplicates += len(duplicates); self.bytes_skipped += sum(sizes[seq] for seq in duplicates)
+
+    def add_link(self, method):
+        with self._lock: self.methods[method] += 1
+
+    def report(self):
+        with self._lock: return {'groups': self.groups, 'duplicates': self.duplicates, 'bytes_skipped': self.bytes_skipped, 'link_mode': self.link_mode, 'methods': dict(self.methods)}
+
+
+def write_duplicate_output(source_output, filepath, params, index, stats):
+    """ 重複檔依自己的檔名與序號產生輸出路徑，內容沿用代表檔的輸出 """
+    new_filepath = reserve_output_path(params['output_folder'], *content_path_output_name(filepath, params, index))
+    with stage_stats.timer('dedup_link'): stats.add_link(link_output(source_output, new_filepath, stats.link_mode))
+    return new_filepath
+
+def describe_dedup(params):
+    if (stats := params.get('dedup_stats')) is None or not stats.duplicates: return None
+    report = stats.report()
+    return (f"Deduplicated: {report['duplicates']} identical files in {report['groups']} groups converted once ({report['bytes_skipped'] / 1024 / 1024:.1f} MB skipped; "
+            + ", ".join(f"{method} {count}" for method, count in sorted(report['methods'].items())) + ")")
@@ -0,0 +1,176 @@
+#
+# 檔案名稱: conversion_server.py
+#
+# 本機 HTTP 轉換服務：常駐程序預先載入 OpenCC 與自訂詞彙，供其他程式重複呼叫
+import ipaddress
+import json
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from converter_core import ConversionService, converter_registry, read_txt_file_with_encoding_detection, available_converter_configs
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_POOL_SIZE = 4
+MAX_REQUEST_BODY = 1024 * 1024 * 256
+# Host 標頭的允許清單：擋下 DNS rebinding (惡意網域解析到 127.0.0.1 後由瀏覽器送出請求)
+LOOPBACK_HOST_NAMES = ('localhost', '127.0.0.1', '::1')
+JSON_CONTENT_TYPE = "application/json"
+
+
+class ConversionRequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message); self.status = status
+
+
+class ConversionServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, pool_size=DEFAULT_POOL_SIZE, custom_conversions=None, verbose=False, output_root=None, input_root=None, allowed_hosts=()):
+        # 轉換器與詞彙表在啟動時就準備好，之後每個請求直接借用；pool_size 為共用轉換器池中每個設定的數量上限
+        converter_registry.set_max_instances(pool_size)
+        self.service = ConversionService(custom_conversions)
+        self.verbose = verbose
+        self.output_root = os.path.realpath(output_root) if output_root else None
+        self.input_root = os.path.realpath(input_root) if input_root else None
+        self.allowed_hosts = {host.lower() for host in (*LOOPBACK_HOST_NAMES, *allowed_hosts)}
+        super().__init__(address, ConversionRequestHandler)
+
+    def is_loopback(self):
+        try: return ipaddress.ip_address(self.server_address[0]).is_loopback
+        except ValueError: return False
+
+    def is_allowed_host(self, host_header):
+        """ Host 標頭 (去掉連接埠) 必須是本機名稱或以 --allow-host 加入的名稱 """
+        if not host_header: return False
+        host = host_header.strip().lower()
+        host = host[1:host.find(']')] if host.startswith('[') else host.rsplit(':', 1)[0] if host.count(':') == 1 else host
+        return host in self.allowed_hosts
+
+    @staticmethod
+    def confine(root, path, name):
+        """ 把 path 解析到 root 之內 (相對路徑以 root 為基準，符號連結展開後再比對)，超出範圍時拒絕 """
+        resolved = os.path.realpath(os.path.join(root, path))
+        if os.path.commonpath([root, resolved]) != root: raise ConversionRequestError(403, f"'{name}' must be inside {root}")
+        return resolved
+
+    def resolve_input_path(self, path):
+        """ 有 input_root 時只允許讀取其中；沒有時只在僅限本機連線的情況下接受任意路徑 """
+        if self.input_root: return self.confine(self.input_root, path, 'path')
+        if not self.is_loopback(): raise ConversionRequestError(403, "/convert/file requires --input-root when the service is not bound to a loopback address")
+        return path
+
+    def resolve_output_path(self, output_path):
+        """ output_path 一律需要 --output-root，且只能寫入其中 """
+        if not self.output_root: raise ConversionRequestError(403, "output_path requires the service to be started with --output-root")
+        return self.confine(self.output_root, output_path, 'output_path')
+
+    def convert(self, texts, direction, enable_custom=True):
+        try: return self.service.convert(texts, direction, enable_custom)
+        except ValueError as e: raise ConversionRequestError(400, str(e))
+
+    def plan_filenames(self, names, direction, detect_language=False):
+        try: return self.service.plan_filenames(names, direction, detect_language)
+        except ValueError as e: raise ConversionRequestError(400, str(e))
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 讓同一連線可持續使用 (keep-alive)，管線化的請求會依序從連線緩衝區讀出處理
+    protocol_version = "HTTP/1.1"
+    server_version = "ChineseConverterService/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose: super().log_message(format, *args)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection: self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def body_error(self, status, message):
+        """ 請求本文有問題時回應後關閉連線：未讀取的本文若留在串流中，會被當成下一個管線化請求解析 """
+        self.close_connection = True; return ConversionRequestError(status, message)
+
+    def read_json_body(self):
+        try: length = int(self.headers.get("Content-Length", 0))
+        except ValueError: raise self.body_error(400, "Invalid Content-Length")
+        # 負數會讓 rfile.read 一直讀到連線結束
+        if length < 0: raise self.body_error(400, "Invalid Content-Length")
+        if length > MAX_REQUEST_BODY: raise self.body_error(413, "Request body too large")
+        raw = self.rfile.read(length) if length else b""
+        if len(raw) < length: raise self.body_error(400, "Incomplete request body")
+        try: payload = json.loads(raw.decode('utf-8')) if raw else {}
+        except (UnicodeDecodeError, json.JSONDecodeError) as e: raise self.body_error(400, f"Invalid JSON body: {e}")
+        if not isinstance(payload, dict): raise self.body_error(400, "JSON body must be an object")
+        return payload
+
+    def check_host(self):
+        if not self.server.is_allowed_host(self.headers.get("Host")): raise self.body_error(403, "Host not allowed")
+
+    def do_GET(self):
+        try: self.check_host()
+        except ConversionRequestError as e: self.send_json(e.status, {"error": str(e)}); return
+        if self.path == "/health":
+            registry = self.server.service.registry
+            self.send_json(200, {"status": "ok", "pool_size": registry.max_instances, "instances": {config: size for config, (size, _) in registry.memory_report().items()},
+                                 "directions": list(available_converter_configs()),
+                                 "custom_conversions": len(self.server.service.custom_conversions)})
+        else: self.send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self):
+        routes = {"/convert/text": self.handle_text, "/convert/batch": self.handle_batch,
+                  "/convert/file": self.handle_file, "/convert/filenames": self.handle_filenames}
+        try:
+            self.check_host()
+            # 只接受 JSON：瀏覽器不經預檢 (CORS preflight) 就能跨站送出 text/plain 等「簡單請求」
+            if self.headers.get_content_type() != JSON_CONTENT_TYPE: raise self.body_error(415, f"Content-Type must be {JSON_CONTENT_TYPE}")
+            payload = self.read_json_body()
+            if not (handler := routes.get(self.path)): raise ConversionRequestError(404, f"Unknown endpoint: {self.path}")
+            self.send_json(200, handler(payload))
+        except ConversionRequestError as e: self.send_json(e.status, {"error": str(e)})
+        except Exception as e: self.send_json(500, {"error": f"Conversion error: {e}"})
+
+    def handle_text(self, payload):
+        text = payload.get("text")
+        if not isinstance(text, str): raise ConversionRequestError(400, "'text' must be a string")
+        return {"text": self.server.convert([text], payload.get("direction", "s2t"), payload.get("custom", True))[0]}
+
+    def handle_batch(self, payload):
+        texts = payload.get("texts")
+        if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts): raise ConversionRequestError(400, "'texts' must be a list of strings")
+        return {"texts": self.server.convert(texts, payload.get("direction", "s2t"), payload.get("custom", True))}
+
+    def handle_file(self, payload):
+        path = payload.get("path")
+        if not isinstance(path, str): raise ConversionRequestError(400, "'path' must be a string")
+        if not os.path.isfile(path := self.server.resolve_input_path(path)): raise ConversionRequestError(400, f"File not found: {path}")
+        content, encoding = read_txt_file_with_encoding_detection(path, bool(payload.get("encoding")), payload.get("encoding"))
+        if content is None: raise ConversionRequestError(422, encoding)
+        converted = self.server.convert([content], payload.get("direction", "s2t"), payload.get("custom", True))[0]
+        if output_path := payload.get("output_path"):
+            if not isinstance(output_path, str): raise ConversionRequestError(400, "'output_path' must be a string")
+            output_path = self.server.resolve_output_path(output_path)
+            # 'x'：已存在的檔案一律不覆寫
+            try:
+                with open(output_path, 'x', encoding='utf-8') as f: f.write(converted)
+            except FileExistsError: raise ConversionRequestError(409, f"Output file already exists: {output_path}")
+            return {"encoding": encoding, "output_path": output_path}
+        return {"encoding": encoding, "text": converted}
+
+    def handle_filenames(self, payload):
+        names = payload.get("names")
+        if not isinstance(names, list) or not all(isinstance(n, str) for n in names): raise ConversionRequestError(400, "'names' must be a list of strings")
+        plans = self.server.plan_filenames(names, payload.get("direction", "s2t"), payload.get("detect_language", False))
+        return {"results": [{"status": status, "name": new_name} for status, new_name in plans]}
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, pool_size=DEFAULT_POOL_SIZE, custom_conversions=None, verbose=False, output_root=None, input_root=None, allowed_hosts=()):
+    server = ConversionServer((host, port), pool_size, custom_conversions, verbose, output_root, input_root, allowed_hosts)
+    print(f"Conversion service listening on http://{server.server_address[0]}:{server.server_address[1]}")
+    try: server.serve_forever()
+    except KeyboardInterrupt: pass
+    finally: server.server_close()
@@ -0,0 +1,561 @@
+#
+# 檔案名稱: converter_core.py
+#
+# 不依賴 tkinter 的轉換核心，供圖形介面、本機轉換服務等共用
+import io
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import chardet
+from opencc import OpenCC
+
+from script_scanner import KANA_JAPANESE_RATIO, HAN_RE, scan_text, convert_han_spans, name_classifier
+from stage_stats import stage_stats
+from glossary_store import load_glossary
+from structured_text import structured_format, iter_structured_blocks, block_text, block_source
+from task_scheduler import scheduler
+from compressed_io import (COMPRESSION_SUFFIXES, detect_compression, is_text_input, split_compressed_name, open_decompressed, open_decompressed_text,
+                           resolve_output_compression, open_text_output)
+
+# 嘗試引入 langdetect，如果失敗則停用語言偵測
+try:
+    from langdetect import detect, DetectorFactory
+    from langdetect.lang_detect_exception import LangDetectException
+    DetectorFactory.seed = 0 # 確保每次檢測結果一致
+    LANGDETECT_AVAILABLE = True
+except ImportError:
+    LANGDETECT_AVAILABLE = False
+
+# --- 常數定義 ---
+INITIAL_READ_SIZE_FOR_CHARSET = 1024 * 100
+FALLBACK_ENCODINGS = ['utf-8', 'utf-8-sig', 'gbk', 'gb18030', 'big5', 'cp936']
+DEFAULT_CONVERTER_CONFIGS = ('s2t', 't2s')
+# 可用的 OpenCC 設定；實際能否載入視安裝的 OpenCC 套件而定
+CONVERTER_CONFIGS = ('s2t', 't2s', 's2tw', 'tw2s', 's2twp', 'tw2sp', 's2hk', 'hk2s', 't2tw', 'tw2t', 't2hk', 'hk2t', 't2jp', 'jp2t')
+# 自訂詞彙表以「簡體 -> 繁體」保存，依繁簡方向決定取代方式；繁體地區用字與日文字形的轉換不套用
+GLOSSARY_DIRECTIONS = {'s2t': 's2t', 's2tw': 's2t', 's2twp': 's2t', 's2hk': 's2t', 't2s': 't2s', 'tw2s': 't2s', 'tw2sp': 't2s', 'hk2s': 't2s'}
+STREAM_CHUNK_CHARS = 1024 * 256
+STREAM_FILE_THRESHOLD = 1024 * 1024 * 64 # 預估解壓後超過此大小的檔案分段讀寫，不整份載入記憶體
+COMPRESSED_SIZE_FACTOR = 10 # 壓縮檔無法得知解壓後大小，以此倍數估計
+CONVERT_MANY_CACHE_SIZE = 100000
+SEGMENT_CACHE_SIZE = 200000
+MAX_CONVERTER_INSTANCES = 4 # 每個設定最多同時存在的轉換器數量
+CONVERT_MANY_SEPARATOR = '\n' # OpenCC 的詞組不會跨越換行，可安全地作為批次分隔符號
+
+
+def contains_chinese(text):
+    return bool(re.search(r'[\u4e00-\u9fff]', text))
+
+@stage_stats.timed('language_check')
+def is_convertible_chinese(text, scan=None):
+    if not text or not LANGDETECT_AVAILABLE: return True
+    # 沒有漢字或假名比例高時結果已確定，不必再執行 langdetect
+    scan = scan or scan_text(text)
+    if not scan.han_count or scan.kana_count >= (scan.han_count + scan.kana_count) * KANA_JAPANESE_RATIO: return False
+    try:
+        with stage_stats.timer('langdetect'): language = detect(text)
+        if language == 'ja': return False
+    except LangDetectException: pass
+    return contains_chinese(text)
+
+# --- 自訂詞彙 ---
+def read_custom_conversions_file(path):
+    """ 基底檔加上尚未合併的變更記錄 """
+    return load_glossary(path)
+
+def compile_glossary(custom_conversions_dict, conversion_type, cc_s2t, cc_t2s, cc_convert=None):
+    """ 預先算出 (搜尋字串, 取代字串) 清單，避免每次轉換都重新轉換詞彙鍵值；搜尋字串以實際使用的轉換器產生 """
+    glossary, direction = [], GLOSSARY_DIRECTIONS.get(conversion_type)
+    for simp_key, trad_val in custom_conversions_dict.items():
+        if direction == 's2t': glossary.append(((cc_convert or cc_s2t).convert(simp_key), trad_val))
+        elif direction == 't2s': glossary.append(((cc_convert or cc_t2s).convert(trad_val), simp_key))
+    return glossary
+
+def apply_glossary(text, glossary):
+    for search, replacement in glossary: text = text.replace(search, replacement)
+    return text
+
+def convert_text(text, cc_instance, conversion_type, custom_conversions_dict, enable_custom_conversion, cc_s2t, cc_t2s, glossary=None, scan=None):
+    if not cc_instance: return text
+    try:
+        with stage_stats.timer('opencc'): converted_text = convert_han_spans(text, cc_instance, scan)
+        if enable_custom_conversion and custom_conversions_dict:
+            with stage_stats.timer('glossary'):
+                if glossary is None: glossary = compile_glossary(custom_conversions_dict, conversion_type, cc_s2t, cc_t2s, cc_instance)
+                converted_text = apply_glossary(converted_text, glossary)
+        return converted_text
+    except Exception as e: return f"Conversion error: {e}"
+
+# --- 逐行快取 ---
+class SegmentCache:
+    """ 以行為單位記住轉換結果的 LRU，供同一批次的所有檔案共用；hits / misses 以行數計算 """
+    def __init__(self, max_entries=SEGMENT_CACHE_SIZE):
+        self.max_entries = max_entries; self.entries = OrderedDict(); self.hits = self.misses = 0; self._lock = threading.Lock()
+
+    def lookup(self, lines):
+        """ 回傳 ({行: 結果} 已快取的部分, [尚未快取且不重複的行]) """
+        found, missing = {}, {}
+        with self._lock:
+            for line in lines:
+                if line in found or line in missing: self.hits += 1
+                elif line in self.entries: found[line] = self.entries[line]; self.entries.move_to_end(line); self.hits += 1
+                else: missing[line] = None; self.misses += 1
+        return found, list(missing)
+
+    def store(self, converted):
+        with self._lock:
+            self.entries.update(converted)
+            while len(self.entries) > self.max_entries: self.entries.popitem(last=False)
+
+    def hit_rate(self):
+        return self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0
+
+def convert_text_by_lines(text, segment_cache, convert_func):
+    """ 只轉換快取中沒有的行 (合併為一次呼叫)，再依原順序組回；OpenCC 詞組不跨行，所以結果與整份轉換相同 """
+    lines = text.split('\n')
+    found, missing = segment_cache.lookup(lines)
+    if missing:
+        converted = convert_func('\n'.join(missing)).split('\n')
+        if len(converted) != len(missing): converted = [convert_func(line) for line in missing]
+        fresh = dict(zip(missing, converted)); segment_cache.store(fresh); found.update(fresh)
+    return '\n'.join(found[line] for line in lines)
+
+def glossary_crosses_lines(glossary):
+    return any('\n' in search or '\n' in replacement for search, replacement in glossary)
+
+# --- 轉換器登錄 ---
+# OpenCC 沒有保證同一個物件可被多個執行緒同時呼叫，以下兩種包裝都提供與 OpenCC 相同的 convert 介面，
+# 但保證同一時間每個底層轉換器只在一個執行緒中使用
+class PooledConverter:
+    """ 每次轉換借用一個閒置的轉換器，全部忙碌時才再建立，最多 max_size 個，之後改為等待 """
+    def __init__(self, config, registry, max_size=MAX_CONVERTER_INSTANCES):
+        self.config, self.registry, self.max_size = config, registry, max_size
+        self._idle = queue.LifoQueue(); self._lock = threading.Lock(); self.size = 0; self.memory = 0
+
+    def _grow(self):
+        with self._lock:
+            if self.size >= self.max_size: return None
+            self.size += 1
+        try: cc, allocated = self.registry.create(self.config)
+        except Exception:
+            with self._lock: self.size -= 1
+            raise
+        with self._lock: self.memory += allocated
+        return cc
+
+    @contextmanager
+    def checkout(self):
+        try: cc = self._idle.get_nowait()
+        except queue.Empty:
+            if (cc := self._grow()) is None: cc = self._idle.get()
+        try: yield cc
+        finally: self._idle.put(cc)
+
+    def warm(self):
+        with self.checkout(): pass
+
+    def convert(self, text):
+        with self.checkout() as cc: return cc.convert(text)
+
+
+class ThreadLocalConverter:
+    """ 每個執行緒第一次使用時各自建立轉換器，適合長期存在的工作執行緒 """
+    def __init__(self, config, registry):
+        self.config, self.registry = config, registry; self._local = threading.local()
+
+    def convert(self, text):
+        if (cc := getattr(self._local, 'cc', None)) is None: cc = self._local.cc = self.registry.create(self.config)[0]
+        return cc.convert(text)
+
+
+def process_rss():
+    """ 目前程序的常駐記憶體 (RSS，位元組)，包含 OpenCC 原生程式庫配置的記憶體；無法取得時 (非 Linux) 回傳 None """
+    try:
+        with open('/proc/self/statm') as f: return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError): return None
+
+class ConverterRegistry:
+    """ 依設定名稱延遲建立 OpenCC 轉換器並在整個程序中共用，同時記錄每個設定載入時配置的記憶體。
+        memory_source 為 'rss' 時記憶體以載入前後的 RSS 差值計算 (含原生記憶體)；為 'python-heap' 時只能以 tracemalloc 計算 Python 配置的部分 """
+    def __init__(self, max_instances=MAX_CONVERTER_INSTANCES):
+        self.max_instances = max_instances; self.memory_source = 'rss' if process_rss() is not None else 'python-heap'
+        self._converters = {}; self._lock = threading.Lock(); self._create_lock = threading.Lock()
+
+    def check_config(self, config):
+        if config not in CONVERTER_CONFIGS: raise ValueError(f"Unsupported direction: {config}")
+
+    def create(self, config):
+        """ 建立一個不共用的新轉換器，回傳 (轉換器, 配置的位元組數) """
+        self.check_config(config)
+        with self._create_lock:
+            if (before := process_rss()) is not None:
+                cc = self._load(config); return cc, max(0, process_rss() - before)
+            tracing = tracemalloc.is_tracing()
+            if not tracing: tracemalloc.start()
+            try:
+                before = tracemalloc.get_traced_memory()[0]; cc = self._load(config)
+                return cc, max(0, tracemalloc.get_traced_memory()[0] - before)
+            finally:
+                if not tracing: tracemalloc.stop()
+
+    def _load(self, config):
+        try: cc = OpenCC(config); cc.convert("") # 先轉換一次，讓詞典在此時完整載入
+        except Exception as e: raise ValueError(f"OpenCC config '{config}' is not available: {e}")
+        return cc
+
+    def get(self, config):
+        """ 回傳可在多執行緒間共用的 PooledConverter；第一次取得時即載入一個轉換器 """
+        with self._lock:
+            if (cc := self._converters.get(config)) is None:
+                self.check_config(config); cc = PooledConverter(config, self, self.max_instances); cc.warm(); self._converters[config] = cc
+            return cc
+
+    def thread_local(self, config):
+        self.check_config(config); return ThreadLocalConverter(config, self)
+
+    def preload(self, configs=DEFAULT_CONVERTER_CONFIGS):
+        """ 在建立子程序前先載入，fork 出的工作程序可直接共用已載入的詞典 """
+        for config in configs: self.get(config)
+
+    def is_loaded(self, config): return config in self._converters
+
+    def set_max_instances(self, max_instances):
+        """ 調整每個設定的轉換器數量上限，已載入的設定也一併套用 (已建立的轉換器不會減少) """
+        with self._lock:
+            self.max_instances = max_instances
+            for cc in self._converters.values(): cc.max_size = max_instances
+
+    def memory_report(self):
+        """ 回傳 {設定: (轉換器數量, 載入時配置的位元組數)}，只包含已載入的設定 (數值為近似值，計算方式見 memory_source) """
+        with self._lock: return {config: (cc.size, cc.memory) for config, cc in self._converters.items()}
+
+converter_registry = ConverterRegistry()
+
+def get_converter(config):
+    return converter_registry.get(config)
+
+def available_converter_configs():
+    """ 列出目前安裝的 OpenCC 套件提供的設定；無法判斷時回傳全部 """
+    config_dir = os.path.join(os.path.dirname(getattr(sys.modules.get(OpenCC.__module__), '__file__', None) or ''), 'config')
+    if not os.path.isdir(config_dir): return CONVERTER_CONFIGS
+    return tuple(config for config in CONVERTER_CONFIGS if os.path.exists(os.path.join(config_dir, config + '.json')))
+
+def stress_test_converters(configs=DEFAULT_CONVERTER_CONFIGS, threads=16, iterations=200, mode='pool', max_instances=MAX_CONVERTER_INSTANCES, seed=0):
+    """ 多執行緒同時轉換，逐筆與單執行緒的結果比對；mode 為 pool、thread 或 shared (直接共用單一 OpenCC 物件，作為對照) """
+    registry, rng = ConverterRegistry(max_instances), random.Random(seed)
+    samples = ["头发和发展都很重要，我们一起去吃面。", "這個軟體的滑鼠與印表機設定", "后来他在乾隆年间写了一本书", "鼠标、软件、打印机、信息",
+               "臺灣的計程車和香港的的士", "Mixed 中文 text with 123 numbers", "云里雾里，干净的乾坤", "里面的钟表走得很准"]
+    texts = ["".join(rng.choice(samples) for _ in range(rng.randint(1, 20))) for _ in range(64)]
+    expected = {config: [cc.convert(text) for text in texts] for config in configs for cc in [registry.create(config)[0]]}
+    if mode == 'pool': converters = {config: registry.get(config) for config in configs}
+    elif mode == 'thread': converters = {config: registry.thread_local(config) for config in configs}
+    elif mode == 'shared': converters = {config: registry.create(config)[0] for config in configs}
+    else: raise ValueError(f"Unknown mode: {mode}")
+    mismatches, errors, start_event = [], [], threading.Event()
+    def worker(worker_id):
+        local_rng = random.Random(seed + worker_id); start_event.wait()
+        for _ in range(iterations):
+            config, index = local_rng.choice(configs), local_rng.randrange(len(texts))
+            try: result = converters[config].convert(texts[index])
+            except Exception as e: errors.append(f"{config}: {e}"); continue
+            if result != expected[config][index]: mismatches.append((config, index))
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in workers: t.start()
+    started = time.perf_counter(); start_event.set()
+    for t in workers: t.join()
+    elapsed = time.perf_counter() - started
+    return {'mode': mode, 'threads': threads, 'conversions': threads * iterations, 'seconds': elapsed, 'mismatches': len(mismatches),
+            'errors': errors, 'instances': {config: cc.size for config, cc in converters.items() if isinstance(cc, PooledConverter)}}
+
+# --- 批次字串轉換 ---
+class BatchConverter:
+    """ 去除重複後把所有字串合併成一次 OpenCC 呼叫，並以 LRU 快取跨呼叫記住結果 """
+    def __init__(self, cc_instance, cache_size=CONVERT_MANY_CACHE_SIZE):
+        self.cc_instance, self.cache_size = cc_instance, cache_size
+        self.cache = OrderedDict(); self._lock = threading.Lock()
+
+    def convert_many(self, strings):
+        strings = list(strings); results, missing = {}, []
+        with self._lock:
+            for text in dict.fromkeys(strings):
+                if text in self.cache: results[text] = self.cache[text]; self.cache.move_to_end(text)
+                else: missing.append(text)
+        if missing:
+            # 不含漢字的字串不會改變，不必送進 OpenCC
+            fresh = {text: text for text in missing if not scan_text(text).spans}
+            missing = [text for text in missing if text not in fresh]
+            joinable = [text for text in missing if CONVERT_MANY_SEPARATOR not in text]
+            converted = self.cc_instance.convert(CONVERT_MANY_SEPARATOR.join(joinable)).split(CONVERT_MANY_SEPARATOR) if joinable else []
+            if len(converted) != len(joinable): converted = [self.cc_instance.convert(text) for text in joinable]
+            fresh.update(zip(joinable, converted))
+            fresh.update((text, self.cc_instance.convert(text)) for text in missing if CONVERT_MANY_SEPARATOR in text)
+            with self._lock:
+                self.cache.update(fresh)
+                while len(self.cache) > self.cache_size: self.cache.popitem(last=False)
+            results.update(fresh)
+        return [results[text] for text in strings]
+
+    def convert(self, text): return self.convert_many([text])[0]
+
+_batch_converters = {}
+_batch_converters_lock = threading.Lock()
+
+def get_batch_converter(cc_instance):
+    # 以 id 為鍵並同時保存轉換器本身，確保 id 不會被回收重用
+    with _batch_converters_lock:
+        if (entry := _batch_converters.get(id(cc_instance))) is None: entry = _batch_converters[id(cc_instance)] = (cc_instance, BatchConverter(cc_instance))
+        return entry[1]
+
+def convert_many(strings, cc_instance):
+    return get_batch_converter(cc_instance).convert_many(strings)
+
+# --- 檔名轉換 ---
+def plan_filename_conversion(filename, cc_instance, detect_language=False, is_dir=False):
+    """ 回傳 (狀態, 新檔名)；狀態沿用批次結果的代碼。檔名太短，langdetect 不可靠，語言判斷改看字元組成 (結果有快取) """
+    base_name, ext = (filename, "") if is_dir else os.path.splitext(filename)
+    if detect_language and not name_classifier.is_chinese(base_name): return 'skipped_non_chinese', filename
+    scan = scan_text(base_name)
+    new_filename = convert_han_spans(base_name, cc_instance, scan) + ext
+    if new_filename == filename: return 'skipped_unchanged', filename
+    return 'converted', new_filename
+
+# --- 檔案讀取 ---
+@stage_stats.timed('detect_encoding')
+def detect_bytes_encoding(initial_bytes, use_manual_encoding=False, manual_encoding=None):
+    if use_manual_encoding and manual_encoding: return manual_encoding
+    result = chardet.detect(initial_bytes)
+    if result['encoding'] and result.get('confidence', 0) > 0.8: return result['encoding']
+    for enc in FALLBACK_ENCODINGS:
+        try: initial_bytes.decode(enc, errors='strict'); return enc
+        except: continue
+    return None
+
+def open_txt_file_with_encoding_detection(filepath, use_manual_encoding=False, manual_encoding=None):
+    """ 偵測編碼後以文字模式開啟，回傳 (檔案物件, 編碼)；失敗時回傳 (None, 錯誤訊息)
+        壓縮檔 (gzip / bz2 / xz / zstd) 依檔頭判斷，編碼偵測使用解壓後的開頭 """
+    try:
+        compression = detect_compression(filepath)
+        with open_decompressed(filepath, compression) as f: initial_bytes = f.read(INITIAL_READ_SIZE_FOR_CHARSET)
+        if not (final_encoding := detect_bytes_encoding(initial_bytes, use_manual_encoding, manual_encoding)): return None, "Cannot identify file encoding"
+        return open_decompressed_text(filepath, compression, final_encoding), final_encoding
+    except Exception as e: return None, f"Error reading file: {e}"
+
+@stage_stats.timed('read')
+def read_txt_file_with_encoding_detection(filepath, use_manual_encoding=False, manual_encoding=None):
+    f, encoding = open_txt_file_with_encoding_detection(filepath, use_manual_encoding, manual_encoding)
+    if f is None: return None, encoding
+    try:
+        with f: return f.read(), encoding
+    except Exception as e: return None, f"Error reading file: {e}"
+
+def read_text_chunk(text_file, chunk_chars=STREAM_CHUNK_CHARS):
+    """ 讀取約 chunk_chars 個字元並延伸到行尾，確保詞彙不會被切斷；檔案結束時回傳空字串 """
+    chunk = text_file.read(chunk_chars)
+    if chunk and not chunk.endswith('\n'): chunk += text_file.readline()
+    return chunk
+
+def iter_text_chunks(text_file, chunk_chars=STREAM_CHUNK_CHARS):
+    while chunk := read_text_chunk(text_file, chunk_chars): yield chunk
+
+# --- 檔案內容轉換流程 ---
+@stage_stats.timed('path_probe')
+def find_available_path(folder, base_name, ext):
+    new_path = os.path.join(folder, base_name + ext); counter = 1
+    while os.path.exists(new_path): new_path = os.path.join(folder, f"{base_name}({counter}){ext}"); counter += 1
+    return new_path
+
+def build_content_conversion_params(conversion_type, output_folder, cc_s2t, cc_t2s, custom_conversions=None, enable_custom=True,
+                                    use_manual_encoding=False, manual_encoding=None, filename_pattern="", use_line_cache=False, output_compression='none',
+                                    deduplicate=False, dedup_link='auto', convert_archive_names=False):
+    """ 不經由圖形介面時建立與 get_content_conversion_params 相同格式的設定 """
+    return {'conversion_type': conversion_type, 'cc_convert': {'s2t': cc_s2t, 't2s': cc_t2s}.get(conversion_type) or get_converter(conversion_type),
+            'custom_conversions': custom_conversions or {}, 'enable_custom': enable_custom, 'output_folder': output_folder,
+            'use_manual_encoding': use_manual_encoding, 'manual_encoding': manual_encoding, 'filename_pattern': filename_pattern,
+            'use_line_cache': use_line_cache, 'segment_cache': SegmentCache() if use_line_cache else None, 'output_compression': output_compression,
+            'deduplicate': deduplicate, 'dedup_link': dedup_link, 'convert_archive_names': convert_archive_names}
+
+def convert_content_text(text, params, cc_s2t, cc_t2s, scan=None):
+    """ 依設定轉換整份內容；啟用逐行快取時只轉換批次中第一次出現的行 """
+    glossary = None
+    if params['enable_custom'] and params['custom_conversions']:
+        glossary = compile_glossary(params['custom_conversions'], params['conversion_type'], cc_s2t, cc_t2s, params['cc_convert'])
+    def convert_func(segment, scan=None): return convert_text(segment, params['cc_convert'], params['conversion_type'], params['custom_conversions'], params['enable_custom'], cc_s2t, cc_t2s, glossary, scan)
+    # 詞彙含換行時取代可能跨行，此時改回整份轉換以確保結果一致
+    crosses_lines = bool(glossary and glossary_crosses_lines(glossary))
+    def convert_segment(segment, scan=None):
+        if params.get('segment_cache') is None or crosses_lines: return convert_func(segment, scan)
+        return convert_text_by_lines(segment, params['segment_cache'], convert_func)
+    if crosses_lines or not scheduler.preemptible or len(text) <= scheduler.piece_chars(): return convert_segment(text, scan)
+    # 有互動工作時以行為界分段轉換，每段之間讓出；詞組不跨行，結果與整份轉換相同
+    pieces = []
+    for piece in split_line_pieces(text, scheduler.piece_chars()):
+        scheduler.checkpoint(); start = time.perf_counter()
+        pieces.append(convert_segment(piece)); scheduler.record_batch_throughput(len(piece), time.perf_counter() - start)
+    return ''.join(pieces)
+
+def split_line_pieces(text, piece_chars):
+    start = 0
+    while start < len(text):
+        end = text.find('\n', start + piece_chars); end = len(text) if end == -1 else end + 1
+        yield text[start:end]; start = end
+
+def content_output_base_name(base_name, params, index):
+    """ 套用命名規則並轉換輸出檔名 (不含副檔名) """
+    new_base_name = base_name
+    if params['filename_pattern']:
+        try: new_base_name = params['filename_pattern'].format(original_name=base_name, index=index)
+        except Exception as e: new_base_name = f"{base_name}_naming_error"; print(f"Filename format error: {e}")
+    return convert_han_spans(new_base_name, params['cc_convert'])
+
+def estimated_text_bytes(filepath, size): return size * (COMPRESSED_SIZE_FACTOR if split_compressed_name(filepath)[1] else 1)
+
+def content_loaded_bytes(filepath, size):
+    """ 轉換時預計同時載入記憶體的原始資料量；分段處理的檔案以門檻值計 """
+    return min(estimated_text_bytes(filepath, size), STREAM_FILE_THRESHOLD)
+
+def glossary_has_newlines(params): return params['enable_custom'] and any('\n' in key or '\n' in value for key, value in params['custom_conversions'].items())
+
+def content_is_streamed(filepath, params):
+    # 詞彙含換行時取代可能跨越分段，此時仍整份轉換
+    if glossary_has_newlines(params): return False
+    return estimated_text_bytes(filepath, os.path.getsize(filepath)) > STREAM_FILE_THRESHOLD
+
+_output_path_lock = threading.Lock()
+_reservation_hooks = threading.local()
+
+@contextmanager
+def recording_reservations(callback):
+    """ 在此區塊內 (同一執行緒) 預留的輸出路徑都會傳給 callback，工作日誌藉此記下可能只寫了一半的輸出檔 """
+    previous = getattr(_reservation_hooks, 'callback', None); _reservation_hooks.callback = callback
+    try: yield
+    finally: _reservation_hooks.callback = previous
+
+def reserve_output_path(folder, base_name, ext):
+    """ 找出可用路徑並立即建立空檔佔位，多個執行緒同時輸出同名檔案時不會互相覆蓋 """
+    with _output_path_lock:
+        path = find_available_path(folder, base_name, ext)
+        open(path, 'x').close()
+    if callback := getattr(_reservation_hooks, 'callback', None): callback(path)
+    return path
+
+def content_output_name(filepath, params, index):
+    """ 回傳 (輸出檔名 (不含副檔名), 副檔名, 輸出壓縮格式)；輸出資料夾已有同名檔案時實際路徑會另加編號 """
+    base_name, ext = os.path.splitext(split_compressed_name(os.path.basename(filepath))[0])
+    output_compression = resolve_output_compression(params.get('output_compression'), detect_compression(filepath))
+    return content_output_base_name(base_name, params, index), ext + COMPRESSION_SUFFIXES.get(output_compression, ""), output_compression
+
+def content_output_path(filepath, params, index):
+    """ 回傳 (輸出路徑, 輸出壓縮格式) """
+    base_name, ext, output_compression = content_output_name(filepath, params, index)
+    return reserve_output_path(params['output_folder'], base_name, ext), output_compression
+
+def convert_content_file(filepath, params, index, cc_s2t, cc_t2s):
+    """ 轉換單一 txt 檔並寫入輸出資料夾，回傳 (狀態, 細節)；狀態沿用批次結果的代碼，非預期錯誤直接拋出 """
+    if not is_text_input(filepath): return 'skipped_ext', None
+    if fmt := structured_format(filepath): return convert_structured_file(filepath, fmt, params, index, cc_s2t, cc_t2s)
+    if content_is_streamed(filepath, params): return convert_content_file_streamed(filepath, params, index, cc_s2t, cc_t2s)
+    original_content, encoding = read_txt_file_with_encoding_detection(filepath, params['use_manual_encoding'], params['manual_encoding'])
+    if original_content is None: return 'failed_read', encoding
+    scan = scan_text(original_content)
+    if not is_convertible_chinese(original_content, scan): return 'skipped_non_chinese', None
+    converted_content = convert_content_text(original_content, params, cc_s2t, cc_t2s, scan)
+    new_filepath, output_compression = content_output_path(filepath, params, index)
+    with stage_stats.timer('write'), open_text_output(new_filepath, output_compression) as f: f.write(converted_content)
+    return 'converted', {'output_path': new_filepath, 'encoding': encoding, 'original': original_content, 'converted': converted_content}
+
+def convert_content_file_streamed(filepath, params, index, cc_s2t, cc_t2s):
+    """ 大檔案逐段讀取、轉換並寫出，記憶體用量與檔案大小無關；語言判斷只看第一段，預覽也只保留第一段 """
+    text_file, encoding = open_txt_file_with_encoding_detection(filepath, params['use_manual_encoding'], params['manual_encoding'])
+    if text_file is None: return 'failed_read', encoding
+    with text_file:
+        first_chunk = read_text_chunk(text_file); scan = scan_text(first_chunk)
+        if not is_convertible_chinese(first_chunk, scan): return 'skipped_non_chinese', None
+        first_converted = convert_content_text(first_chunk, params, cc_s2t, cc_t2s, scan)
+        new_filepath, output_compression = content_output_path(filepath, params, index)
+        with open_text_output(new_filepath, output_compression) as f:
+            f.write(first_converted)
+            while chunk := read_text_chunk(text_file):
+                converted_chunk = convert_content_text(chunk, params, cc_s2t, cc_t2s)
+                with stage_stats.timer('write'): f.write(converted_chunk)
+    return 'converted', {'output_path': new_filepath, 'encoding': encoding, 'original': first_chunk, 'converted': first_converted}
+
+def convert_structured_block(pieces, params, cc_s2t, cc_t2s):
+    """ 含漢字的文字節點以換行接成一份轉換，結構片段原樣寫回；詞彙含換行時逐一轉換，避免取代跨越不同節點 """
+    targets = [i for i, piece in enumerate(pieces) if not isinstance(piece, str) and HAN_RE.search(piece.text)]
+    texts = [pieces[i].text for i in targets]; counts = [text.count('\n') + 1 for text in texts]; converted = []
+    if texts and not glossary_has_newlines(params) and len(lines := convert_content_text('\n'.join(texts), params, cc_s2t, cc_t2s).split('\n')) == sum(counts):
+        position = 0
+        for count in counts: converted.append('\n'.join(lines[position:position + count])); position += count
+    elif texts: converted = [convert_content_text(text, params, cc_s2t, cc_t2s) for text in texts]
+    output = [piece if isinstance(piece, str) else piece.raw for piece in pieces]
+    for i, text in zip(targets, converted):
+        if text != pieces[i].text: output[i] = pieces[i].encode(text) if pieces[i].encode else text
+    return "".join(output)
+
+def convert_structured_text(text, fmt, params, cc_s2t, cc_t2s):
+    """ 已在記憶體中的內容 (例如預覽) 以相同方式轉換 """
+    return "".join(convert_structured_block(block, params, cc_s2t, cc_t2s) for block in iter_structured_blocks(io.StringIO(text), fmt))
+
+def convert_structured_file(filepath, fmt, params, index, cc_s2t, cc_t2s):
+    """ 字幕、CSV、JSON、HTML 逐段讀取，只轉換文字節點；語言判斷只看第一段的文字節點，預覽保留第一段 """
+    text_file, encoding = open_txt_file_with_encoding_detection(filepath, params['use_manual_encoding'], params['manual_encoding'])
+    if text_file is None: return 'failed_read', encoding
+    with text_file:
+        blocks = iter_structured_blocks(text_file, fmt); first = next(blocks, [])
+        if not is_convertible_chinese(block_text(first)): return 'skipped_non_chinese', None
+        first_converted = convert_structured_block(first, params, cc_s2t, cc_t2s)
+        new_filepath, output_compression = content_output_path(filepath, params, index)
+        with open_text_output(new_filepath, output_compression) as f:
+            f.write(first_converted)
+            for block in blocks:
+                converted_block = convert_structured_block(block, params, cc_s2t, cc_t2s)
+                with stage_stats.timer('write'): f.write(converted_block)
+    return 'converted', {'output_path': new_filepath, 'encoding': encoding, 'original': block_source(first), 'converted': first_converted}
+
+def describe_line_cache(params):
+    if (cache := params.get('segment_cache')) is None or not cache.hits + cache.misses: return None
+    return f"Line cache: {cache.hits}/{cache.hits + cache.misses} lines reused ({cache.hit_rate():.1%})"
+
+def describe_content_result(filepath, status, detail):
+    """ 批次流程在主控台輸出的訊息，沒有需要說明的狀態回傳 None """
+    if status == 'failed_read': return f"Read fail '{os.path.basename(filepath)}': {detail}"
+    if status == 'skipped_non_chinese': return f"Skip non-Chinese: {os.path.basename(filepath)}"
+    return None
+
+# --- 常駐服務 ---
+class ConversionService:
+    """ 依方向預先編譯的詞彙表，轉換器由 ConverterRegistry 的轉換器池借用 (記憶體統計與數量上限與其他轉換共用)，供常駐服務與非同步介面使用 """
+    def __init__(self, custom_conversions=None, registry=None):
+        self.registry = registry or converter_registry
+        self.custom_conversions = custom_conversions or {}
+        self.glossaries = {}; self._glossary_lock = threading.Lock()
+        for direction in DEFAULT_CONVERTER_CONFIGS: self.glossary(direction)
+
+    def check_direction(self, direction): self.registry.check_config(direction)
+
+    def glossary(self, direction):
+        with self._glossary_lock:
+            if direction not in self.glossaries:
+                get = self.registry.get
+                self.glossaries[direction] = compile_glossary(self.custom_conversions, direction, get('s2t'), get('t2s'), get(direction))
+            return self.glossaries[direction]
+
+    def convert(self, texts, direction, enable_custom=True):
+        self.check_direction(direction)
+        glossary = self.glossary(direction) if enable_custom else []
+        # 整批只借用一次，不必每個漢字區段各自借還
+        with self.registry.get(direction).checkout() as cc:
+            return [apply_glossary(convert_han_spans(text, cc), glossary) for text in texts]
+
+    def plan_filenames(self, names, direction, detect_language=False):
+        self.check_direction(direction)
+        batch = get_batch_converter(self.registry.get(direction)); batch.convert_many(os.path.splitext(name)[0] for name in names)
+        return [plan_filename_conversion(name, batch, detect_language) for name in names]
@@ -0,0 +1,263 @@
+#
+# 檔案名稱: file_list_store.py
+#
+# 檔案列表的資料模型：預設放在記憶體；大量檔案時可改用 SQLite，並在下次啟動時直接還原
+import copy
+import os
+import sqlite3
+import threading
+from collections import deque
+
+FILE_LIST_DB_FILE = "file_lists.db"
+MAX_UNDO_HISTORY = 20
+SQL_BATCH_SIZE = 900 # 低於 SQLite 預設的參數數量上限
+STATUS_GROUPS = ('none', 'converted', 'failed', 'skipped', 'non_chinese')
+SORT_KEYS = ('order', 'name', 'folder', 'ext', 'status')
+
+
+def _batched(items, size=SQL_BATCH_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size): yield items[start:start + size]
+
+
+def path_facets(path):
+    """ (資料夾, 小寫副檔名, 比對用檔名)；檔案加入列表時算一次，篩選與排序不必再拆解路徑 """
+    folder, name = os.path.split(path)
+    return folder, os.path.splitext(name)[1].lower(), name.casefold()
+
+def status_in_group(status, group):
+    if group == 'non_chinese': return status == 'skipped_non_chinese'
+    if group in ('failed', 'skipped'): return status.startswith(group)
+    return status == group
+
+
+class InMemoryFileList:
+    """ 以 dict 保存 路徑 -> {"checked", "status"}，保留加入順序；另依狀態、勾選、副檔名與資料夾建立索引 (dict 當作有序集合)，
+        篩選、計數與「移除未勾選」只碰到相關的檔案 """
+    def __init__(self):
+        self.data = {}; self.undo_stack = deque(maxlen=MAX_UNDO_HISTORY); self._reindex()
+
+    def _reindex(self):
+        self.seq, self.facets, self.by_status, self.by_checked, self.by_ext, self.by_folder = {}, {}, {}, {True: {}, False: {}}, {}, {}; self.next_seq = 0
+        for path, data in self.data.items(): self._index(path, data)
+
+    def _index(self, path, data):
+        self.seq[path] = self.next_seq; self.next_seq += 1
+        folder, ext, name_key = self.facets[path] = path_facets(path)
+        self.by_status.setdefault(data["status"], {})[path] = None; self.by_checked[data["checked"]][path] = None
+        self.by_ext.setdefault(ext, {})[path] = None; self.by_folder.setdefault(folder, {})[path] = None
+
+    def _unindex(self, path, data):
+        folder, ext, _ = self.facets.pop(path); del self.seq[path]; del self.by_checked[data["checked"]][path]
+        for index, key in ((self.by_status, data["status"]), (self.by_ext, ext), (self.by_folder, folder)):
+            del index[key][path]
+            if not index[key]: del index[key]
+
+    def _move(self, index, path, old, new):
+        del index[old][path]
+        if not index[old] and index is not self.by_checked: del index[old]
+        index.setdefault(new, {})[path] = None
+
+    def __len__(self): return len(self.data)
+    def __contains__(self, path): return path in self.data
+    def __iter__(self): return iter(list(self.data))
+    def get(self, path): return dict(self.data[path]) if path in self.data else None
+    def items(self): return ((path, dict(data)) for path, data in list(self.data.items()))
+
+    def add(self, paths, checked=True, status="none"):
+        added = 0
+        for path in paths:
+            if path not in self.data: self.data[path] = {"checked": checked, "status": status}; self._index(path, self.data[path]); added += 1
+        return added
+    def add_items(self, items):
+        for path, data in items:
+            if path not in self.data: self.data[path] = {"checked": data["checked"], "status": data["status"]}; self._index(path, self.data[path])
+
+    def set_checked(self, paths, state):
+        for path in paths:
+            if (data := self.data.get(path)) is not None and data["checked"] != state: self._move(self.by_checked, path, data["checked"], state); data["checked"] = state
+    def toggle_checked(self, path):
+        if path in self.data: self.set_checked((path,), not self.data[path]["checked"])
+    def set_all_checked(self, state):
+        for data in self.data.values(): data["checked"] = state
+        self.by_checked = {state: dict.fromkeys(self.data), not state: {}}
+    def set_status(self, statuses):
+        for path, status in statuses.items():
+            if (data := self.data.get(path)) is not None and data["status"] != status: self._move(self.by_status, path, data["status"], status); data["status"] = status
+
+    def rename(self, renames, status):
+        """ renames: {舊路徑: 新路徑}；新路徑沿用勾選狀態並移到列表最後 """
+        moved = {new: {**self.data[old], "status": status} for old, new in renames.items() if old in self.data}
+        self.remove(renames); self.remove(moved); self.add_items(moved.items())
+
+    def remove(self, paths):
+        for path in paths:
+            if (data := self.data.pop(path, None)) is not None: self._unindex(path, data)
+    def remove_unchecked(self):
+        unchecked = list(self.by_checked[False]); self.remove(unchecked)
+        return len(unchecked)
+    def clear(self): self.data.clear(); self._reindex()
+
+    def checked_paths(self): return sorted(self.by_checked[True], key=self.seq.__getitem__)
+    def checked_count(self): return len(self.by_checked[True])
+    def unchecked_count(self): return len(self.by_checked[False])
+
+    def status_counts(self): return {status: len(paths) for status, paths in self.by_status.items()}
+    def extensions(self): return sorted(self.by_ext)
+    def folders(self): return sorted(self.by_folder)
+
+    def query(self, status=None, ext=None, folder=None, checked=None, text="", sort='order', descending=False):
+        """ 依條件回傳 [(路徑, 資料)]；先取最小的索引集合，再以其他條件逐一比對 """
+        buckets = []
+        if status: buckets.append({path: None for key, paths in self.by_status.items() if status_in_group(key, status) for path in paths})
+        if ext is not None: buckets.append(self.by_ext.get(ext, {}))
+        if folder is not None: buckets.append(self.by_folder.get(folder, {}))
+        if checked is not None: buckets.append(self.by_checked[checked])
+        buckets.sort(key=len); paths = buckets[0] if buckets else self.data
+        paths = [path for path in paths if all(path in bucket for bucket in buckets[1:])]
+        if text: text = text.casefold(); paths = [path for path in paths if text in self.facets[path][2]]
+        if sort == 'name': paths.sort(key=lambda path: self.facets[path][2], reverse=descending)
+        elif sort == 'folder': paths.sort(key=lambda path: (self.facets[path][0], self.facets[path][2]), reverse=descending)
+        elif sort == 'ext': paths.sort(key=lambda path: (self.facets[path][1], self.facets[path][2]), reverse=descending)
+        elif sort == 'status': paths.sort(key=lambda path: (self.data[path]["status"], self.seq[path]), reverse=descending)
+        elif buckets or descending: paths.sort(key=self.seq.__getitem__, reverse=descending)
+        return [(path, dict(self.data[path])) for path in paths]
+
+    def save_undo_state(self): self.undo_stack.append(copy.deepcopy(self.data))
+    def undo(self):
+        if not self.undo_stack: return False
+        self.data = self.undo_stack.pop(); self._reindex(); return True
+    def close(self): pass
+
+
+class SQLiteFileList:
+    """ 與 InMemoryFileList 相同介面；勾選與狀態欄位有索引，計數與篩選直接在 SQL 中完成 """
+    def __init__(self, db_path=FILE_LIST_DB_FILE, table="files"):
+        self.table = table; self._lock = threading.RLock(); self.undo_steps = deque()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL"); self.conn.execute("PRAGMA synchronous=NORMAL")
+        # INSERT OR REPLACE 刪掉的舊資料列也要觸發復原紀錄
+        self.conn.execute("PRAGMA recursive_triggers=ON")
+        with self.conn:
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (seq INTEGER PRIMARY KEY AUTOINCREMENT, path TEXT NOT NULL UNIQUE, "
+                              f"checked INTEGER NOT NULL DEFAULT 1, status TEXT NOT NULL DEFAULT 'none', folder TEXT NOT NULL DEFAULT '', ext TEXT NOT NULL DEFAULT '', name_key TEXT NOT NULL DEFAULT '')")
+            # 舊版把復原快照存成整份資料表，啟動時清掉上次留下的
+            for (name,) in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ?", (f"{table}_undo_%",)).fetchall():
+                self.conn.execute(f"DROP TABLE {name}")
+            # 舊版資料庫沒有篩選用的欄位，補上後依路徑回填
+            if missing := [column for column in ('folder', 'ext', 'name_key') if column not in {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}]:
+                for column in missing: self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT NOT NULL DEFAULT ''")
+                self.conn.executemany(f"UPDATE {table} SET folder = ?, ext = ?, name_key = ? WHERE seq = ?",
+                                      [(*path_facets(path), seq) for seq, path in self.conn.execute(f"SELECT seq, path FROM {table}").fetchall()])
+            for column in ('checked', 'status', 'folder', 'ext', 'name_key'): self.conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({column})")
+            self._create_undo_log()
+        self.undo_counter = 0
+
+    def _create_undo_log(self):
+        """ 復原紀錄只在同一次執行中有效，放在連線專屬的 TEMP 資料表；觸發器在每一步第一次改到某列時記下它的舊值
+            (新加入的列只記 seq)，復原時反向套用 """
+        table, log, state = self.table, f"{self.table}_undo_log", f"{self.table}_undo_state"
+        self.conn.execute(f"CREATE TEMP TABLE {log} (step INTEGER NOT NULL, seq INTEGER NOT NULL, existed INTEGER NOT NULL, "
+                          f"path TEXT, checked INTEGER, status TEXT, folder TEXT, ext TEXT, name_key TEXT)")
+        self.conn.execute(f"CREATE INDEX temp.{log}_step ON {log} (step, seq)")
+        self.conn.execute(f"CREATE TEMP TABLE {state} (step INTEGER NOT NULL)"); self.conn.execute(f"INSERT INTO {state} VALUES (0)")
+        first_change = f"FROM {state} WHERE step > 0 AND NOT EXISTS (SELECT 1 FROM {log} WHERE {log}.step = {state}.step AND {log}.seq = {{row}}.seq)"
+        for event in ('UPDATE', 'DELETE'):
+            self.conn.execute(f"CREATE TEMP TRIGGER {table}_undo_{event.lower()} BEFORE {event} ON {table} BEGIN "
+                              f"INSERT INTO {log} SELECT step, OLD.seq, 1, OLD.path, OLD.checked, OLD.status, OLD.folder, OLD.ext, OLD.name_key {first_change.format(row='OLD')}; END")
+        self.conn.execute(f"CREATE TEMP TRIGGER {table}_undo_insert AFTER INSERT ON {table} BEGIN "
+                          f"INSERT INTO {log} (step, seq, existed) SELECT step, NEW.seq, 0 {first_change.format(row='NEW')}; END")
+
+    def _set_undo_step(self, step): self.conn.execute(f"UPDATE {self.table}_undo_state SET step = ?", (step,))
+
+    def _execute(self, sql, args=()):
+        with self._lock: return self.conn.execute(sql, args).fetchall()
+
+    def __len__(self): return self._execute(f"SELECT COUNT(*) FROM {self.table}")[0][0]
+    def __contains__(self, path): return bool(self._execute(f"SELECT 1 FROM {self.table} WHERE path = ?", (path,)))
+    def __iter__(self): return iter([row[0] for row in self._execute(f"SELECT path FROM {self.table} ORDER BY seq")])
+    def get(self, path):
+        rows = self._execute(f"SELECT checked, status FROM {self.table} WHERE path = ?", (path,))
+        return {"checked": bool(rows[0][0]), "status": rows[0][1]} if rows else None
+    def items(self):
+        for path, checked, status in self._execute(f"SELECT path, checked, status FROM {self.table} ORDER BY seq"): yield path, {"checked": bool(checked), "status": status}
+
+    def add(self, paths, checked=True, status="none"):
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(f"INSERT OR IGNORE INTO {self.table} (path, checked, status, folder, ext, name_key) VALUES (?, ?, ?, ?, ?, ?)",
+                                  ((path, int(checked), status, *path_facets(path)) for path in paths))
+            return self.conn.total_changes - before
+    def add_items(self, items):
+        with self._lock, self.conn:
+            self.conn.executemany(f"INSERT OR IGNORE INTO {self.table} (path, checked, status, folder, ext, name_key) VALUES (?, ?, ?, ?, ?, ?)",
+                                  ((path, int(data["checked"]), data["status"], *path_facets(path)) for path, data in items))
+
+    def _update_paths(self, sql, paths, args=()):
+        with self._lock, self.conn:
+            for batch in _batched(paths): self.conn.execute(sql.format(placeholders=', '.join('?' * len(batch))), (*args, *batch))
+
+    def set_checked(self, paths, state): self._update_paths(f"UPDATE {self.table} SET checked = ? WHERE path IN ({{placeholders}})", paths, (int(state),))
+    def toggle_checked(self, path):
+        with self._lock, self.conn: self.conn.execute(f"UPDATE {self.table} SET checked = 1 - checked WHERE path = ?", (path,))
+    def set_all_checked(self, state):
+        with self._lock, self.conn: self.conn.execute(f"UPDATE {self.table} SET checked = ?", (int(state),))
+    def set_status(self, statuses):
+        with self._lock, self.conn: self.conn.executemany(f"UPDATE {self.table} SET status = ? WHERE path = ?", ((status, path) for path, status in statuses.items()))
+
+    def rename(self, renames, status):
+        with self._lock, self.conn:
+            for old, new in renames.items():
+                if not (rows := self.conn.execute(f"SELECT checked FROM {self.table} WHERE path = ?", (old,)).fetchall()): continue
+                self.conn.execute(f"DELETE FROM {self.table} WHERE path = ?", (old,))
+                self.conn.execute(f"INSERT OR REPLACE INTO {self.table} (path, checked, status, folder, ext, name_key) VALUES (?, ?, ?, ?, ?, ?)", (new, rows[0][0], status, *path_facets(new)))
+
+    def remove(self, paths): self._update_paths(f"DELETE FROM {self.table} WHERE path IN ({{placeholders}})", paths)
+    def remove_unchecked(self):
+        with self._lock, self.conn: return self.conn.execute(f"DELETE FROM {self.table} WHERE checked = 0").rowcount
+    def clear(self):
+        with self._lock, self.conn: self.conn.execute(f"DELETE FROM {self.table}")
+
+    def checked_paths(self): return [row[0] for row in self._execute(f"SELECT path FROM {self.table} WHERE checked = 1 ORDER BY seq")]
+    def checked_count(self): return self._execute(f"SELECT COUNT(*) FROM {self.table} WHERE checked = 1")[0][0]
+    def unchecked_count(self): return self._execute(f"SELECT COUNT(*) FROM {self.table} WHERE checked = 0")[0][0]
+
+    def status_counts(self): return dict(self._execute(f"SELECT status, COUNT(*) FROM {self.table} GROUP BY status"))
+    def extensions(self): return [row[0] for row in self._execute(f"SELECT DISTINCT ext FROM {self.table} ORDER BY ext")]
+    def folders(self): return [row[0] for row in self._execute(f"SELECT DISTINCT folder FROM {self.table} ORDER BY folder")]
+
+    def query(self, status=None, ext=None, folder=None, checked=None, text="", sort='order', descending=False):
+        """ 與 InMemoryFileList.query 相同；條件與排序都在 SQL 中完成，檔名比對使用預先轉成 casefold 的欄位 """
+        conditions, args = [], []
+        if status == 'non_chinese': conditions.append("status = 'skipped_non_chinese'")
+        elif status in ('failed', 'skipped'): conditions.append("status LIKE ?"); args.append(status + '%')
+        elif status: conditions.append("status = ?"); args.append(status)
+        for column, value in (('ext', ext), ('folder', folder), ('checked', None if checked is None else int(checked))):
+            if value is not None: conditions.append(f"{column} = ?"); args.append(value)
+        if text: conditions.append("instr(name_key, ?) > 0"); args.append(text.casefold())
+        order = {'name': "name_key", 'folder': "folder, name_key", 'ext': "ext, name_key", 'status': "status, seq"}.get(sort, "seq")
+        if descending: order = ", ".join(f"{column} DESC" for column in order.split(", "))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return [(path, {"checked": bool(c), "status": st}) for path, c, st in self._execute(f"SELECT path, checked, status FROM {self.table} {where} ORDER BY {order}", args)]
+
+    def save_undo_state(self):
+        # 之後的修改都記在新的一步裡；只記被改到的列，不複製整份資料表
+        with self._lock, self.conn:
+            self.undo_counter += 1; self.undo_steps.append(self.undo_counter); self._set_undo_step(self.undo_counter)
+            while len(self.undo_steps) > MAX_UNDO_HISTORY: self.conn.execute(f"DELETE FROM {self.table}_undo_log WHERE step = ?", (self.undo_steps.popleft(),))
+    def undo(self):
+        if not self.undo_steps: return False
+        with self._lock, self.conn:
+            step, log = self.undo_steps.pop(), f"{self.table}_undo_log"; self._set_undo_step(0)
+            self.conn.execute(f"DELETE FROM {self.table} WHERE seq IN (SELECT seq FROM {log} WHERE step = ? AND existed = 0)", (step,))
+            self.conn.execute(f"INSERT OR REPLACE INTO {self.table} (seq, path, checked, status, folder, ext, name_key) "
+                              f"SELECT seq, path, checked, status, folder, ext, name_key FROM {log} WHERE step = ? AND existed = 1", (step,))
+            self.conn.execute(f"DELETE FROM {log} WHERE step = ?", (step,)); self._set_undo_step(self.undo_steps[-1] if self.undo_steps else 0)
+        return True
+
+    def close(self):
+        with self._lock: self.undo_steps.clear(); self.conn.close()
+
+
+def create_file_list(backend, table):
+    return SQLiteFileList(FILE_LIST_DB_FILE, table) if backend == 'sqlite' else InMemoryFileList()
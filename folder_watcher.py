@@ -0,0 +1,161 @@
+#
+# 檔案名稱: folder_watcher.py
+#
+# 監看資料夾：有新的或修改過的 txt 檔寫入完成後才交給內容轉換流程
+# Linux 上使用 inotify (透過 ctypes，不需額外套件)，其他平台或失敗時改用定期掃描
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+DEFAULT_SETTLE_SECONDS = 1.0
+DEFAULT_POLL_INTERVAL = 2.0
+STOP_CHECK_INTERVAL = 1.0
+HANDLED_PRUNE_MIN = 10000 # handled 超過此數量 (之後為上次清理後的兩倍) 時移除已不存在的檔案
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class Inotify:
+    def __init__(self):
+        if not sys.platform.startswith('linux'): raise OSError("inotify is only available on Linux")
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0: raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+
+    def add_watch(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0: raise OSError(ctypes.get_errno(), f"inotify_add_watch failed: {path}")
+        self.watches[wd] = path
+
+    def read_events(self, timeout):
+        """ 等待最多 timeout 秒 (None 代表無限期)，回傳 [(完整路徑, mask)] """
+        if not select.select([self.fd], [], [], timeout)[0]: return []
+        try: data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError: return []
+        events, offset = [], 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_len = EVENT_HEADER.unpack_from(data, offset); offset += EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b'\0'); offset += name_len
+            if mask & IN_Q_OVERFLOW: events.append((None, mask)); continue
+            if wd in self.watches: events.append((os.path.join(self.watches[wd], os.fsdecode(name)) if name else self.watches[wd], mask))
+        return events
+
+    def close(self): os.close(self.fd)
+
+
+class FolderWatcher:
+    """ 檔案在 settle_seconds 內沒有新事件且大小不再變動時視為寫入完成，同一版本 (mtime, size) 只處理一次 """
+    def __init__(self, watch_folder, on_ready, suffixes=('.txt',), settle_seconds=DEFAULT_SETTLE_SECONDS, poll_interval=DEFAULT_POLL_INTERVAL,
+                 recursive=False, include_existing=False, exclude_folders=(), use_inotify=True):
+        self.watch_folder = os.path.abspath(watch_folder); self.on_ready = on_ready
+        self.suffixes = tuple(s.lower() for s in suffixes); self.settle_seconds = settle_seconds; self.poll_interval = poll_interval
+        self.recursive = recursive; self.include_existing = include_existing; self.use_inotify = use_inotify
+        self.exclude_folders = tuple(os.path.abspath(f) for f in exclude_folders if f)
+        self.pending = {}; self.handled = {}; self.last_sizes = {}; self.prune_at = HANDLED_PRUNE_MIN
+
+    def is_candidate(self, path):
+        if not path.lower().endswith(self.suffixes) or os.path.basename(path).startswith('.'): return False
+        return not any(os.path.commonpath([path, folder]) == folder for folder in self.exclude_folders)
+
+    def scan(self):
+        for root, dirs, files in os.walk(self.watch_folder):
+            dirs[:] = [d for d in dirs if self.recursive and self.is_candidate_dir(os.path.join(root, d))]
+            for name in files:
+                if self.is_candidate(path := os.path.join(root, name)): yield path
+
+    def is_candidate_dir(self, path):
+        return not any(os.path.commonpath([path, folder]) == folder for folder in self.exclude_folders)
+
+    def prune_handled(self):
+        """ 長時間執行時 handled 只增不減；已刪除或移走的檔案不必再記住，清理間隔隨數量加倍，平均成本固定 """
+        if len(self.handled) < self.prune_at: return
+        for path in [path for path in self.handled if not os.path.exists(path)]: del self.handled[path]
+        self.prune_at = max(HANDLED_PRUNE_MIN, len(self.handled) * 2)
+
+    def watch_tree(self, inotify, folder, mark_files=False):
+        """ 監看 folder 與其下所有子資料夾 (recursive 時)；mark_files 時一併處理其中已存在的檔案 (新建立或移入的資料夾，監看加上前可能已有內容) """
+        for root, dirs, files in os.walk(folder):
+            inotify.add_watch(root)
+            if mark_files: [self.mark(os.path.join(root, name)) for name in files]
+            if not self.recursive: break
+            dirs[:] = [d for d in dirs if self.is_candidate_dir(os.path.join(root, d))]
+
+    def file_version(self, path):
+        try: st = os.stat(path)
+        except OSError: return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def mark(self, path, now=None):
+        if not (self.is_candidate(path) and os.path.isfile(path) and (version := self.file_version(path))): return
+        self.pending[path] = time.monotonic() if now is None else now; self.last_sizes[path] = version[1]
+
+    def flush_ready(self):
+        """ 處理已沉寂夠久的檔案，回傳距離下一個待處理檔案到期的秒數 (沒有則為 None) """
+        now = time.monotonic(); next_due = None
+        for path, last_event in list(self.pending.items()):
+            due = last_event + self.settle_seconds
+            if due > now: next_due = due - now if next_due is None else min(next_due, due - now); continue
+            version = self.file_version(path)
+            if version is None: del self.pending[path]; continue
+            if self.last_sizes.get(path) != version[1]:
+                # 大小仍在變動，視為還在寫入中，再等一個沉寂週期
+                self.last_sizes[path] = version[1]; self.pending[path] = now; next_due = self.settle_seconds if next_due is None else min(next_due, self.settle_seconds); continue
+            del self.pending[path]; self.last_sizes.pop(path, None)
+            if self.handled.get(path) == version: continue
+            self.handled[path] = version; self.prune_handled()
+            try: self.on_ready(path)
+            except Exception as e: print(f"Error on '{os.path.basename(path)}': {e}")
+        return next_due
+
+    def prime(self):
+        for path in self.scan():
+            if self.include_existing: self.mark(path, now=0)
+            else: self.handled[path] = self.file_version(path)
+
+    def run(self, stop_event=None):
+        stop_event = stop_event or threading.Event()
+        self.prime()
+        if self.use_inotify:
+            try: inotify = Inotify()
+            except (OSError, AttributeError) as e: print(f"inotify unavailable ({e}), falling back to polling"); inotify = None
+        else: inotify = None
+        if inotify is None: return self.run_polling(stop_event)
+        try:
+            self.watch_tree(inotify, self.watch_folder)
+            while not stop_event.is_set():
+                next_due = self.flush_ready()
+                # 沒有待處理檔案時僅定期醒來檢查停止旗標，閒置時幾乎不耗 CPU
+                for path, mask in inotify.read_events(STOP_CHECK_INTERVAL if next_due is None else min(next_due, STOP_CHECK_INTERVAL)):
+                    if path is None: [self.mark(p) for p in self.scan() if self.handled.get(p) != self.file_version(p)]; continue
+                    if mask & IN_ISDIR:
+                        # 新資料夾 (含 mkdir -p 一次建立的多層) 整棵加入監看
+                        if self.recursive and mask & (IN_CREATE | IN_MOVED_TO) and self.is_candidate_dir(path):
+                            try: self.watch_tree(inotify, path, mark_files=True)
+                            except OSError as e: print(f"Cannot watch '{path}': {e}")
+                        continue
+                    self.mark(path)
+            self.flush_ready()
+        finally: inotify.close()
+
+    def run_polling(self, stop_event):
+        while not stop_event.is_set():
+            for path in self.scan():
+                version = self.file_version(path)
+                if version is not None and self.handled.get(path) != version and path not in self.pending: self.mark(path)
+            next_due = self.flush_ready()
+            stop_event.wait(self.poll_interval if next_due is None else min(next_due, self.poll_interval))
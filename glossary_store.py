@@ -0,0 +1,136 @@
+#
+# 檔案名稱: glossary_store.py
+#
+# 自訂詞彙的儲存：custom_conversions.json 為基底，新增、修改與刪除以附加方式寫入變更記錄，累積到一定數量或關閉程式時才整份重寫；另提供 TSV / CSV / OpenCC 詞典的逐行匯入與匯出
+import csv
+import json
+import os
+
+GLOSSARY_FORMATS = ('tsv', 'csv', 'opencc')
+GLOSSARY_COMPACT_MIN = 1000 # 變更記錄至少累積這麼多筆，且超過詞彙數的四分之一時才重寫基底檔
+GLOSSARY_CONFLICT_SAMPLES = 20
+
+
+def journal_path(path): return os.path.splitext(path)[0] + ".changes.jsonl"
+
+def format_for_path(path):
+    """ 依副檔名判斷格式：.csv 為 CSV、.tsv 為 TSV，其他 (OpenCC 詞典通常是 .txt) 視為 OpenCC 詞典 """
+    ext = os.path.splitext(path)[1].lower()
+    return 'csv' if ext == '.csv' else 'tsv' if ext == '.tsv' else 'opencc'
+
+
+def iter_glossary_file(path, fmt=None):
+    """ 逐行產生 (行號, 原詞, 目標詞)；無法解析的行產生 (行號, None, None)。
+        OpenCC 詞典一行為「原詞<Tab>候選1 候選2 ...」，取第一個候選；空行與 # 開頭的行略過 """
+    fmt = fmt or format_for_path(path)
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        rows = csv.reader(f) if fmt == 'csv' else (line.rstrip('\r\n').split('\t', 1) for line in f)
+        for line_no, row in enumerate(rows, 1):
+            if not row or not row[0].strip() or row[0].lstrip().startswith('#'): continue
+            key = row[0].strip(); value = row[1].strip() if len(row) > 1 else ""
+            if fmt == 'opencc': value = value.split(' ', 1)[0]
+            yield (line_no, key, value) if value else (line_no, None, None)
+
+
+class ImportPlan:
+    """ 匯入前的比對結果：additions 為新詞、conflicts 為 {原詞: (現有目標詞, 匯入目標詞)}；
+        檔案中同一原詞出現多次時以最後一次為準，目標詞不同的記入 file_conflicts """
+    def __init__(self, path):
+        self.path = path; self.additions = {}; self.conflicts = {}; self.unchanged = self.duplicates = 0
+        self.file_conflicts = []; self.invalid_lines = []
+
+    def summary(self):
+        return {'additions': len(self.additions), 'conflicts': len(self.conflicts), 'unchanged': self.unchanged, 'duplicates': self.duplicates,
+                'file_conflicts': len(self.file_conflicts), 'invalid_lines': len(self.invalid_lines)}
+
+    def conflict_samples(self, limit=GLOSSARY_CONFLICT_SAMPLES):
+        return [f"{key}: {old} -> {new}" for key, (old, new) in list(self.conflicts.items())[:limit]]
+
+
+class GlossaryStore:
+    """ 原詞 -> 目標詞 (保留加入順序)；每次變更立即附加到變更記錄，中途結束也不會遺失 """
+    def __init__(self, path):
+        self.path = path; self.journal_path = journal_path(path); self.entries = {}; self.journal_count = 0
+
+    def load(self):
+        """ 讀取基底檔並重播變更記錄；寫到一半的最後一行略過 """
+        self.entries = {}; self.journal_count = 0
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f: self.entries = json.load(f)
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try: op, key, *value = json.loads(line)
+                    except (json.JSONDecodeError, ValueError): continue
+                    if op == 'set': self.entries[key] = value[0]
+                    else: self.entries.pop(key, None)
+                    self.journal_count += 1
+        return self
+
+    def _append(self, changes):
+        if not changes: return
+        with open(self.journal_path, 'a', encoding='utf-8') as f: f.write("".join(json.dumps(change, ensure_ascii=False) + "\n" for change in changes))
+        self.journal_count += len(changes)
+
+    def set_many(self, pairs):
+        changes = [('set', key, value) for key, value in pairs if self.entries.get(key) != value]
+        for _, key, value in changes: self.entries[key] = value
+        self._append(changes); return len(changes)
+
+    def set(self, key, value): return self.set_many([(key, value)])
+
+    def delete_many(self, keys):
+        changes = [('del', key) for key in keys if key in self.entries]
+        for _, key in changes: del self.entries[key]
+        self._append(changes); return len(changes)
+
+    def needs_compact(self): return self.journal_count >= max(GLOSSARY_COMPACT_MIN, len(self.entries) // 4)
+
+    def compact(self, force=False):
+        """ 把目前的詞彙整份寫回基底檔 (先寫暫存檔再取代) 並清除變更記錄；每筆一行，方便手動編輯與比對差異 """
+        if not self.journal_count or not (force or self.needs_compact()): return False
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f: json.dump(self.entries, f, ensure_ascii=False, indent=0)
+        os.replace(temp_path, self.path)
+        if os.path.exists(self.journal_path): os.remove(self.journal_path)
+        self.journal_count = 0; return True
+
+    def search(self, text):
+        """ 原詞或目標詞包含 text (不分大小寫) 的原詞，依加入順序 """
+        if not (needle := text.strip().casefold()): return list(self.entries)
+        return [key for key, value in self.entries.items() if needle in key.casefold() or needle in value.casefold()]
+
+    def plan_import(self, path, fmt=None):
+        plan, seen = ImportPlan(path), {}
+        for line_no, key, value in iter_glossary_file(path, fmt):
+            if key is None: plan.invalid_lines.append(line_no); continue
+            if key in seen:
+                plan.duplicates += 1
+                if seen[key] != value: plan.file_conflicts.append((line_no, key, seen[key], value))
+            seen[key] = value
+        for key, value in seen.items():
+            if (current := self.entries.get(key)) is None: plan.additions[key] = value
+            elif current == value: plan.unchanged += 1
+            else: plan.conflicts[key] = (current, value)
+        return plan
+
+    def apply_import(self, plan, overwrite=False):
+        """ 加入新詞；overwrite 時以匯入的目標詞取代衝突的現有詞彙。回傳實際寫入的筆數 """
+        pairs = list(plan.additions.items())
+        if overwrite: pairs.extend((key, new) for key, (_, new) in plan.conflicts.items())
+        return self.set_many(pairs)
+
+    def export(self, path, keys=None, fmt=None):
+        """ 逐行寫出 keys (預設為全部) 的詞彙，回傳筆數 """
+        fmt = fmt or format_for_path(path); keys = self.entries if keys is None else keys; count = 0
+        with open(path, 'w', encoding='utf-8', newline='' if fmt == 'csv' else None) as f:
+            writer = csv.writer(f) if fmt == 'csv' else None
+            for key in keys:
+                if (value := self.entries.get(key)) is None: continue
+                if writer: writer.writerow((key, value))
+                else: f.write(f"{key}\t{value}\n")
+                count += 1
+        return count
+
+
+def load_glossary(path): return GlossaryStore(path).load().entries
@@ -0,0 +1,222 @@
+#
+# 檔案名稱: job_journal.py
+#
+# 轉換工作日誌：每個檔案的結果一產生就寫入 SQLite，程式關閉或當機後可從未完成處繼續
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from converter_core import describe_content_result, describe_line_cache, build_content_conversion_params, content_loaded_bytes, recording_reservations
+from task_scheduler import scheduler
+from batch_scheduler import stat_entries, plan_units, run_units, ByteBudget, MEMORY_PER_LOADED_BYTE
+from archive_converter import convert_content_path
+from content_dedup import DedupStats, find_duplicates, write_duplicate_output, describe_dedup
+from job_report import output_size
+
+JOB_JOURNAL_FILE = "conversion_jobs.db"
+# 只有這些設定會被保存；轉換器物件於恢復時重新建立
+PERSISTED_CONTENT_PARAMS = ('conversion_type', 'custom_conversions', 'enable_custom', 'output_folder', 'use_manual_encoding', 'manual_encoding', 'filename_pattern', 'use_line_cache', 'output_compression',
+                            'deduplicate', 'dedup_link', 'convert_archive_names')
+UNFINISHED_STATES = ('queued', 'running')
+JOB_RETENTION_SECONDS = 30 * 24 * 3600
+
+
+class JobJournal:
+    def __init__(self, path=JOB_JOURNAL_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL"); self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, params TEXT NOT NULL,
+                                             state TEXT NOT NULL, created REAL NOT NULL, updated REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS job_files (job_id INTEGER NOT NULL, seq INTEGER NOT NULL, path TEXT NOT NULL, status TEXT, detail TEXT, updated REAL,
+                                                  PRIMARY KEY (job_id, seq));
+            CREATE INDEX IF NOT EXISTS job_files_status ON job_files (job_id, status);
+            CREATE TABLE IF NOT EXISTS watch_outputs (source TEXT NOT NULL, output_folder TEXT NOT NULL, output TEXT NOT NULL, seq INTEGER NOT NULL, updated REAL NOT NULL,
+                                                      PRIMARY KEY (source, output_folder));
+        """)
+        # reserved：處理中的檔案已預留的輸出路徑，舊版建立的資料庫沒有此欄位
+        if 'reserved' not in (row[1] for row in self.conn.execute("PRAGMA table_info(job_files)")): self.conn.execute("ALTER TABLE job_files ADD COLUMN reserved TEXT")
+        self.conn.commit()
+
+    def create_job(self, kind, params, filepaths, state='queued'):
+        now = time.time()
+        with self._lock, self.conn:
+            job_id = self.conn.execute("INSERT INTO jobs (kind, params, state, created, updated) VALUES (?, ?, ?, ?, ?)",
+                                       (kind, json.dumps(params, ensure_ascii=False), state, now, now)).lastrowid
+            self.conn.executemany("INSERT INTO job_files (job_id, seq, path) VALUES (?, ?, ?)", ((job_id, seq, path) for seq, path in enumerate(filepaths, 1)))
+        return job_id
+
+    def set_state(self, job_id, state):
+        with self._lock, self.conn: self.conn.execute("UPDATE jobs SET state = ?, updated = ? WHERE id = ?", (state, time.time(), job_id))
+
+    def reserve(self, job_id, seq, path):
+        """ 轉換前記下預留的輸出路徑；程式在寫完前中斷時，恢復工作會先刪除這個空的或寫一半的檔案 """
+        with self._lock, self.conn: self.conn.execute("UPDATE job_files SET reserved = ? WHERE job_id = ? AND seq = ?", (path, job_id, seq))
+
+    def discard_reservations(self, job_id):
+        """ 刪除未完成檔案遺留的輸出檔，回傳刪除的數量；刪除後重新轉換會再使用同一個檔名 """
+        with self._lock: rows = self.conn.execute("SELECT seq, reserved FROM job_files WHERE job_id = ? AND status IS NULL AND reserved IS NOT NULL", (job_id,)).fetchall()
+        removed = 0
+        for _, path in rows:
+            try: os.remove(path); removed += 1
+            except FileNotFoundError: pass
+        with self._lock, self.conn: self.conn.executemany("UPDATE job_files SET reserved = NULL WHERE job_id = ? AND seq = ?", ((job_id, seq) for seq, _ in rows))
+        return removed
+
+    def record(self, job_id, seq, status, detail=None):
+        with self._lock, self.conn:
+            self.conn.execute("UPDATE job_files SET status = ?, detail = ?, updated = ? WHERE job_id = ? AND seq = ?", (status, detail, time.time(), job_id, seq))
+
+    def get_job(self, job_id):
+        with self._lock: row = self.conn.execute("SELECT id, kind, params, state FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return None if row is None else {'id': row[0], 'kind': row[1], 'params': json.loads(row[2]), 'state': row[3]}
+
+    def list_jobs(self, states=None):
+        query = "SELECT j.id, j.kind, j.state, j.created, COUNT(f.seq), COUNT(f.status) FROM jobs j LEFT JOIN job_files f ON f.job_id = j.id"
+        args = ()
+        if states: query += f" WHERE j.state IN ({', '.join('?' * len(states))})"; args = tuple(states)
+        with self._lock: rows = self.conn.execute(query + " GROUP BY j.id ORDER BY j.id", args).fetchall()
+        return [{'id': r[0], 'kind': r[1], 'state': r[2], 'created': r[3], 'total': r[4], 'done': r[5]} for r in rows]
+
+    def unfinished_jobs(self, kind=None):
+        return [job for job in self.list_jobs(UNFINISHED_STATES) if kind is None or job['kind'] == kind]
+
+    def pending_files(self, job_id):
+        with self._lock: return self.conn.execute("SELECT seq, path FROM job_files WHERE job_id = ? AND status IS NULL ORDER BY seq", (job_id,)).fetchall()
+
+    def results(self, job_id):
+        with self._lock: return dict(self.conn.execute("SELECT path, status FROM job_files WHERE job_id = ? AND status IS NOT NULL ORDER BY seq", (job_id,)).fetchall())
+
+    def file_count(self, job_id):
+        with self._lock: return self.conn.execute("SELECT COUNT(*) FROM job_files WHERE job_id = ?", (job_id,)).fetchone()[0]
+
+    def job_paths(self, job_id):
+        with self._lock: return [row[0] for row in self.conn.execute("SELECT path FROM job_files WHERE job_id = ? ORDER BY seq", (job_id,))]
+
+    def watch_output(self, source, output_folder):
+        """ 監看模式中 source 先前轉換到 output_folder 的 (輸出路徑, 序號)；沒有時回傳 (None, 下一個序號)，序號跨執行延續 """
+        with self._lock:
+            if row := self.conn.execute("SELECT output, seq FROM watch_outputs WHERE source = ? AND output_folder = ?", (source, output_folder)).fetchone(): return row
+            return None, self.conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM watch_outputs WHERE output_folder = ?", (output_folder,)).fetchone()[0]
+
+    def set_watch_output(self, source, output_folder, output, seq):
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO watch_outputs (source, output_folder, output, seq, updated) VALUES (?, ?, ?, ?, ?)", (source, output_folder, output, seq, time.time()))
+
+    def prune(self, max_age=JOB_RETENTION_SECONDS):
+        """ 刪除已結束且超過保存期限的工作 """
+        cutoff = time.time() - max_age
+        with self._lock, self.conn:
+            old_ids = [row[0] for row in self.conn.execute(f"SELECT id FROM jobs WHERE state NOT IN ({', '.join('?' * len(UNFINISHED_STATES))}) AND updated < ?", (*UNFINISHED_STATES, cutoff))]
+            self.conn.executemany("DELETE FROM job_files WHERE job_id = ?", ((i,) for i in old_ids))
+            self.conn.executemany("DELETE FROM jobs WHERE id = ?", ((i,) for i in old_ids))
+
+    def close(self):
+        with self._lock: self.conn.close()
+
+
+def persistable_content_params(params):
+    return {key: params.get(key, False) for key in PERSISTED_CONTENT_PARAMS}
+
+def restore_content_params(saved, cc_s2t, cc_t2s):
+    return build_content_conversion_params(saved['conversion_type'], saved['output_folder'], cc_s2t, cc_t2s, saved['custom_conversions'], saved['enable_custom'],
+                                           saved['use_manual_encoding'], saved['manual_encoding'], saved['filename_pattern'], saved.get('use_line_cache', False),
+                                           saved.get('output_compression') or 'none', saved.get('deduplicate', False), saved.get('dedup_link') or 'auto',
+                                           saved.get('convert_archive_names', False))
+
+def run_content_job(journal, job_id, params, cc_s2t, cc_t2s, should_stop=None, on_progress=None, workers=1, memory_budget=None, report=None):
+    """ 執行 (或繼續) 一個內容轉換工作，已完成的檔案會略過；回傳 (成功數, 失敗數, 結果, 第一筆預覽, 是否中止)
+        workers > 1 或指定 memory_budget (位元組) 時依檔案大小排程並行處理，否則依列表順序逐一處理
+        params['deduplicate'] 為真時內容相同的檔案只轉換第一個，其餘在最後依代表檔的結果產生輸出，統計放在 params['dedup_stats']
+        report (JobReport) 不為 None 時逐檔記錄狀態、編碼、位元組數與耗時
+        寫入日誌或報告失敗時不再開始新檔案，工作標為 cancelled 讓 jobs resume 接續，並把例外拋回呼叫端 """
+    results = journal.results(job_id)
+    state = {'success': sum(1 for status in results.values() if status == 'converted'), 'done': len(results), 'preview': (None, None)}
+    state['failed'], state['error'] = len(results) - state['success'], None
+    total, lock = journal.file_count(job_id), threading.Lock()
+    if removed := journal.discard_reservations(job_id): print(f"Job {job_id}: removed {removed} incomplete output files from the interrupted run")
+    journal.set_state(job_id, 'running')
+    def convert_entry(seq, filepath):
+        """ 回傳 (狀態, 細節, 寫入日誌的文字)；重複檔的細節只有代表檔的編碼與路徑 """
+        if (source := outcomes.get(duplicates.get(seq))) is not None:
+            status, detail_text, encoding, source_path = source
+            if status == 'converted': detail_text = write_duplicate_output(detail_text, filepath, params, seq, dedup)
+            return status, {'encoding': encoding, 'duplicate_of': source_path}, detail_text
+        status, detail = convert_content_path(filepath, params, seq, cc_s2t, cc_t2s)
+        if message := describe_content_result(filepath, status, detail): print(message)
+        return status, detail, detail['output_path'] if status == 'converted' else detail if isinstance(detail, str) else None
+    def convert_one(seq, filepath, size):
+        scheduler.checkpoint()
+        with lock: state['done'] += 1; done = state['done']
+        if on_progress: on_progress(done, total, filepath)
+        started = time.perf_counter()
+        try:
+            # 預留的輸出路徑先記入日誌，當機後恢復時才知道要刪除哪個未寫完的檔案
+            with recording_reservations(lambda path: journal.reserve(job_id, seq, path)): status, detail, detail_text = convert_entry(seq, filepath)
+        except Exception as e: status, detail, detail_text = 'failed_exception', None, str(e); print(f"Error on '{os.path.basename(filepath)}': {e}")
+        with lock:
+            state['success' if status == 'converted' else 'failed'] += 1; results[filepath] = status
+            info = detail if isinstance(detail, dict) else {}
+            if seq in representatives: outcomes[seq] = (status, detail_text, info.get('encoding'), filepath)
+            if status == 'converted' and 'original' in info and state['preview'][0] is None: state['preview'] = (info['original'], info['converted'])
+        try:
+            journal.record(job_id, seq, status, detail_text)
+            if report:
+                output = detail_text if status == 'converted' else None; note = None if output else detail_text
+                if 'duplicate_of' in info: note = f"duplicate of {info['duplicate_of']}" + (f": {note}" if note else "")
+                report.record(filepath, status, time.perf_counter() - started, info.get('encoding'), size, output_size(output), output, note)
+        except Exception as e:
+            # 工作執行緒中的例外 run_units 不會處理；記下第一個錯誤並讓其他執行緒停止開始新檔案
+            print(f"Job {job_id}: could not record '{os.path.basename(filepath)}': {e}")
+            with lock: state['error'] = state['error'] or e
+    halted = lambda: state['error'] is not None or bool(should_stop and should_stop())
+    sized, duplicates, outcomes, dedup = stat_entries(journal.pending_files(job_id)), {}, {}, None
+    if params.get('deduplicate'):
+        dedup = params['dedup_stats'] = DedupStats(params.get('dedup_link'))
+        duplicates = find_duplicates(sized); dedup.add_plan(duplicates, {entry[0]: entry[2] for entry in sized})
+    representatives = set(duplicates.values()); unique = [entry for entry in sized if entry[0] not in duplicates]
+    if workers > 1 or memory_budget:
+        budget = ByteBudget(memory_budget) if memory_budget else None
+        run_units(plan_units(unique), lambda entry: convert_one(*entry), workers, budget,
+                  lambda entry: content_loaded_bytes(entry[1], entry[2]) * MEMORY_PER_LOADED_BYTE, halted)
+        if budget: print(f"Peak in-flight estimate: {budget.peak / 1024 / 1024:.1f} MB of {memory_budget / 1024 / 1024:.0f} MB budget")
+    else:
+        for entry in unique:
+            if halted(): break
+            convert_one(*entry)
+    for entry in (entry for entry in sized if entry[0] in duplicates):
+        if halted(): break
+        convert_one(*entry)
+    if state['error'] is not None:
+        # 未記入日誌的檔案仍在待處理清單中，恢復時會重新轉換
+        try: journal.set_state(job_id, 'cancelled')
+        except Exception as e: print(f"Job {job_id}: could not update state: {e}")
+        raise state['error']
+    stopped = len(results) < total and halted()
+    if message := describe_line_cache(params): print(message)
+    if message := describe_dedup(params): print(message)
+    journal.set_state(job_id, 'cancelled' if stopped else 'finished')
+    return state['success'], state['failed'], results, state['preview'], stopped
+
+
+def convert_watched_file(journal, filepath, params, cc_s2t, cc_t2s):
+    """ 監看模式的單檔轉換：第一次轉換時記下輸出路徑，同一來源之後的新版本先轉換到暫存資料夾再以 os.replace 取代原輸出，不會累積編號副本 """
+    source, output_folder = os.path.abspath(filepath), os.path.realpath(params['output_folder'])
+    output, seq = journal.watch_output(source, output_folder)
+    if output is None or not os.path.isfile(output):
+        status, detail = convert_content_path(filepath, params, seq, cc_s2t, cc_t2s)
+        if status == 'converted': journal.set_watch_output(source, output_folder, os.path.abspath(detail['output_path']), seq)
+        return status, detail
+    # 暫存資料夾放在輸出資料夾中，確保與目標在同一檔案系統，取代是原子操作
+    temp_folder = tempfile.mkdtemp(prefix=".watch-", dir=output_folder)
+    try:
+        status, detail = convert_content_path(filepath, dict(params, output_folder=temp_folder), seq, cc_s2t, cc_t2s)
+        if status == 'converted': os.replace(detail['output_path'], output); detail['output_path'] = output; journal.set_watch_output(source, output_folder, output, seq)
+    finally: shutil.rmtree(temp_folder, ignore_errors=True)
+    return status, detail
@@ -0,0 +1,83 @@
+#
+# 檔案名稱: job_report.py
+#
+# 工作報告：每個檔案的結果以 JSONL 逐行寫出 (路徑、狀態代碼、編碼、輸入 / 輸出位元組與耗時)，並可輸出 Prometheus textfile 格式的統計快照供監控系統讀取
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+METRICS_PREFIX = "chinese_converter_job"
+METRICS_FILE_NAME = "chinese_converter.prom"
+METRICS_INTERVAL = 15.0 # 工作進行中更新統計快照的間隔 (秒)
+
+
+def is_error_status(status): return status.startswith('failed')
+
+def output_size(path):
+    try: return os.path.getsize(path) if path else None
+    except OSError: return None
+
+
+class JobReport:
+    """ report_path 為 JSONL 報告 (附加寫入，每筆立即 flush，中斷時已完成的紀錄不會遺失)，metrics_path 為統計快照；兩者皆可為 None。執行緒安全 """
+    def __init__(self, kind, report_path=None, metrics_path=None, job=None):
+        self.kind, self.job, self.report_path, self.metrics_path = kind, job, report_path, metrics_path
+        self._file = open(report_path, 'a', encoding='utf-8') if report_path else None
+        self._lock = threading.Lock(); self._metrics_lock = threading.Lock(); self.statuses = Counter(); self.bytes_in = self.bytes_out = 0; self.file_seconds = 0.0
+        self.started = time.time(); self._started = time.perf_counter(); self._metrics_written = 0.0; self.finished = False
+
+    def record(self, path, status, seconds=None, encoding=None, bytes_in=None, bytes_out=None, output=None, detail=None):
+        entry = {'type': 'file', 'kind': self.kind, 'job': self.job, 'time': round(time.time(), 3), 'path': path, 'status': status, 'encoding': encoding,
+                 'bytes_in': bytes_in, 'bytes_out': bytes_out, 'seconds': round(seconds, 6) if seconds is not None else None, 'output': output, 'detail': detail}
+        with self._lock:
+            self.statuses[status] += 1; self.bytes_in += bytes_in or 0; self.bytes_out += bytes_out or 0; self.file_seconds += seconds or 0.0
+            if self._file: self._file.write(json.dumps(entry, ensure_ascii=False) + "\n"); self._file.flush()
+            # 先更新時間再寫出，同一時間只有一個執行緒會輪到寫入
+            if due := self.metrics_path and time.perf_counter() - self._metrics_written >= METRICS_INTERVAL: self._metrics_written = time.perf_counter()
+        if due: self.write_metrics()
+
+    def summary(self):
+        with self._lock:
+            elapsed = time.perf_counter() - self._started; files = sum(self.statuses.values())
+            return {'type': 'summary', 'kind': self.kind, 'job': self.job, 'started': round(self.started, 3), 'elapsed_seconds': round(elapsed, 3), 'files': files,
+                    'statuses': dict(self.statuses), 'errors': sum(n for status, n in self.statuses.items() if is_error_status(status)),
+                    'bytes_in': self.bytes_in, 'bytes_out': self.bytes_out, 'file_seconds': round(self.file_seconds, 3),
+                    'files_per_second': files / elapsed if elapsed else 0.0, 'bytes_per_second': self.bytes_in / elapsed if elapsed else 0.0}
+
+    def write_metrics(self):
+        """ 整份重寫 (先寫暫存檔再取代)，textfile collector 不會讀到寫一半的檔案 """
+        if not self.metrics_path: return
+        # 快照在鎖內產生與寫出：不共用暫存檔，較舊的快照也不會蓋掉較新的
+        with self._metrics_lock:
+            summary = self.summary(); label = f'kind="{self.kind}"'
+            metrics = [('files', 'Files processed by the current or last job, by status', [(f'{label},status="{status}"', n) for status, n in sorted(summary['statuses'].items())]),
+                       ('errors', 'Files that failed (status failed_*)', [(label, summary['errors'])]),
+                       ('bytes_in', 'Input bytes of processed files', [(label, summary['bytes_in'])]),
+                       ('bytes_out', 'Output bytes written', [(label, summary['bytes_out'])]),
+                       ('elapsed_seconds', 'Wall-clock time since the job started', [(label, summary['elapsed_seconds'])]),
+                       ('files_per_second', 'Files processed per second of wall-clock time', [(label, summary['files_per_second'])]),
+                       ('bytes_per_second', 'Input bytes processed per second of wall-clock time', [(label, summary['bytes_per_second'])]),
+                       ('running', '1 while the job is running, 0 once it has finished', [(label, 0 if self.finished else 1)]),
+                       ('start_time_seconds', 'Unix time the job started', [(label, summary['started'])]),
+                       ('last_update_time_seconds', 'Unix time of this snapshot', [(label, round(time.time(), 3))])]
+            lines = []
+            for name, help_text, samples in metrics:
+                lines += [f"# HELP {METRICS_PREFIX}_{name} {help_text}", f"# TYPE {METRICS_PREFIX}_{name} gauge"] + [f"{METRICS_PREFIX}_{name}{{{labels}}} {value}" for labels, value in samples]
+            temp_path = self.metrics_path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f: f.write("\n".join(lines) + "\n")
+            os.replace(temp_path, self.metrics_path)
+
+    def close(self):
+        """ 報告最後附上一筆 summary 紀錄，並寫出最終的統計快照；回傳 summary """
+        self.finished = True; summary = self.summary()
+        with self._lock:
+            if self._file: self._file.write(json.dumps(summary, ensure_ascii=False) + "\n"); self._file.close(); self._file = None
+        self.write_metrics(); return summary
+
+
+def open_job_report(kind, folder):
+    """ 圖形介面使用：在 folder 中建立 <kind>_<時間>.jsonl 報告並更新同一份統計快照；folder 為空時不產生報告 """
+    if not folder or not os.path.isdir(folder): return None
+    return JobReport(kind, os.path.join(folder, f"{kind}_{time.strftime('%Y%m%d_%H%M%S')}.jsonl"), os.path.join(folder, METRICS_FILE_NAME))
@@ -31,8 +31,38 @@ LANGUAGES = {
         # --- Tab 1: TXT 檔案轉換 ---
         "s2t_radio": "簡體→繁體",
         "t2s_radio": "繁體→簡體",
+        "opencc_config_label": "轉換設定：",
+        "convert_with_config": "以此設定轉換",
         "enable_custom_toggle": "啟用自訂詞彙",
         "manual_encoding_toggle": "手動指定編碼",
+        "line_cache_toggle": "逐行快取 (適合重複內容)",
+        "output_compression_label": "輸出壓縮：",
+        "line_cache_stats": "逐行快取：{total} 行中有 {hits} 行直接沿用結果 ({rate})",
+        "dedup_toggle": "相同內容只轉換一次",
+        "dedup_stats": "內容相同的檔案：{duplicates} 個 (共 {groups} 組) 沿用轉換結果，略過 {size}",
+        "filter_search": "搜尋：",
+        "filter_status": "狀態：",
+        "filter_checked": "勾選：",
+        "filter_ext": "副檔名：",
+        "filter_folder": "資料夾：",
+        "filter_sort": "排序：",
+        "filter_descending": "反向",
+        "filter_clear": "清除篩選",
+        "filter_any": "全部",
+        "filter_no_ext": "(無副檔名)",
+        "filter_shown": "顯示 {shown} 個",
+        "status_none": "未處理",
+        "status_converted": "已轉換",
+        "status_failed": "失敗",
+        "status_skipped": "已略過",
+        "status_non_chinese": "非中文",
+        "checked_only": "已勾選",
+        "unchecked_only": "未勾選",
+        "sort_order": "加入順序",
+        "sort_name": "檔名",
+        "sort_folder": "資料夾",
+        "sort_ext": "副檔名",
+        "sort_status": "狀態",
         "output_folder_label": "輸出資料夾:",
         "custom_filename_toggle": "自訂輸出檔名",
         "convert_checked_button": "轉換勾選檔案",
@@ -56,6 +86,7 @@ LANGUAGES = {
         "rename_checked_button": "重命名勾選檔案",
         "rename_all_button": "重命名所有檔案",
         "enable_filename_lang_detect": "啟用檔名語言偵測 (跳過非中文)",
+        "convert_archive_entries": "轉換壓縮檔內的項目名稱",
 
         # --- Tab 3: 剪貼簿轉換 ---
         "input_content_label": "輸入內容",
@@ -63,6 +94,7 @@ LANGUAGES = {
         "paste_button": "貼上",
         "copy_result_button": "複製結果",
         "clear_button": "清除",
+        "live_convert_toggle": "即時轉換",
 
         # --- 訊息框、進度條、說明 ---
         "info": "提示",
@@ -72,6 +104,7 @@ LANGUAGES = {
         "processing_label": "正在處理",
         "processing_label_short": "載入中，請稍候...",
         "confirm_cancel_task": "確定要取消目前的任務嗎？",
+        "resume_jobs_confirm": "上次有 {count} 個轉換工作尚未完成 (剩餘 {remaining} 個檔案)，是否繼續？",
         "all_files_in_list": "所有選擇的檔案均已在列表中。",
         "confirm_clear_list": "確定要清空所有已選檔案嗎？",
         "no_files_to_remove": "請先勾選要從列表中移除的檔案。",
@@ -110,6 +143,15 @@ LANGUAGES = {
         "vocab_delete_success": "已刪除所有勾選的詞彙。",
         "load_vocab_error": "載入特殊詞彙檔時發生錯誤",
         "save_vocab_error": "儲存特殊詞彙時發生錯誤",
+        "vocab_import": "匯入詞彙",
+        "vocab_export": "匯出詞彙",
+        "vocab_count": "顯示 {shown} / {total}",
+        "vocab_import_error": "讀取詞彙檔時發生錯誤",
+        "vocab_import_summary": "新詞彙：{additions}\n與現有詞彙衝突：{conflicts}\n與現有詞彙相同：{unchanged}\n檔案中重複的行：{duplicates} (目標詞不同：{file_conflicts})\n無法解析的行：{invalid_lines}",
+        "vocab_import_file_conflicts": "檔案中同一原詞有不同目標詞 (以最後一行為準)：",
+        "vocab_import_conflicts": "與現有詞彙衝突 (現有 -> 匯入)：",
+        "vocab_import_overwrite": "是否以匯入的目標詞覆蓋衝突的詞彙？\n「是」覆蓋，「否」保留現有詞彙只加入新詞，「取消」不匯入。",
+        "vocab_export_done": "已匯出 {count} 個詞彙到 {path}",
         "conversion_error": "轉換時發生錯誤",
         "original_word": "原詞",
         "target_word": "目標詞",
@@ -119,6 +161,15 @@ LANGUAGES = {
         "settings_title": "語言設定",
         "settings_apply": "套用",
         "settings_language_label": "請選擇介面語言：",
+        "settings_remember_file_lists": "記住檔案列表 (以 SQLite 保存，下次啟動時還原)",
+        "file_list_db_error": "無法開啟檔案列表資料庫 (file_lists.db)，本次改用不保存的檔案列表",
+        "settings_profile_jobs": "工作結束後儲存效能統計 (JSON，含 cProfile)",
+        "settings_report_folder": "工作報告資料夾：",
+        "settings_report_folder_tooltip": "每個工作在此資料夾寫出逐檔結果 (JSONL) 並更新 chinese_converter.prom 統計快照；留空則不產生",
+        "settings_content_workers": "同時轉換的檔案數：",
+        "settings_memory_budget": "處理中檔案的記憶體上限 (MB)：",
+        "settings_latency_target": "預覽與剪貼簿的目標回應時間 (毫秒)：",
+        "save_stats_title": "儲存效能統計",
         
         # --- 說明視窗 ---
         "help_title": "使用說明",
@@ -167,8 +218,38 @@ Completed on 2025/7/17
         # --- Tab 1: TXT 文件转换 ---
         "s2t_radio": "简体→繁体",
         "t2s_radio": "繁体→简体",
+        "opencc_config_label": "转换设置：",
+        "convert_with_config": "以此设置转换",
         "enable_custom_toggle": "启用自定义词汇",
         "manual_encoding_toggle": "手动指定编码",
+        "line_cache_toggle": "逐行缓存 (适合重复内容)",
+        "output_compression_label": "输出压缩：",
+        "line_cache_stats": "逐行缓存：{total} 行中有 {hits} 行直接沿用结果 ({rate})",
+        "dedup_toggle": "相同内容只转换一次",
+        "dedup_stats": "内容相同的文件：{duplicates} 个 (共 {groups} 组) 沿用转换结果，略过 {size}",
+        "filter_search": "搜索：",
+        "filter_status": "状态：",
+        "filter_checked": "勾选：",
+        "filter_ext": "扩展名：",
+        "filter_folder": "文件夹：",
+        "filter_sort": "排序：",
+        "filter_descending": "反向",
+        "filter_clear": "清除筛选",
+        "filter_any": "全部",
+        "filter_no_ext": "(无扩展名)",
+        "filter_shown": "显示 {shown} 个",
+        "status_none": "未处理",
+        "status_converted": "已转换",
+        "status_failed": "失败",
+        "status_skipped": "已跳过",
+        "status_non_chinese": "非中文",
+        "checked_only": "已勾选",
+        "unchecked_only": "未勾选",
+        "sort_order": "加入顺序",
+        "sort_name": "文件名",
+        "sort_folder": "文件夹",
+        "sort_ext": "扩展名",
+        "sort_status": "状态",
         "output_folder_label": "输出文件夹:",
         "custom_filename_toggle": "自定义输出文件名",
         "convert_checked_button": "转换勾选文件",
@@ -192,6 +273,7 @@ Completed on 2025/7/17
         "rename_checked_button": "重命名勾选文件",
         "rename_all_button": "重命名所有文件",
         "enable_filename_lang_detect": "启用文件名语言检测 (跳过非中文)",
+        "convert_archive_entries": "转换压缩档内的项目名称",
 
         # --- Tab 3: 剪贴簿转换 ---
         "input_content_label": "输入内容",
@@ -199,6 +281,7 @@ Completed on 2025/7/17
         "paste_button": "粘贴",
         "copy_result_button": "复制结果",
         "clear_button": "清除",
+        "live_convert_toggle": "实时转换",
 
         # --- 消息框、进度条、说明 ---
         "info": "提示",
@@ -208,6 +291,7 @@ Completed on 2025/7/17
         "processing_label": "正在处理",
         "processing_label_short": "加载中，请稍候...",
         "confirm_cancel_task": "确定要取消目前的任务吗？",
+        "resume_jobs_confirm": "上次有 {count} 个转换任务尚未完成 (剩余 {remaining} 个文件)，是否继续？",
         "all_files_in_list": "所有选择的文件均已在列表中。",
         "confirm_clear_list": "确定要清空所有已选文件吗？",
         "no_files_to_remove": "请先勾选要从列表中移除的文件。",
@@ -246,6 +330,15 @@ Completed on 2025/7/17
         "vocab_delete_success": "已删除所有勾选的词汇。",
         "load_vocab_error": "加载特殊词汇文件时发生错误",
         "save_vocab_error": "保存特殊词汇时发生错误",
+        "vocab_import": "导入词汇",
+        "vocab_export": "导出词汇",
+        "vocab_count": "显示 {shown} / {total}",
+        "vocab_import_error": "读取词汇文件时发生错误",
+        "vocab_import_summary": "新词汇：{additions}\n与现有词汇冲突：{conflicts}\n与现有词汇相同：{unchanged}\n文件中重复的行：{duplicates} (目标词不同：{file_conflicts})\n无法解析的行：{invalid_lines}",
+        "vocab_import_file_conflicts": "文件中同一原词有不同目标词 (以最后一行为准)：",
+        "vocab_import_conflicts": "与现有词汇冲突 (现有 -> 导入)：",
+        "vocab_import_overwrite": "是否以导入的目标词覆盖冲突的词汇？\n「是」覆盖，「否」保留现有词汇只加入新词，「取消」不导入。",
+        "vocab_export_done": "已导出 {count} 个词汇到 {path}",
         "conversion_error": "转换时发生错误",
         "original_word": "原词",
         "target_word": "目标词",
@@ -255,6 +348,15 @@ Completed on 2025/7/17
         "settings_title": "语言设置",
         "settings_apply": "应用",
         "settings_language_label": "请选择界面语言：",
+        "settings_remember_file_lists": "记住文件列表 (以 SQLite 保存，下次启动时还原)",
+        "file_list_db_error": "无法打开文件列表数据库 (file_lists.db)，本次改用不保存的文件列表",
+        "settings_profile_jobs": "工作结束后保存性能统计 (JSON，含 cProfile)",
+        "settings_report_folder": "工作报告文件夹：",
+        "settings_report_folder_tooltip": "每个工作在此文件夹写出逐文件结果 (JSONL) 并更新 chinese_converter.prom 统计快照；留空则不生成",
+        "settings_content_workers": "同时转换的文件数：",
+        "settings_memory_budget": "处理中文件的内存上限 (MB)：",
+        "settings_latency_target": "预览与剪贴板的目标响应时间 (毫秒)：",
+        "save_stats_title": "保存性能统计",
         
         # --- 说明窗口 ---
         "help_title": "使用说明",
@@ -303,8 +405,38 @@ Completed on 2025/7/17
         # --- Tab 1: TXT File Conversion ---
         "s2t_radio": "Simplified → Traditional",
         "t2s_radio": "Traditional → Simplified",
+        "opencc_config_label": "Config:",
+        "convert_with_config": "Convert with config",
         "enable_custom_toggle": "Enable Custom Vocabulary",
         "manual_encoding_toggle": "Manually Specify Encoding",
+        "line_cache_toggle": "Line cache (for repetitive text)",
+        "output_compression_label": "Compress output:",
+        "line_cache_stats": "Line cache: {hits} of {total} lines reused ({rate})",
+        "dedup_toggle": "Convert identical files once",
+        "dedup_stats": "Identical files: {duplicates} in {groups} groups reused a conversion, skipping {size}",
+        "filter_search": "Search:",
+        "filter_status": "Status:",
+        "filter_checked": "Checked:",
+        "filter_ext": "Extension:",
+        "filter_folder": "Folder:",
+        "filter_sort": "Sort:",
+        "filter_descending": "Descending",
+        "filter_clear": "Clear filters",
+        "filter_any": "All",
+        "filter_no_ext": "(none)",
+        "filter_shown": "{shown} shown",
+        "status_none": "Not processed",
+        "status_converted": "Converted",
+        "status_failed": "Failed",
+        "status_skipped": "Skipped",
+        "status_non_chinese": "Not Chinese",
+        "checked_only": "Checked",
+        "unchecked_only": "Unchecked",
+        "sort_order": "Added order",
+        "sort_name": "Name",
+        "sort_folder": "Folder",
+        "sort_ext": "Extension",
+        "sort_status": "Status",
         "output_folder_label": "Output Folder:",
         "custom_filename_toggle": "Custom Output Filename",
         "convert_checked_button": "Convert Checked Files",
@@ -328,6 +460,7 @@ Completed on 2025/7/17
         "rename_checked_button": "Rename Checked Files",
         "rename_all_button": "Rename All Files",
         "enable_filename_lang_detect": "Enable Filename Language Detection (Skip Non-Chinese)",
+        "convert_archive_entries": "Convert names inside archives",
 
         # --- Tab 3: Clipboard Conversion ---
         "input_content_label": "Input Content",
@@ -335,6 +468,7 @@ Completed on 2025/7/17
         "paste_button": "Paste",
         "copy_result_button": "Copy Result",
         "clear_button": "Clear",
+        "live_convert_toggle": "Live Convert",
 
         # --- Message Boxes, Progress Bar, Help ---
         "info": "Info",
@@ -344,6 +478,7 @@ Completed on 2025/7/17
         "processing_label": "Processing",
         "processing_label_short": "Loading, please wait...",
         "confirm_cancel_task": "Are you sure you want to cancel the current task?",
+        "resume_jobs_confirm": "{count} conversion job(s) from a previous session did not finish ({remaining} files left). Resume them?",
         "all_files_in_list": "All selected files are already in the list.",
         "confirm_clear_list": "Are you sure you want to clear all selected files?",
         "no_files_to_remove": "Please check files to remove from the list first.",
@@ -382,6 +517,15 @@ Completed on 2025/7/17
         "vocab_delete_success": "All checked vocabulary deleted.",
         "load_vocab_error": "Error loading custom vocabulary file",
         "save_vocab_error": "Error saving custom vocabulary",
+        "vocab_import": "Import",
+        "vocab_export": "Export",
+        "vocab_count": "Showing {shown} / {total}",
+        "vocab_import_error": "Error reading vocabulary file",
+        "vocab_import_summary": "New entries: {additions}\nConflicting with existing entries: {conflicts}\nSame as existing entries: {unchanged}\nDuplicate lines in file: {duplicates} (different targets: {file_conflicts})\nUnreadable lines: {invalid_lines}",
+        "vocab_import_file_conflicts": "Same original word with different targets in the file (last line wins):",
+        "vocab_import_conflicts": "Conflicts with existing entries (existing -> imported):",
+        "vocab_import_overwrite": "Overwrite conflicting entries with the imported targets?\nYes: overwrite. No: keep existing entries and add only new ones. Cancel: do not import.",
+        "vocab_export_done": "Exported {count} entries to {path}",
         "conversion_error": "Error during conversion",
         "original_word": "Original Word",
         "target_word": "Target Word",
@@ -391,6 +535,15 @@ Completed on 2025/7/17
         "settings_title": "Language Settings",
         "settings_apply": "Apply",
         "settings_language_label": "Please select interface language:",
+        "settings_remember_file_lists": "Remember file lists (stored in SQLite, restored at next start)",
+        "file_list_db_error": "Could not open the file list database (file_lists.db); using an unsaved file list for this session",
+        "settings_profile_jobs": "Save performance stats after each job (JSON, with cProfile)",
+        "settings_report_folder": "Job report folder:",
+        "settings_report_folder_tooltip": "Each job writes a per-file JSONL report here and updates the chinese_converter.prom metrics snapshot; leave empty to disable",
+        "settings_content_workers": "Files converted in parallel:",
+        "settings_memory_budget": "Memory budget for files in flight (MB):",
+        "settings_latency_target": "Target response time for previews and clipboard (ms):",
+        "save_stats_title": "Save performance stats",
         
         # --- Help Window ---
         "help_title": "Help",
@@ -439,8 +592,38 @@ Completed on 2025/7/17
         # --- タブ1: TXTファイル変換 ---
         "s2t_radio": "簡体字→繁体字",
         "t2s_radio": "繁体字→簡体字",
+        "opencc_config_label": "変換設定：",
+        "convert_with_config": "この設定で変換",
         "enable_custom_toggle": "カスタム語彙を有効にする",
         "manual_encoding_toggle": "手動でエンコーディング指定",
+        "line_cache_toggle": "行キャッシュ (繰り返しの多い文書向け)",
+        "output_compression_label": "出力の圧縮：",
+        "line_cache_stats": "行キャッシュ：{total} 行中 {hits} 行を再利用 ({rate})",
+        "dedup_toggle": "同一内容は一度だけ変換",
+        "dedup_stats": "同一内容のファイル：{groups} グループの {duplicates} 件で変換結果を再利用 ({size} を省略)",
+        "filter_search": "検索：",
+        "filter_status": "状態：",
+        "filter_checked": "チェック：",
+        "filter_ext": "拡張子：",
+        "filter_folder": "フォルダ：",
+        "filter_sort": "並べ替え：",
+        "filter_descending": "降順",
+        "filter_clear": "絞り込み解除",
+        "filter_any": "すべて",
+        "filter_no_ext": "(拡張子なし)",
+        "filter_shown": "{shown} 件を表示",
+        "status_none": "未処理",
+        "status_converted": "変換済み",
+        "status_failed": "失敗",
+        "status_skipped": "スキップ",
+        "status_non_chinese": "中国語以外",
+        "checked_only": "チェックあり",
+        "unchecked_only": "チェックなし",
+        "sort_order": "追加順",
+        "sort_name": "ファイル名",
+        "sort_folder": "フォルダ",
+        "sort_ext": "拡張子",
+        "sort_status": "状態",
         "output_folder_label": "出力フォルダ:",
         "custom_filename_toggle": "カスタム出力ファイル名",
         "convert_checked_button": "チェック項目を変換",
@@ -464,6 +647,7 @@ Completed on 2025/7/17
         "rename_checked_button": "チェック項目をリネーム",
         "rename_all_button": "すべてリネーム",
         "enable_filename_lang_detect": "ファイル名言語検出を有効にする (非中国語をスキップ)",
+        "convert_archive_entries": "アーカイブ内の項目名も変換",
 
         # --- タブ3: クリップボード変換 ---
         "input_content_label": "入力内容",
@@ -471,6 +655,7 @@ Completed on 2025/7/17
         "paste_button": "貼り付け",
         "copy_result_button": "結果をコピー",
         "clear_button": "クリア",
+        "live_convert_toggle": "リアルタイム変換",
 
         # --- メッセージボックス、プログレスバー、ヘルプ ---
         "info": "情報",
@@ -480,6 +665,7 @@ Completed on 2025/7/17
         "processing_label": "処理中",
         "processing_label_short": "読み込み中、お待ちください...",
         "confirm_cancel_task": "現在のタスクをキャンセルしてもよろしいですか？",
+        "resume_jobs_confirm": "前回の変換ジョブ {count} 件が未完了です (残り {remaining} ファイル)。再開しますか？",
         "all_files_in_list": "選択したすべてのファイルは既にリストにあります。",
         "confirm_clear_list": "リストからすべてのファイルをクリアしてもよろしいですか？",
         "no_files_to_remove": "まずリストから削除するファイルにチェックを入れてください。",
@@ -518,6 +704,15 @@ Completed on 2025/7/17
         "vocab_delete_success": "チェックしたすべての語彙が削除されました。",
         "load_vocab_error": "カスタム語彙ファイルの読み込み中にエラーが発生しました",
         "save_vocab_error": "カスタム語彙の保存中にエラーが発生しました",
+        "vocab_import": "インポート",
+        "vocab_export": "エクスポート",
+        "vocab_count": "{shown} / {total} 件を表示",
+        "vocab_import_error": "語彙ファイルの読み込み中にエラーが発生しました",
+        "vocab_import_summary": "新しい語彙：{additions}\n既存の語彙と競合：{conflicts}\n既存の語彙と同じ：{unchanged}\nファイル内の重複行：{duplicates} (変換先が異なる：{file_conflicts})\n解析できない行：{invalid_lines}",
+        "vocab_import_file_conflicts": "ファイル内で同じ原語に異なる変換先があります (最後の行を採用)：",
+        "vocab_import_conflicts": "既存の語彙との競合 (既存 -> インポート)：",
+        "vocab_import_overwrite": "競合する語彙をインポートした変換先で上書きしますか？\n「はい」で上書き、「いいえ」で既存の語彙を残して新しい語彙のみ追加、「キャンセル」でインポートしません。",
+        "vocab_export_done": "{count} 件の語彙を {path} にエクスポートしました",
         "conversion_error": "変換エラー",
         "original_word": "元の単語",
         "target_word": "ターゲット単語",
@@ -527,6 +722,15 @@ Completed on 2025/7/17
         "settings_title": "言語設定",
         "settings_apply": "適用",
         "settings_language_label": "インターフェース言語を選択してください：",
+        "settings_remember_file_lists": "ファイルリストを記憶する (SQLite に保存し、次回起動時に復元)",
+        "file_list_db_error": "ファイルリストのデータベース (file_lists.db) を開けません。今回は保存しないファイルリストを使用します",
+        "settings_profile_jobs": "ジョブ終了後にパフォーマンス統計を保存 (JSON、cProfile 付き)",
+        "settings_report_folder": "ジョブレポートのフォルダ：",
+        "settings_report_folder_tooltip": "各ジョブがこのフォルダにファイルごとの結果 (JSONL) を書き出し、chinese_converter.prom の統計スナップショットを更新します。空欄の場合は作成しません",
+        "settings_content_workers": "同時に変換するファイル数：",
+        "settings_memory_budget": "処理中ファイルのメモリ上限 (MB)：",
+        "settings_latency_target": "プレビューとクリップボードの目標応答時間 (ミリ秒)：",
+        "save_stats_title": "パフォーマンス統計を保存",
         
         # --- ヘルプウィンドウ ---
         "help_title": "ヘルプ",
@@ -0,0 +1,137 @@
+#
+# 檔案名稱: script_scanner.py
+#
+# 單次掃描文字的字元類別：找出需要交給 OpenCC 的漢字片段，並統計漢字與假名數量供語言判斷使用；大量檔名則以查表一次分類
+import re
+import threading
+from array import array
+from collections import namedtuple
+from itertools import accumulate
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# 漢字 (含擴充區、相容漢字、部首與 〇)
+HAN_CLASS = '\u2e80-\u2fdf\u3007\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\U00020000-\U0003ffff'
+KANA_CLASS = '\u3040-\u30ff\u31f0-\u31ff\uff66-\uff9f'
+# 不會被轉換、也不會出現在詞典詞組中的字元：空白、ASCII 標點、假名、諺文、CJK 與一般標點
+# 其餘字元 (英數字、全形字等) 可能與漢字組成詞組 (例如「SQL注入」、「U盤」)，與相鄰漢字一起送出
+INERT_CLASS = ('\\s!-/:-@\\[-`{-~\u2000-\u206f\u3000-\u3006\u3008-\u303f' + KANA_CLASS + '\u1100-\u11ff\u3130-\u318f\uac00-\ud7af')
+SCRIPT_RUN_RE = re.compile(f'(?P<han>[{HAN_CLASS}]+)|(?P<kana>[{KANA_CLASS}]+)|(?P<inert>[{INERT_CLASS}]+)|(?P<other>[^{HAN_CLASS}{INERT_CLASS}]+)')
+HAN_RE = re.compile(f'[{HAN_CLASS}]')
+# 合併後的片段佔全文比例超過此值時，直接整份轉換比切片重組更快
+SPAN_COVERAGE_WHOLE_TEXT = 0.5
+KANA_JAPANESE_RATIO = 0.2 # 假名佔 (漢字 + 假名) 的比例達此值即視為日文
+NAME_CACHE_SIZE = 500000
+
+# 檔名分類用的 碼位 -> 文字類別 對照表，範圍與上面的字元類別一致
+SCRIPT_OTHER, SCRIPT_HAN, SCRIPT_KANA, SCRIPT_HANGUL, SCRIPT_LATIN = range(5)
+COUNTED_SCRIPTS = (SCRIPT_HAN, SCRIPT_KANA, SCRIPT_HANGUL, SCRIPT_LATIN)
+SCRIPT_RANGES = {
+    SCRIPT_HAN: ((0x2e80, 0x2fdf), (0x3007, 0x3007), (0x3400, 0x4dbf), (0x4e00, 0x9fff), (0xf900, 0xfaff), (0x20000, 0x3ffff)),
+    SCRIPT_KANA: ((0x3040, 0x30ff), (0x31f0, 0x31ff), (0xff66, 0xff9f)),
+    SCRIPT_HANGUL: ((0x1100, 0x11ff), (0x3130, 0x318f), (0xac00, 0xd7af)),
+    SCRIPT_LATIN: ((0x41, 0x5a), (0x61, 0x7a), (0xc0, 0x24f), (0xff21, 0xff3a), (0xff41, 0xff5a)),
+}
+
+ScanResult = namedtuple('ScanResult', ['spans', 'han_count', 'kana_count', 'length'])
+
+
+def scan_text(text):
+    """ 回傳 ScanResult：spans 為需要轉換的 (起點, 終點) 清單，片段之間的字元保證不會被 OpenCC 改變 """
+    if text.isascii(): return ScanResult([], 0, 0, len(text))
+    spans, han_count, kana_count = [], 0, 0
+    span_start = span_end = None; span_has_han = False
+    for match in SCRIPT_RUN_RE.finditer(text):
+        kind, start, end = match.lastgroup, match.start(), match.end()
+        if kind == 'han' or kind == 'other':
+            if kind == 'han': han_count += end - start; span_has_han = True
+            if span_start is None: span_start = start
+            span_end = end; continue
+        if kind == 'kana': kana_count += end - start
+        if span_has_han: spans.append((span_start, span_end))
+        span_start = None; span_has_han = False
+    if span_has_han: spans.append((span_start, span_end))
+    return ScanResult(spans, han_count, kana_count, len(text))
+
+
+def convert_han_spans(text, cc_instance, scan=None):
+    """ 只把含漢字的片段交給 OpenCC (合併為一次呼叫)；沒有可轉換字元時直接回傳原字串物件 """
+    scan = scan or scan_text(text)
+    if not scan.spans: return text
+    covered = sum(end - start for start, end in scan.spans)
+    if covered >= scan.length * SPAN_COVERAGE_WHOLE_TEXT: return cc_instance.convert(text)
+    segments = [text[start:end] for start, end in scan.spans]
+    converted = cc_instance.convert('\n'.join(segments)).split('\n')
+    if len(converted) != len(segments): converted = [cc_instance.convert(segment) for segment in segments]
+    pieces, position = [], 0
+    for (start, end), segment in zip(scan.spans, converted):
+        pieces.append(text[position:start]); pieces.append(segment); position = end
+    pieces.append(text[position:])
+    return ''.join(pieces)
+
+
+def _build_script_table():
+    table = bytearray(0x110000)
+    for script, ranges in SCRIPT_RANGES.items():
+        for low, high in ranges: table[low:high + 1] = bytes([script]) * (high - low + 1)
+    return bytes(table)
+
+SCRIPT_TABLE = _build_script_table()
+_NUMPY_SCRIPT_TABLE = np.frombuffer(SCRIPT_TABLE, dtype=np.uint8) if NUMPY_AVAILABLE else None
+
+
+def count_scripts(names):
+    """ 每個名稱的 (漢字, 假名, 諺文, 拉丁字母) 數量；所有名稱接成一個 UTF-32 碼位陣列後一次查表，
+        有 NumPy 時以累計和相減得到各名稱的數量，否則逐段計數 """
+    names = list(names)
+    if not names: return []
+    codes = array('I', ''.join(names).encode('utf-32-le', 'surrogatepass')); ends = list(accumulate(map(len, names)))
+    if NUMPY_AVAILABLE:
+        classes = _NUMPY_SCRIPT_TABLE[np.frombuffer(codes, dtype=np.uint32)]
+        ends = np.array(ends); starts = ends - np.array([len(name) for name in names]); columns = []
+        for script in COUNTED_SCRIPTS:
+            totals = np.concatenate(([0], np.cumsum(classes == script)))
+            columns.append((totals[ends] - totals[starts]).tolist())
+        return list(zip(*columns))
+    classes = bytes(map(SCRIPT_TABLE.__getitem__, codes)); counts, start = [], 0
+    for end in ends:
+        piece = classes[start:end]; start = end
+        counts.append(tuple(piece.count(script) for script in COUNTED_SCRIPTS))
+    return counts
+
+def script_verdict(han, kana, hangul, latin):
+    """ none (沒有漢字) / japanese / korean / chinese；只看字元組成，不用 langdetect (對短字串不可靠) """
+    if not han: return 'none'
+    if kana >= (han + kana) * KANA_JAPANESE_RATIO: return 'japanese'
+    if hangul >= han: return 'korean'
+    return 'chinese'
+
+
+class NameClassifier:
+    """ 檔名的分類結果快取；未快取的名稱合併成一批查表，快取滿了就整個清空重來 """
+    def __init__(self, cache_size=NAME_CACHE_SIZE):
+        self.cache_size = cache_size; self.cache = {}; self._lock = threading.Lock()
+
+    def classify_many(self, names):
+        names = list(names); found = {}
+        with self._lock:
+            for name in dict.fromkeys(names):
+                if (verdict := self.cache.get(name)) is not None: found[name] = verdict
+        if missing := [name for name in dict.fromkeys(names) if name not in found]:
+            fresh = {name: script_verdict(*counts) for name, counts in zip(missing, count_scripts(missing))}
+            with self._lock:
+                if len(self.cache) + len(fresh) > self.cache_size: self.cache.clear()
+                self.cache.update(fresh)
+            found.update(fresh)
+        return [found[name] for name in names]
+
+    def chinese_names(self, names): return [verdict == 'chinese' for verdict in self.classify_many(names)]
+
+    def is_chinese(self, name): return self.classify_many([name])[0] == 'chinese'
+
+
+name_classifier = NameClassifier()
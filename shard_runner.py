@@ -0,0 +1,131 @@
+#
+# 檔案名稱: shard_runner.py
+#
+# 分片執行：依路徑雜湊把一個轉換工作固定地分成 N 份，每份有自己的清單 (manifest)，可在不同機器上獨立執行並寫出逐檔結果 (JSONL)，最後合併成一份報告並檢查輸出檔名衝突
+import hashlib
+import json
+import os
+import time
+from collections import Counter
+
+from converter_core import get_converter, get_batch_converter, plan_filename_conversion
+from compressed_io import is_text_input
+from archive_converter import is_archive, content_path_output_name, convert_content_path, convert_filename_path
+from job_journal import persistable_content_params, restore_content_params
+from job_report import output_size
+
+SHARD_MANIFEST_VERSION = 1
+SHARD_KINDS = ('content', 'filenames')
+FILENAME_JOB_PARAMS = ('conversion_type', 'output_folder', 'operation_type', 'detect_language', 'convert_archive_entries')
+
+
+def shard_of(relative_path, shard_count):
+    """ 以路徑 (相對於根目錄、以 / 分隔) 的雜湊決定分片；不使用 hash()，確保各機器與每次執行結果相同 """
+    return int.from_bytes(hashlib.blake2b(relative_path.encode('utf-8'), digest_size=8).digest(), 'big') % shard_count
+
+def collect_inputs(paths, kind):
+    """ 展開資料夾；內容轉換只收 txt 與壓縮檔，檔名轉換收所有檔案 """
+    wanted = (lambda name: is_text_input(name) or is_archive(name)) if kind == 'content' else (lambda name: True)
+    files = []
+    for path in paths:
+        if os.path.isdir(path): files.extend(os.path.join(r, f) for r, _, fs in sorted(os.walk(path)) for f in sorted(fs) if wanted(f))
+        else: files.append(path)
+    return [os.path.abspath(f) for f in files]
+
+def manifest_path(manifest_dir, shard, shard_count): return os.path.join(manifest_dir, f"shard_{shard:03d}_of_{shard_count:03d}.json")
+def default_log_path(manifest_file): return os.path.splitext(manifest_file)[0] + ".results.jsonl"
+
+
+def planned_output_name(path, kind, params, index, cc_names=None):
+    """ 不考慮輸出資料夾已有檔案時的輸出檔名；實際檔名可能另加編號，合併時以此判斷衝突 """
+    if kind == 'filenames': return plan_filename_conversion(os.path.basename(path), cc_names)[1]
+    return "".join(content_path_output_name(path, params, index))
+
+
+def plan_shards(paths, shard_count, kind, params, manifest_dir):
+    """ 建立 shard_count 份清單並回傳其路徑；檔案序號為整個工作中的序號，命名規則的 {index} 因此與分片無關 """
+    files = collect_inputs(paths, kind)
+    root = os.path.commonpath([os.path.dirname(f) for f in files]) if files else os.path.abspath(".")
+    shards = [[] for _ in range(shard_count)]
+    for seq, path in enumerate(files, 1):
+        relative = os.path.relpath(path, root).replace(os.sep, '/'); shards[shard_of(relative, shard_count)].append([seq, relative])
+    saved = persistable_content_params(params) if kind == 'content' else {key: params[key] for key in FILENAME_JOB_PARAMS}
+    os.makedirs(manifest_dir, exist_ok=True); written = []
+    for shard, entries in enumerate(shards):
+        manifest = {'version': SHARD_MANIFEST_VERSION, 'kind': kind, 'shard': shard, 'shard_count': shard_count, 'root': root, 'params': saved, 'files': entries}
+        with open(path := manifest_path(manifest_dir, shard, shard_count), 'w', encoding='utf-8') as f: json.dump(manifest, f, ensure_ascii=False, indent=1)
+        written.append(path)
+    return written
+
+def load_manifest(path):
+    with open(path, 'r', encoding='utf-8') as f: manifest = json.load(f)
+    if manifest.get('version') != SHARD_MANIFEST_VERSION or manifest.get('kind') not in SHARD_KINDS: raise ValueError(f"Unsupported shard manifest: {path}")
+    return manifest
+
+def read_result_log(log_path):
+    """ {序號: 紀錄}；同一檔案有多筆時以最後一筆為準，寫到一半的最後一行略過 """
+    records = {}
+    if not os.path.exists(log_path): return records
+    with open(log_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try: record = json.loads(line)
+            except json.JSONDecodeError: continue
+            records[record['seq']] = record
+    return records
+
+
+def run_shard(manifest_file, log_path=None, root=None, output_folder=None, should_stop=None, on_result=None, report=None):
+    """ 執行一份清單，逐檔附加到結果記錄；已記錄的檔案略過，中斷後重跑即可繼續。root / output_folder 可改成本機的掛載位置
+        report (JobReport) 另外記錄本次處理的檔案的編碼、位元組數與耗時 """
+    manifest = load_manifest(manifest_file); log_path = log_path or default_log_path(manifest_file)
+    root = root or manifest['root']; params = dict(manifest['params'])
+    if output_folder: params['output_folder'] = output_folder
+    if not os.path.isdir(params['output_folder']): raise ValueError(f"Output folder does not exist: {params['output_folder']}")
+    if manifest['kind'] == 'content':
+        cc_s2t, cc_t2s = get_converter('s2t'), get_converter('t2s'); content_params = restore_content_params(params, cc_s2t, cc_t2s)
+        cc_names = None
+    else: cc_names = get_batch_converter(get_converter(params['conversion_type']))
+    done = read_result_log(log_path); counts = Counter(record['status'] for record in done.values())
+    with open(log_path, 'a', encoding='utf-8') as log:
+        for seq, relative in manifest['files']:
+            if seq in done: continue
+            if should_stop and should_stop(): break
+            path, output, detail, encoding, started = os.path.join(root, *relative.split('/')), None, None, None, time.perf_counter()
+            try:
+                if manifest['kind'] == 'content':
+                    status, info = convert_content_path(path, content_params, seq, cc_s2t, cc_t2s)
+                    if status == 'converted': output, encoding = info['output_path'], info['encoding']
+                    elif isinstance(info, str): detail = info
+                else:
+                    status, output = convert_filename_path(path, cc_names, params['output_folder'], params['operation_type'], params['detect_language'], params.get('convert_archive_entries', False))
+            except Exception as e: status, detail = 'failed_exception', str(e)
+            target = planned_output_name(path, manifest['kind'], content_params if manifest['kind'] == 'content' else params, seq, cc_names) if output else None
+            record = {'seq': seq, 'path': relative, 'shard': manifest['shard'], 'status': status, 'target': target, 'output': os.path.basename(output) if output else None, 'detail': detail}
+            log.write(json.dumps(record, ensure_ascii=False) + "\n"); log.flush(); counts[status] += 1
+            if on_result: on_result(record)
+            if report: report.record(path, status, time.perf_counter() - started, encoding, output_size(path) if manifest['kind'] == 'content' else None,
+                                     output_size(output) if manifest['kind'] == 'content' else None, output, detail)
+    return counts
+
+
+def merge_shard_logs(manifest_files, log_paths=None):
+    """ 合併各分片的結果；results 使用與批次流程相同的狀態代碼。
+        conflicts 為不同輸入檔預定的輸出檔名相同 (不分大小寫) 的情形：同一節點上會被加上編號，不同節點的輸出合併到同一資料夾時則會互相覆蓋；
+        renamed 為輸出資料夾原本就有同名檔案而加上編號的檔案 """
+    manifests = [load_manifest(path) for path in manifest_files]
+    if len({m['shard_count'] for m in manifests}) > 1 or len({m['kind'] for m in manifests}) > 1: raise ValueError("Manifests come from different shard plans")
+    log_paths = log_paths or [default_log_path(path) for path in manifest_files]
+    results, missing, outputs, renamed, seen_shards = {}, [], {}, {}, Counter(m['shard'] for m in manifests)
+    for manifest, log_path in zip(manifests, log_paths):
+        records = read_result_log(log_path)
+        for seq, relative in manifest['files']:
+            if (record := records.get(seq)) is None: missing.append(relative); continue
+            results[relative] = record['status']
+            if record['target']:
+                outputs.setdefault(record['target'].casefold(), []).append((relative, record['target']))
+                if record['output'] != record['target']: renamed[relative] = record['output']
+    conflicts = [{'output': entries[0][1], 'inputs': [relative for relative, _ in entries]} for entries in outputs.values() if len(entries) > 1]
+    shard_count = manifests[0]['shard_count'] if manifests else 0
+    return {'kind': manifests[0]['kind'] if manifests else None, 'shard_count': shard_count, 'shards_merged': sorted(seen_shards),
+            'shards_absent': [shard for shard in range(shard_count) if shard not in seen_shards], 'duplicate_shards': [shard for shard, n in seen_shards.items() if n > 1],
+            'summary': dict(Counter(results.values())), 'results': results, 'missing': missing, 'conflicts': conflicts, 'renamed': renamed}
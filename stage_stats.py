@@ -0,0 +1,129 @@
+#
+# 檔案名稱: stage_stats.py
+#
+# 效能統計：記錄各處理階段 (讀檔、編碼偵測、語言判斷、OpenCC、詞彙取代、寫檔等) 的次數、耗時與分佈，可搭配 cProfile 或取樣分析輸出為 JSON
+import cProfile
+import json
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+# 直方圖的上界 (秒)，大致以 3 倍遞增
+HISTOGRAM_BOUNDS = (0.0001, 0.0003, 0.001, 0.003, 0.01, 0.03, 0.1, 0.3, 1, 3, 10, 30)
+PROFILE_MODES = ('off', 'cprofile', 'sampling')
+SAMPLING_INTERVAL = 0.005
+PROFILE_TOP_FUNCTIONS = 40
+
+
+class StageStats:
+    """ 各階段的 [次數, 總耗時, 最短, 最長, 直方圖]；執行緒安全 """
+    def __init__(self):
+        self._lock = threading.Lock(); self.stages = {}; self.started = time.time()
+
+    def record(self, stage, seconds):
+        bucket = next((i for i, bound in enumerate(HISTOGRAM_BOUNDS) if seconds <= bound), len(HISTOGRAM_BOUNDS))
+        with self._lock:
+            if (entry := self.stages.get(stage)) is None: entry = self.stages[stage] = [0, 0.0, seconds, seconds, [0] * (len(HISTOGRAM_BOUNDS) + 1)]
+            entry[0] += 1; entry[1] += seconds; entry[2] = min(entry[2], seconds); entry[3] = max(entry[3], seconds); entry[4][bucket] += 1
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try: yield
+        finally: self.record(stage, time.perf_counter() - start)
+
+    def timed(self, stage):
+        """ 裝飾器：整個函式計入 stage """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try: return func(*args, **kwargs)
+                finally: self.record(stage, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        with self._lock: self.stages = {}; self.started = time.time()
+
+    def snapshot(self):
+        labels = [f"<={bound}s" for bound in HISTOGRAM_BOUNDS] + [f">{HISTOGRAM_BOUNDS[-1]}s"]
+        with self._lock:
+            return {stage: {'count': count, 'total_seconds': total, 'mean_seconds': total / count, 'min_seconds': low, 'max_seconds': high,
+                            'histogram': {label: n for label, n in zip(labels, buckets) if n}}
+                    for stage, (count, total, low, high, buckets) in sorted(self.stages.items(), key=lambda item: -item[1][1])}
+
+    def summary_lines(self):
+        return [f"{stage:<16} {data['count']:>9} calls {data['total_seconds']:>9.3f} s  mean {data['mean_seconds'] * 1000:.3f} ms  max {data['max_seconds'] * 1000:.1f} ms"
+                for stage, data in self.snapshot().items()]
+
+
+class SamplingProfiler:
+    """ 定期取樣呼叫堆疊 (thread_id 為 None 時取樣所有執行緒)，開銷與呼叫次數無關，適合長時間或多執行緒的工作 """
+    def __init__(self, thread_id=None, interval=SAMPLING_INTERVAL):
+        self.thread_id, self.interval = thread_id, interval
+        self.samples = 0; self.own = Counter(); self.inclusive = Counter(); self._stop = threading.Event(); self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True); self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread: self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (self.thread_id is not None and thread_id != self.thread_id): continue
+                self.samples += 1; seen = set()
+                self.own[_frame_label(frame)] += 1
+                while frame is not None:
+                    if (label := _frame_label(frame)) not in seen: seen.add(label); self.inclusive[label] += 1
+                    frame = frame.f_back
+
+    def report(self, limit=PROFILE_TOP_FUNCTIONS):
+        share = lambda n: round(n / self.samples, 4) if self.samples else 0
+        return {'mode': 'sampling', 'interval_seconds': self.interval, 'samples': self.samples,
+                'functions': [{'function': label, 'own_share': share(self.own[label]), 'inclusive_share': share(count)} for label, count in self.inclusive.most_common(limit)]}
+
+def _frame_label(frame): return f"{frame.f_code.co_filename}:{frame.f_code.co_firstlineno}({frame.f_code.co_name})"
+
+
+class JobProfiler:
+    """ 以 with 包住一個工作；mode 為 off / cprofile / sampling，cProfile 只分析目前的執行緒，取樣則涵蓋所有執行緒 """
+    def __init__(self, mode='off'):
+        self.mode = mode if mode in PROFILE_MODES else 'off'; self._profiler = None
+
+    def __enter__(self):
+        if self.mode == 'cprofile': self._profiler = cProfile.Profile(); self._profiler.enable()
+        elif self.mode == 'sampling': self._profiler = SamplingProfiler(); self._profiler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.mode == 'cprofile': self._profiler.disable()
+        elif self.mode == 'sampling': self._profiler.stop()
+        return False
+
+    def report(self, limit=PROFILE_TOP_FUNCTIONS):
+        if self.mode == 'sampling': return self._profiler.report(limit)
+        if self.mode != 'cprofile': return None
+        stats = pstats.Stats(self._profiler)
+        rows = sorted(stats.stats.items(), key=lambda item: -item[1][3])[:limit]
+        return {'mode': 'cprofile', 'total_seconds': stats.total_tt,
+                'functions': [{'function': f"{filename}:{line}({name})", 'calls': calls, 'own_seconds': own, 'cumulative_seconds': cumulative}
+                              for (filename, line, name), (_, calls, own, cumulative, _) in rows]}
+
+
+def build_stats_report(stats, profiler=None, **extra):
+    return {'started': stats.started, 'finished': time.time(), **extra, 'stages': stats.snapshot(), 'profile': profiler.report() if profiler else None}
+
+def dump_stats_json(path, report):
+    with open(path, 'w', encoding='utf-8') as f: json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+stage_stats = StageStats()
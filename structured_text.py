@@ -0,0 +1,164 @@
+#
+# 檔案名稱: structured_text.py
+#
+# 結構化文字檔 (srt / ass 字幕、CSV、JSON、HTML) 的逐段切分：只有給人看的文字節點會被轉換，時間碼、欄位名稱、鍵值與標記原樣保留
+import json
+import os
+import re
+from collections import namedtuple
+
+from compressed_io import split_compressed_name
+
+STRUCTURED_FORMATS = {'.srt': 'srt', '.ass': 'ass', '.ssa': 'ass', '.csv': 'csv', '.json': 'json', '.html': 'html', '.htm': 'html'}
+STRUCTURED_CHUNK_CHARS = 1024 * 256
+SRT_STRUCTURE_RE = re.compile(r'\s*(\d+|\d+:\d+:\d+[,.]\d+\s*-->.*)?\s*')
+ASS_EVENT_RE = re.compile(r'(?i)(dialogue|comment)\s*:')
+ASS_DEFAULT_TEXT_FIELD = 9 # Format 行缺少時，Text 為第 10 個欄位
+ASS_OVERRIDE_RE = re.compile(r'(\{[^}]*\})')
+CSV_DELIMITERS = (',', ';', '\t')
+JSON_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"\s*', re.S)
+HTML_RAW_TAG_RE = re.compile(r'<(script|style)\b', re.I) # 內容是程式碼，不轉換
+
+# 文字節點：text 為要轉換的文字，raw 為原始內容 (轉換結果相同時原樣寫回)，encode 把轉換結果寫回原格式 (None 表示直接寫出)
+TextPiece = namedtuple('TextPiece', ['text', 'raw', 'encode'])
+def text_piece(text): return TextPiece(text, text, None)
+
+
+def structured_format(path):
+    """ 依副檔名 (去掉壓縮副檔名後) 判斷格式，一般文字檔回傳 None """
+    return STRUCTURED_FORMATS.get(os.path.splitext(split_compressed_name(os.path.basename(path))[0])[1].lower())
+
+def _complete_lines(buffer, final):
+    """ 可處理的完整行與其結束位置；最後一行未結束時留到下一段 """
+    end = len(buffer) if final else buffer.rfind('\n') + 1
+    return buffer[:end].splitlines(keepends=True), end
+
+def _split_line(line):
+    body = line.rstrip('\r\n'); return body, line[len(body):]
+
+
+class SubRipSplitter:
+    """ srt：序號、時間碼與空行保留，其餘每一行都是字幕文字 """
+    def split(self, buffer, final):
+        lines, end = _complete_lines(buffer, final); pieces = []
+        for line in lines:
+            body, newline = _split_line(line)
+            pieces.extend((body if SRT_STRUCTURE_RE.fullmatch(body) else text_piece(body), newline))
+        return pieces, end
+
+
+class SubStationSplitter:
+    """ ass / ssa：只轉換 [Events] 中 Dialogue / Comment 的 Text 欄位，{...} 特效標籤 (可能含字型名稱) 與樣式定義保留 """
+    def __init__(self):
+        self.section = None; self.text_field = ASS_DEFAULT_TEXT_FIELD
+
+    def split(self, buffer, final):
+        lines, end = _complete_lines(buffer, final); pieces = []
+        for line in lines:
+            body, newline = _split_line(line); stripped = body.strip()
+            if stripped.startswith('[') and stripped.endswith(']'): self.section = stripped.lower()
+            elif self.section == '[events]' and stripped.lower().startswith('format:'):
+                fields = [field.strip().lower() for field in stripped.split(':', 1)[1].split(',')]
+                self.text_field = fields.index('text') if 'text' in fields else len(fields) - 1
+            elif self.section == '[events]' and (match := ASS_EVENT_RE.match(body)) and (start := self._text_start(body, match.end())) is not None:
+                pieces.append(body[:start])
+                pieces.extend(part if i % 2 else text_piece(part) for i, part in enumerate(ASS_OVERRIDE_RE.split(body[start:])) if part)
+                pieces.append(newline); continue
+            pieces.extend((body, newline))
+        return pieces, end
+
+    def _text_start(self, body, position):
+        for _ in range(self.text_field):
+            if (position := body.find(',', position) + 1) == 0: return None
+        return position
+
+
+class CsvSplitter:
+    """ CSV：每個欄位的內容都是文字，分隔符號、引號與換行保留；引號內的換行不會被當成列尾 """
+    def __init__(self): self.token_re = None
+
+    def split(self, buffer, final):
+        if self.token_re is None:
+            first_line = buffer.split('\n', 1)[0]; delimiter = max(CSV_DELIMITERS, key=first_line.count)
+            self.token_re = re.compile(r'"((?:[^"]|"")*)"|([^"%s\r\n]+)|([%s]|\r\n|\n|\r|")' % (re.escape(delimiter), re.escape(delimiter)))
+        pieces, record_pieces, record_start = [], [], 0
+        for match in self.token_re.finditer(buffer):
+            quoted, plain, other = match.groups()
+            if quoted is not None: record_pieces.extend(('"', text_piece(quoted), '"'))
+            elif plain is not None: record_pieces.append(text_piece(plain))
+            elif other == '"' and not final: break # 引號欄位尚未結束，從這一列開始留到下一段
+            else:
+                record_pieces.append(other)
+                if other in ('\r\n', '\n', '\r'): pieces.extend(record_pieces); record_pieces = []; record_start = match.end()
+        if final: pieces.extend(record_pieces); return pieces, len(buffer)
+        return pieces, record_start
+
+
+class JsonSplitter:
+    """ JSON：只轉換字串值，物件的鍵、數字與標點保留；含跳脫字元的字串先解碼，有改變時再以相同的跳脫方式寫回 """
+    def split(self, buffer, final):
+        pieces, position = [], 0
+        for match in JSON_STRING_RE.finditer(buffer):
+            if match.end() == len(buffer) and not final: break # 還不知道後面是不是冒號 (鍵)
+            pieces.append(buffer[position:match.start()]); position = match.end()
+            literal = match.group().rstrip(); trailing = match.group()[len(literal):]
+            if buffer.startswith(':', match.end()): pieces.append(match.group()); continue
+            inner = literal[1:-1]
+            if '\\' not in inner: pieces.extend(('"', text_piece(inner), '"' + trailing)); continue
+            try: value = json.loads(literal)
+            except ValueError: pieces.append(match.group()); continue # 不合法的跳脫字元：原樣保留
+            ascii_only = bool(re.search(r'\\u[0-9a-fA-F]{4}', inner)) and inner.isascii()
+            pieces.extend(('"', TextPiece(value, inner, lambda text, ascii_only=ascii_only: json.dumps(text, ensure_ascii=ascii_only)[1:-1]), '"' + trailing))
+        rest = buffer[position:]
+        if final or '"' not in rest: pieces.append(rest); return pieces, len(buffer)
+        cut = position + rest.index('"'); pieces.append(buffer[position:cut]); return pieces, cut
+
+
+class HtmlSplitter:
+    """ HTML：轉換標籤之間的文字；標籤 (含屬性)、註解以及 script / style 的內容保留 """
+    def __init__(self): self.raw_tag = None
+
+    def split(self, buffer, final):
+        pieces, position, length = [], 0, len(buffer)
+        while position < length:
+            if self.raw_tag:
+                if (end := re.compile('</' + self.raw_tag, re.I).search(buffer, position)) is None:
+                    keep = length if final else max(position, length - len(self.raw_tag) - 2)
+                    pieces.append(buffer[position:keep]); position = keep; break
+                pieces.append(buffer[position:end.start()]); position = end.start(); self.raw_tag = None; continue
+            tag_start = position
+            while (tag_start := buffer.find('<', tag_start)) >= 0 and not (buffer[tag_start + 1:tag_start + 2].isalpha() or buffer[tag_start + 1:tag_start + 2] in ('/', '!', '?')):
+                tag_start += 1 # 不是標籤開頭的 < (例如「a < b」) 視為文字
+            if tag_start < 0:
+                # 沒有下一個標籤：到最後一個換行為止的文字先處理，其餘留到下一段
+                end = length if final else max(position, buffer.rfind('\n', position) + 1)
+                if end > position: pieces.append(text_piece(buffer[position:end]))
+                position = end; break
+            if tag_start > position: pieces.append(text_piece(buffer[position:tag_start]))
+            close = '-->' if buffer.startswith('<!--', tag_start) else '>'
+            if (tag_end := buffer.find(close, tag_start + 1)) < 0:
+                if final: pieces.append(buffer[tag_start:]); position = length
+                else: position = tag_start
+                break
+            tag = buffer[tag_start:tag_end + len(close)]; pieces.append(tag); position = tag_end + len(close)
+            if (match := HTML_RAW_TAG_RE.match(tag)) and not tag.endswith('/>'): self.raw_tag = match.group(1).lower()
+        return pieces, position
+
+
+STRUCTURED_SPLITTERS = {'srt': SubRipSplitter, 'ass': SubStationSplitter, 'csv': CsvSplitter, 'json': JsonSplitter, 'html': HtmlSplitter}
+
+
+def iter_structured_blocks(text_file, fmt, chunk_chars=STRUCTURED_CHUNK_CHARS):
+    """ 逐段讀取並產生片段清單：結構為 str，文字節點為 TextPiece；跨段的行、字串或標籤留到下一段，記憶體用量與檔案大小無關 """
+    splitter, carry = STRUCTURED_SPLITTERS[fmt](), ""
+    while True:
+        chunk = text_file.read(chunk_chars); buffer = carry + chunk
+        pieces, consumed = splitter.split(buffer, not chunk); carry = buffer[consumed:]
+        if pieces: yield pieces
+        if not chunk: return
+
+def block_text(pieces):
+    """ 片段中的文字節點，供語言判斷使用 """
+    return "\n".join(piece.text for piece in pieces if not isinstance(piece, str))
+
+def block_source(pieces): return "".join(piece if isinstance(piece, str) else piece.raw for piece in pieces)
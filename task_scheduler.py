@@ -0,0 +1,94 @@
+#
+# 檔案名稱: task_scheduler.py
+#
+# 共用的工作排程：互動工作 (預覽、剪貼簿) 與批次工作分開排隊，有互動工作等待或執行時，批次工作在檔案或分段之間讓出
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+DEFAULT_LATENCY_TARGET = 0.15 # 互動工作從送出到完成的目標時間 (秒)
+DEFAULT_MAX_BATCH_YIELD = 2.0 # 批次工作每次最多讓出的時間，避免連續輸入時批次完全停擺
+MIN_PIECE_CHARS = 1024 * 16
+MAX_PIECE_CHARS = 1024 * 256
+INITIAL_CHARS_PER_SECOND = 1024 * 256
+
+
+class TaskScheduler:
+    def __init__(self, interactive_workers=2, batch_workers=2, latency_target=DEFAULT_LATENCY_TARGET, max_batch_yield=DEFAULT_MAX_BATCH_YIELD):
+        self.latency_target, self.max_batch_yield = latency_target, max_batch_yield
+        self.worker_counts = {PRIORITY_INTERACTIVE: interactive_workers, PRIORITY_BATCH: batch_workers}
+        self._lanes = {priority: queue.Queue() for priority in self.worker_counts}; self._started = set()
+        self._cond = threading.Condition(); self._interactive = 0; self._local = threading.local()
+        # preemptible 在第一次有互動工作時才開啟，命令列批次不受分段影響
+        self.preemptible = False; self.chars_per_second = INITIAL_CHARS_PER_SECOND
+        self.interactive_count = self.latency_misses = 0; self.latency_total = self.batch_yield_total = 0.0
+
+    def submit(self, func, *args, priority=PRIORITY_INTERACTIVE, **kwargs):
+        """ 送出工作並回傳 Future；互動工作一送出就開始計入，批次工作在下一個讓出點即會暫停 """
+        future = Future()
+        if priority == PRIORITY_INTERACTIVE: self._begin_interactive()
+        self._ensure_workers(priority)
+        self._lanes[priority].put((future, func, args, kwargs, time.perf_counter()))
+        return future
+
+    def _ensure_workers(self, priority):
+        with self._cond:
+            if priority in self._started: return
+            self._started.add(priority)
+        for _ in range(self.worker_counts[priority]): threading.Thread(target=self._work, args=(priority,), daemon=True).start()
+
+    def _work(self, priority):
+        lane = self._lanes[priority]; self._local.interactive = priority == PRIORITY_INTERACTIVE
+        while True:
+            future, func, args, kwargs, submitted = lane.get()
+            try:
+                if future.set_running_or_notify_cancel():
+                    try: future.set_result(func(*args, **kwargs))
+                    except BaseException as e: future.set_exception(e)
+            finally:
+                if priority == PRIORITY_INTERACTIVE: self._end_interactive(submitted)
+
+    def _begin_interactive(self):
+        with self._cond: self._interactive += 1; self.preemptible = True
+
+    def _end_interactive(self, started):
+        latency = time.perf_counter() - started
+        with self._cond:
+            self._interactive -= 1; self.interactive_count += 1; self.latency_total += latency
+            if latency > self.latency_target: self.latency_misses += 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def interactive(self):
+        """ 在呼叫端執行緒中直接進行的互動工作 (例如主執行緒上的短轉換) 也讓批次工作讓出 """
+        self._begin_interactive(); started = time.perf_counter(); nested = getattr(self._local, 'interactive', False); self._local.interactive = True
+        try: yield
+        finally: self._local.interactive = nested; self._end_interactive(started)
+
+    def checkpoint(self):
+        """ 批次工作在檔案或分段之間呼叫；有互動工作時等待其完成，最多 max_batch_yield 秒 (互動工作本身呼叫時不等待) """
+        if not self._interactive or getattr(self._local, 'interactive', False): return
+        start = time.perf_counter(); deadline = start + self.max_batch_yield
+        with self._cond:
+            while self._interactive and (remaining := deadline - time.perf_counter()) > 0: self._cond.wait(remaining)
+        with self._cond: self.batch_yield_total += time.perf_counter() - start
+
+    def record_batch_throughput(self, chars, seconds):
+        if seconds > 0: self.chars_per_second = self.chars_per_second * 0.8 + chars / seconds * 0.2
+
+    def piece_chars(self):
+        """ 兩個讓出點之間的批次工作量：依實測速度換算成約 latency_target 秒可完成的字數 """
+        return max(MIN_PIECE_CHARS, min(MAX_PIECE_CHARS, int(self.chars_per_second * self.latency_target)))
+
+    def latency_report(self):
+        with self._cond:
+            mean = self.latency_total / self.interactive_count if self.interactive_count else 0.0
+            return {'interactive_tasks': self.interactive_count, 'mean_latency_seconds': mean, 'latency_target_seconds': self.latency_target,
+                    'over_target': self.latency_misses, 'batch_yield_seconds': self.batch_yield_total}
+
+
+scheduler = TaskScheduler()
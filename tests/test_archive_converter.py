@@ -0,0 +1,71 @@
+#
+# 檔案名稱: tests/test_archive_converter.py
+#
+# 壓縮檔直接轉換：未設 UTF-8 旗標的 zip 項目名稱 (GBK 或 UTF-8 位元組) 必須正確解碼並轉換
+import os
+import sys
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from archive_converter import ZIP_UTF8_FLAG, convert_archive, convert_content_archive, list_archive_entries
+from converter_core import build_content_conversion_params, get_converter
+
+
+def make_legacy_zip(path, raw_name, content=b"hello"):
+    """ zipfile 寫入非 ASCII 名稱時一定會設定 UTF-8 旗標，先以等長的 ASCII 名稱寫入，再直接替換檔案中的名稱位元組 """
+    placeholder = b"N" * (len(raw_name) - 4) + b".txt"
+    with zipfile.ZipFile(path, 'w') as archive: archive.writestr(placeholder.decode('ascii'), content)
+    with open(path, 'rb') as f: data = f.read()
+    assert data.count(placeholder) == 2 # 本機檔頭與中央目錄各一次
+    with open(path, 'wb') as f: f.write(data.replace(placeholder, raw_name))
+
+
+def check_legacy_name(tmp_path, encoding):
+    source = tmp_path / f"names_{encoding}.zip"; output_folder = tmp_path / "out"; output_folder.mkdir(exist_ok=True)
+    make_legacy_zip(str(source), "头发.txt".encode(encoding))
+    with zipfile.ZipFile(source) as archive: assert not archive.infolist()[0].flag_bits & ZIP_UTF8_FLAG
+    assert list_archive_entries(str(source)) == ["头发.txt"]
+    output_path, results, _ = convert_archive(str(source), str(output_folder), f"converted_{encoding}", cc_names=get_converter('s2t'))
+    assert results == {"头发.txt": 'converted'}
+    with zipfile.ZipFile(output_path) as archive:
+        (info,) = archive.infolist()
+        assert info.filename == "頭髮.txt" and info.flag_bits & ZIP_UTF8_FLAG
+        assert archive.read(info) == b"hello"
+
+
+def test_gbk_entry_name_without_utf8_flag(tmp_path): check_legacy_name(tmp_path, 'gbk')
+
+def test_utf8_entry_name_without_utf8_flag(tmp_path): check_legacy_name(tmp_path, 'utf-8')
+
+
+def test_stopped_archive_is_removed(tmp_path):
+    source = tmp_path / "stop.zip"
+    with zipfile.ZipFile(source, 'w') as archive: archive.writestr("a.txt", b"a")
+    output_path, _, _ = convert_archive(str(source), str(tmp_path), "stopped", cc_names=get_converter('s2t'), should_stop=lambda: True)
+    assert output_path is None and not os.path.exists(tmp_path / "stopped.zip")
+
+
+def content_archive(tmp_path, entries, **options):
+    source, output_folder = tmp_path / "content.zip", tmp_path / "content_out"; output_folder.mkdir()
+    with zipfile.ZipFile(source, 'w') as archive:
+        for name, text in entries.items(): archive.writestr(name, text.encode('utf-8'))
+    params = build_content_conversion_params('s2t', str(output_folder), None, None, **options)
+    return convert_content_archive(str(source), params, 1, None, None), output_folder
+
+
+def test_content_archive_keeps_entry_names_by_default(tmp_path):
+    (status, detail), _ = content_archive(tmp_path, {"软件/说明.txt": "软件说明"})
+    assert status == 'converted'
+    with zipfile.ZipFile(detail['output_path']) as archive: assert archive.read("软件/说明.txt").decode('utf-8') == "軟件說明"
+
+
+def test_content_archive_converts_entry_names_when_enabled(tmp_path):
+    (status, detail), _ = content_archive(tmp_path, {"软件/说明.txt": "hello"}, convert_archive_names=True)
+    assert status == 'converted'
+    with zipfile.ZipFile(detail['output_path']) as archive: assert archive.namelist() == ["軟件/說明.txt"]
+
+
+def test_content_archive_without_changes_is_skipped(tmp_path):
+    (status, detail), output_folder = content_archive(tmp_path, {"软件/readme.txt": "hello", "data.bin": "x"})
+    assert (status, detail) == ('skipped_non_chinese', None) and not os.listdir(output_folder)
@@ -0,0 +1,27 @@
+#
+# 檔案名稱: tests/test_converter_core.py
+#
+# 轉換器池的並行正確性：多執行緒同時轉換的結果必須與單執行緒完全相同
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from converter_core import ConverterRegistry, stress_test_converters
+
+
+@pytest.mark.parametrize('mode', ['pool', 'thread', 'shared'])
+def test_concurrent_conversions_match_single_threaded(mode):
+    result = stress_test_converters(('s2t', 't2s'), threads=8, iterations=50, mode=mode, max_instances=2)
+    assert result['conversions'] == 400
+    assert result['errors'] == [] and result['mismatches'] == 0
+    if mode == 'pool': assert all(1 <= count <= 2 for count in result['instances'].values())
+
+
+def test_registry_reports_memory_per_config():
+    registry = ConverterRegistry(max_instances=1); registry.get('s2t')
+    assert registry.memory_source in ('rss', 'python-heap')
+    (count, memory), = registry.memory_report().values()
+    assert count == 1 and memory >= 0
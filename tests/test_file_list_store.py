@@ -0,0 +1,37 @@
+#
+# 檔案名稱: tests/test_file_list_store.py
+#
+# SQLite 檔案列表的復原：每一步只記被改到的列，復原後要和記憶體版本一致
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from file_list_store import InMemoryFileList, SQLiteFileList
+
+
+def snapshot(file_list): return list(file_list.items())
+
+
+def test_sqlite_undo_matches_in_memory(tmp_path):
+    memory, sqlite = InMemoryFileList(), SQLiteFileList(str(tmp_path / "lists.db"))
+    try:
+        actions = [lambda fl: fl.add([f"/d/{i}.txt" for i in range(10)]),
+                   lambda fl: fl.set_checked(["/d/1.txt", "/d/2.txt"], False),
+                   lambda fl: fl.set_status({"/d/3.txt": "converted", "/d/4.txt": "failed_read"}),
+                   lambda fl: fl.rename({"/d/5.txt": "/d/五.txt", "/d/6.txt": "/d/7.txt"}, "converted"),
+                   lambda fl: fl.remove_unchecked(),
+                   lambda fl: fl.set_all_checked(False),
+                   lambda fl: fl.clear()]
+        history = []
+        for action in actions:
+            history.append(snapshot(memory))
+            for file_list in (memory, sqlite): file_list.save_undo_state(); action(file_list)
+            assert snapshot(sqlite) == snapshot(memory)
+        while history:
+            expected = history.pop()
+            assert sqlite.undo() and memory.undo()
+            assert snapshot(sqlite) == snapshot(memory) == expected
+        assert not sqlite.undo()
+    finally:
+        sqlite.close()
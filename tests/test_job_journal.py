@@ -0,0 +1,57 @@
+#
+# 檔案名稱: tests/test_job_journal.py
+#
+# 內容轉換工作：寫入日誌失敗時工作不可標為完成，恢復後要補完剩下的檔案；重複檔的報告沿用代表檔的編碼
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from converter_core import build_content_conversion_params
+from job_journal import JobJournal, run_content_job
+from job_report import JobReport
+
+
+class FailingJournal(JobJournal):
+    def __init__(self, path, fail_at):
+        super().__init__(path); self.fail_at, self.recorded = fail_at, 0
+    def record(self, job_id, seq, status, detail=None):
+        if self.recorded == self.fail_at: raise OSError("disk full")
+        self.recorded += 1; super().record(job_id, seq, status, detail)
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_record_failure_leaves_job_resumable(tmp_path, workers):
+    source, output = tmp_path / "in", tmp_path / "out"; source.mkdir(); output.mkdir()
+    paths = []
+    for index in range(6):
+        path = source / f"{index}.txt"; path.write_text(f"软件说明 {index}", encoding="utf-8"); paths.append(str(path))
+    params = build_content_conversion_params('s2t', str(output), None, None)
+    journal = FailingJournal(str(tmp_path / "jobs.db"), fail_at=2)
+    job_id = journal.create_job('content', {}, paths)
+    with pytest.raises(OSError): run_content_job(journal, job_id, params, None, None, workers=workers)
+    assert journal.get_job(job_id)['state'] == 'cancelled' and journal.pending_files(job_id)
+    journal.fail_at = None
+    success, failed, _, _, stopped = run_content_job(journal, job_id, params, None, None, workers=workers)
+    assert not stopped and failed == 0 and success == len(paths)
+    assert journal.get_job(job_id)['state'] == 'finished' and not journal.pending_files(job_id)
+    journal.close()
+
+
+def test_duplicates_report_encoding_and_get_separate_files(tmp_path):
+    source, output = tmp_path / "in", tmp_path / "out"; source.mkdir(); output.mkdir()
+    paths = []
+    for name in ("a.txt", "b.txt"):
+        path = source / name; path.write_text("软件说明", encoding="utf-8"); paths.append(str(path))
+    params = build_content_conversion_params('s2t', str(output), None, None, deduplicate=True)
+    journal, report = JobJournal(str(tmp_path / "jobs.db")), JobReport('content', str(tmp_path / "report.jsonl"))
+    success, _, _, _, _ = run_content_job(journal, journal.create_job('content', {}, paths), params, None, None, report=report)
+    report.close(); journal.close()
+    assert success == 2
+    with open(tmp_path / "report.jsonl", encoding="utf-8") as f: entries = {entry['path']: entry for entry in map(json.loads, f) if entry['type'] == 'file'}
+    first, duplicate = entries[paths[0]], entries[paths[1]]
+    assert duplicate['encoding'] == first['encoding'] is not None and duplicate['detail'] == f"duplicate of {paths[0]}"
+    assert os.stat(first['output']).st_ino != os.stat(duplicate['output']).st_ino